@@ -5,5 +5,31 @@ Participants need to provide a class inherited from `SAONegotiator` that impleme
 
 """
 from .runner import *
+from .ufuns import *
+from .cache import *
+from .frontier import *
+from .tournament import *
+from .bench import *
+from .formats import *
+from .analytics import *
+from .quick import *
+from .distributed import *
+from .scheduling import *
+from .racing import *
+from .shared import *
 
-__all__ = runner.__all__
+__all__ = (
+    runner.__all__
+    + ufuns.__all__
+    + cache.__all__
+    + frontier.__all__
+    + tournament.__all__
+    + bench.__all__
+    + formats.__all__
+    + analytics.__all__
+    + quick.__all__
+    + distributed.__all__
+    + scheduling.__all__
+    + racing.__all__
+    + shared.__all__
+)
@@ -0,0 +1,278 @@
+"""
+Per-scenario analytics computed once per tournament and shared by all negotiations on the scenario.
+"""
+import math
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from negmas.inout import Scenario, UtilityFunction
+from negmas.outcomes import Outcome
+from negmas.outcomes.protocols import DiscreteOutcomeSpace
+
+from anl.anl2024.frontier import (
+    kalai_point_2d,
+    nash_point_2d,
+    outcome_at,
+    outcome_utilities,
+    pareto_frontier_2d,
+)
+
+__all__ = [
+    "ScenarioAnalytics",
+    "scenario_profile",
+    "profile_scenarios",
+    "SCENARIO_PROFILES_FILE_NAME",
+]
+
+SCENARIO_PROFILES_FILE_NAME = "scenario_profiles.csv"
+"""Name of the file storing the profiles of all scenarios of a tournament (see `profile_scenarios`)"""
+
+
+def _read_only(x: np.ndarray) -> np.ndarray:
+    x.flags.writeable = False
+    return x
+
+
+class ScenarioAnalytics:
+    """Read-only analytics of a bilateral scenario seen from the side of one negotiator.
+
+    Args:
+        outcome_space: The (discrete) outcome-space of the scenario
+        utilities: An array of shape (n_outcomes, 2) with the utility of every outcome (in enumeration order) for both sides
+        side: The side of the scenario these analytics are seen from (0 or 1)
+
+    Remarks:
+        - Use `from_scenario` to calculate analytics and `for_side` to get the view of the other side.
+          All views of the same scenario share the same arrays which must not be modified.
+        - Nash and Kalai points are calculated assuming zero reserved values as reserved values are private.
+          Use `nash_point_2d` and `kalai_point_2d` on `frontier_utilities` with other reserved values if needed.
+        - In all arrays, the first column (or row) is for the side these analytics are seen from and the second
+          is for its partner.
+        - Copying returns the same object and pickling sends the arrays once for all views in the same message.
+    """
+
+    def __init__(
+        self,
+        outcome_space: DiscreteOutcomeSpace,
+        utilities: np.ndarray,
+        side: int = 0,
+    ):
+        self.outcome_space = outcome_space
+        self._utilities = _read_only(np.asarray(utilities, dtype=float))
+        self._frontier = _read_only(pareto_frontier_2d(self._utilities))
+        frontier = self._utilities[self._frontier]
+        self._ranges = tuple(
+            (float(mn), float(mx))
+            for mn, mx in zip(self._utilities.min(axis=0), self._utilities.max(axis=0))
+        )
+        self.nash = self._frontier_point(nash_point_2d(frontier, ranges=self._ranges))
+        self.kalai = self._frontier_point(
+            kalai_point_2d(frontier, ranges=self._ranges)
+        )
+        self._orders = _read_only(
+            np.argsort(-self._utilities, axis=0, kind="stable").T.copy()
+        )
+        self.side = side
+
+    def _frontier_point(self, indx: int | None) -> int | None:
+        return None if indx is None else int(self._frontier[indx])
+
+    @classmethod
+    def from_scenario(
+        cls, scenario: Scenario | Sequence[UtilityFunction]
+    ) -> "ScenarioAnalytics | None":
+        """Calculates the analytics of a scenario (or a pair of ufuns) seen from the first side.
+
+        Returns:
+            The analytics or None if the scenario is not bilateral or its outcome-space is not discrete
+        """
+        ufuns = scenario.ufuns if isinstance(scenario, Scenario) else scenario
+        if len(ufuns) != 2:
+            return None
+        os = ufuns[0].outcome_space
+        if os is None or not os.is_discrete():
+            return None
+        if ufuns[1].outcome_space is not os and ufuns[1].outcome_space != os:
+            return None
+        return cls(os, outcome_utilities(ufuns))  # type: ignore
+
+    def for_side(self, side: int) -> "ScenarioAnalytics":
+        """Returns the analytics seen from the given side sharing all arrays with this object"""
+        if side == self.side:
+            return self
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view.side = side
+        return view
+
+    @property
+    def n_outcomes(self) -> int:
+        """Number of outcomes in the scenario"""
+        return len(self._utilities)
+
+    @property
+    def utilities(self) -> np.ndarray:
+        """Utilities of all outcomes (in enumeration order) for this side (column 0) and its partner (column 1)"""
+        return self._utilities if self.side == 0 else self._utilities[:, ::-1]
+
+    @property
+    def ranges(self) -> tuple[tuple[float, float], ...]:
+        """The minimum and maximum utility of this side and its partner"""
+        return self._ranges if self.side == 0 else self._ranges[::-1]
+
+    @property
+    def frontier(self) -> np.ndarray:
+        """Indices of the Pareto outcomes ordered by decreasing utility for this side"""
+        return self._frontier if self.side == 0 else self._frontier[::-1]
+
+    @property
+    def frontier_utilities(self) -> np.ndarray:
+        """Utilities of the Pareto outcomes (in the order of `frontier`) for this side and its partner"""
+        return self.utilities[self.frontier]
+
+    @property
+    def orders(self) -> np.ndarray:
+        """Indices of all outcomes sorted by decreasing utility for this side (row 0) and its partner (row 1)"""
+        return self._orders if self.side == 0 else self._orders[::-1]
+
+    def outcome(self, indx: int) -> Outcome:
+        """Returns the outcome with the given index (in enumeration order) without enumerating the outcome-space"""
+        return outcome_at(self.outcome_space, indx)  # type: ignore
+
+    def outcomes(self, indices: Sequence[int] | np.ndarray) -> list[Outcome]:
+        """Returns the outcomes with the given indices"""
+        return [self.outcome(_) for _ in indices]
+
+    def profile(
+        self, reserved: tuple[float, float] | Sequence[float] = (0.0, 0.0)
+    ) -> dict[str, Any]:
+        """Summarizes the scenario given the reserved values of this side and its partner.
+
+        Returns:
+            A dict with the number of outcomes (`n_outcomes`) and its order of magnitude (`size_bucket`: the smallest power of ten
+            not below it), the sizes of the frontier (`n_pareto`) and of its rational part (`n_rational_pareto`), the fraction of outcomes
+            rational for both sides (`rational_fraction`), the `opposition` level (as in `negmas.preferences.ops.opposition_level`),
+            the utilities at the Nash and Kalai points (`nash_first`, `nash_second`, `kalai_first`, `kalai_second`, NaN if no point
+            is rational) and a `difficulty` index in [0, 1].
+
+        Remarks:
+            - `difficulty` is the average of the opposition level (normalized to [0, 1]) and the fraction of outcomes that are
+              not rational for both sides. It is one if no outcome is rational.
+            - Everything is calculated on the stored arrays without evaluating any ufun.
+        """
+        utils = self.utilities
+        reserved = np.asarray(reserved, dtype=float)
+        ranges = self.ranges
+        frontier = self.frontier_utilities
+        frontier = frontier[np.all(frontier >= reserved, axis=1)]
+        rational_fraction = float(np.all(utils >= reserved, axis=1).mean())
+        n = self.n_outcomes
+        profile: dict[str, Any] = dict(
+            n_outcomes=n,
+            size_bucket=10 ** max(0, math.ceil(math.log10(n))) if n else 0,
+            n_pareto=len(self._frontier),
+            n_rational_pareto=len(frontier),
+            rational_fraction=rational_fraction,
+            opposition=float("inf"),
+            nash_first=float("nan"),
+            nash_second=float("nan"),
+            kalai_first=float("nan"),
+            kalai_second=float("nan"),
+            difficulty=1.0,
+        )
+        if not len(frontier):
+            return profile
+        # the nearest outcome to the ideal point is always on the frontier
+        maxs = np.asarray([mx for _, mx in ranges])
+        gaps = 1.0 - np.divide(frontier, maxs, out=frontier.copy(), where=maxs != 0)
+        opposition = float(np.sqrt((gaps**2).sum(axis=1).min()))
+        profile.update(
+            opposition=opposition,
+            difficulty=0.5
+            * (min(1.0, opposition / math.sqrt(2)) + 1.0 - rational_fraction),
+        )
+        for name, indx in (
+            ("nash", nash_point_2d(frontier, tuple(reserved), ranges)),
+            ("kalai", kalai_point_2d(frontier, tuple(reserved), ranges)),
+        ):
+            if indx is not None:
+                profile[f"{name}_first"] = float(frontier[indx, 0])
+                profile[f"{name}_second"] = float(frontier[indx, 1])
+        return profile
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        for name in ("_utilities", "_frontier", "_orders"):
+            _read_only(self.__dict__[name])
+
+    def __copy__(self) -> "ScenarioAnalytics":
+        return self
+
+    def __deepcopy__(self, memo) -> "ScenarioAnalytics":
+        return self
+
+
+def scenario_profile(
+    scenario: Scenario,
+    analytics: ScenarioAnalytics | None = None,
+    name: str | None = None,
+) -> dict[str, Any]:
+    """Profiles a scenario (see `ScenarioAnalytics.profile`) using its current reserved values.
+
+    Args:
+        scenario: The scenario
+        analytics: The analytics of the scenario seen from the side of its first ufun. Calculated if not given.
+        name: The name of the scenario. Defaults to the name of its outcome-space.
+
+    Returns:
+        A dict with the `scenario` name, the reserved values of both sides (`reserved_first`, `reserved_second`)
+        and the profile. For scenarios without analytics (i.e. not bilateral or not discrete), only the number of
+        outcomes (if finite) is available.
+    """
+    if analytics is None:
+        analytics = ScenarioAnalytics.from_scenario(scenario)
+    row: dict[str, Any] = dict(
+        scenario=name if name is not None else scenario.outcome_space.name
+    )
+    reserved = [float(u.reserved_value) for u in scenario.ufuns]
+    row.update(zip(("reserved_first", "reserved_second"), reserved))
+    if analytics is None:
+        n = scenario.outcome_space.cardinality
+        return row | dict(n_outcomes=n if math.isfinite(n) else float("nan"))
+    return row | analytics.profile(reserved[:2])
+
+
+def profile_scenarios(
+    scenarios: Iterable[Scenario],
+    analytics: Iterable[ScenarioAnalytics | None] | None = None,
+    rotate_ufuns: bool = False,
+) -> pd.DataFrame:
+    """Profiles the scenarios of a tournament in one table.
+
+    Args:
+        scenarios: The scenarios
+        analytics: The analytics of every scenario (e.g. found in the private information of negotiators). Calculated if not given.
+        rotate_ufuns: If given, a row is added for the scenario with rotated ufuns named the same way tournaments name it.
+
+    Returns:
+        A data frame with one row per scenario (see `scenario_profile` for the columns).
+    """
+    scenarios = list(scenarios)
+    if analytics is None:
+        analytics = [None] * len(scenarios)
+    rows = []
+    for s, a in zip(scenarios, analytics, strict=True):
+        if a is None:
+            a = ScenarioAnalytics.from_scenario(s)
+        rows.append(scenario_profile(s, a))
+        if not rotate_ufuns:
+            continue
+        # tournaments move the last ufun first (i.e. swap the ufuns of bilateral scenarios)
+        ufuns = (s.ufuns[-1],) + tuple(s.ufuns[:-1])
+        rotated = Scenario(outcome_space=s.outcome_space, ufuns=ufuns)
+        name = f"{s.outcome_space.name}-1"
+        rows.append(
+            scenario_profile(rotated, None if a is None else a.for_side(1), name)
+        )
+    return pd.DataFrame.from_records(rows)
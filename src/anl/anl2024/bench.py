@@ -0,0 +1,169 @@
+"""
+Benchmarks for scenario generators.
+"""
+import datetime
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Sequence
+
+import negmas
+import numpy as np
+
+from anl.anl2024.runner import (
+    mixed_scenarios,
+    monotonic_pies_scenarios,
+    pie_scenarios,
+    pies_scenarios,
+    record_generation_phases,
+    record_generation_stats,
+    zerosum_pie_scenarios,
+)
+
+__all__ = [
+    "bench_generator",
+    "bench_generators",
+    "BENCH_GENERATORS",
+    "DEFAULT_BENCH_OUTCOMES",
+    "DEFAULT_BENCH_SCENARIOS",
+]
+
+BENCH_GENERATORS: dict[str, Callable] = dict(
+    mix=mixed_scenarios,
+    pie=pie_scenarios,
+    pies=pies_scenarios,
+    monotonic_pies=monotonic_pies_scenarios,
+    zerosum=zerosum_pie_scenarios,
+)
+"""Generators benchmarked by default"""
+
+DEFAULT_BENCH_OUTCOMES = (100, 1_000, 10_000, 100_000, 1_000_000)
+"""Default numbers of outcomes to benchmark generators with"""
+
+DEFAULT_BENCH_SCENARIOS = (1, 10)
+"""Default numbers of scenarios to benchmark generators with"""
+
+PHASES = ("values", "ufuns", "reserved")
+
+
+def bench_generator(
+    generator: Callable,
+    n_scenarios: int,
+    n_outcomes: int,
+    seed: int = 0,
+    repeats: int = 1,
+    memory: bool = True,
+) -> dict[str, Any]:
+    """Measures the speed and memory usage of a scenario generator.
+
+    Args:
+        generator: The generator to benchmark (called with `seed` and `njobs=-1`)
+        n_scenarios: Number of scenarios to generate
+        n_outcomes: Number of outcomes of every scenario
+        seed: The seed used for generation so that all runs generate the same scenarios
+        repeats: Number of times to time generation. The fastest run is reported.
+        memory: If given, generation is run once more under `tracemalloc` to measure peak memory
+
+    Returns:
+        A dict with the time taken (`seconds`), `scenarios_per_second`, `peak_memory` (bytes or None) and the
+        time spent in every phase of generation (`values`, `ufuns`, `reserved` and `other`). Generators that
+        record their attempts also report them per scenario type under `attempts` (see `record_generation_stats`).
+
+    Remarks:
+        - Phases are only separated for ANL generators. For generators that construct ufuns within negmas
+          (e.g. multi-issue pies), construction is counted under `values`.
+        - Generation is always serial as phase timing is only recorded in the current process.
+    """
+    best, phases, attempts = float("inf"), dict(), dict()
+    for _ in range(max(1, repeats)):
+        with record_generation_phases() as times, record_generation_stats() as stats:
+            start = perf_counter()
+            generated = generator(n_scenarios, n_outcomes, seed=seed, njobs=-1)
+            seconds = perf_counter() - start
+        n_generated = len(generated)
+        del generated
+        if seconds < best:
+            best, phases, attempts = seconds, dict(times), dict(stats)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            generator(n_scenarios, n_outcomes, seed=seed, njobs=-1)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    phases = {k: phases.get(k, 0.0) for k in PHASES}
+    phases["other"] = max(0.0, best - sum(phases.values()))
+    return dict(
+        n_scenarios=n_scenarios,
+        n_outcomes=n_outcomes,
+        n_generated=n_generated,
+        seconds=best,
+        scenarios_per_second=n_generated / best if best > 0 else float("inf"),
+        peak_memory=peak,
+        phases=phases,
+        attempts=attempts,
+    )
+
+
+def bench_generators(
+    generators: Sequence[str] | dict[str, Callable] | None = None,
+    n_outcomes: Sequence[int] = DEFAULT_BENCH_OUTCOMES,
+    n_scenarios: Sequence[int] = DEFAULT_BENCH_SCENARIOS,
+    seed: int = 0,
+    repeats: int = 1,
+    memory: bool = True,
+    time_budget: float | None = 60.0,
+    verbosity: int = 0,
+) -> dict[str, Any]:
+    """Benchmarks scenario generators over a grid of scenario and outcome counts.
+
+    Args:
+        generators: Names of generators in `BENCH_GENERATORS` or a mapping from names to generators. None for all of `BENCH_GENERATORS`.
+        n_outcomes: Numbers of outcomes to try
+        n_scenarios: Numbers of scenarios to try
+        seed: Seed used for all generation
+        repeats: Number of timed runs per configuration (see `bench_generator`)
+        memory: Measure peak memory
+        time_budget: If a configuration takes more than this number of seconds, larger numbers of outcomes are skipped
+                     for the same generator. None for no limit.
+        verbosity: If positive, every result is printed as soon as it is available
+
+    Returns:
+        A json-serializable dict with the versions of anl, negmas, numpy and python and a list of `results`.
+        Each result is the output of `bench_generator` with the generator name added (and `skipped=True` for skipped configurations).
+    """
+    from anl import __version__
+
+    if generators is None:
+        generators = BENCH_GENERATORS
+    elif not isinstance(generators, dict):
+        generators = {_: BENCH_GENERATORS[_] for _ in generators}
+    results = []
+    for name, generator in generators.items():
+        exceeded = False
+        for n in sorted(n_outcomes):
+            for m in sorted(n_scenarios):
+                if exceeded:
+                    results.append(
+                        dict(generator=name, n_scenarios=m, n_outcomes=n, skipped=True)
+                    )
+                    continue
+                result = dict(generator=name) | bench_generator(
+                    generator, m, n, seed=seed, repeats=repeats, memory=memory
+                )
+                results.append(result)
+                if verbosity > 0:
+                    print(result, flush=True)
+                if time_budget is not None and result["seconds"] > time_budget:
+                    exceeded = True
+    return dict(
+        anl=__version__,
+        negmas=negmas.__version__,
+        numpy=np.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        created=datetime.datetime.now().isoformat(),
+        seed=seed,
+        results=results,
+    )
@@ -0,0 +1,212 @@
+"""
+A content-addressed on-disk cache for generated scenarios.
+"""
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+import negmas
+from negmas.inout import Scenario
+
+__all__ = ["ScenarioCache", "DEFAULT_CACHE_PATH", "DEFAULT_CACHE_SIZE"]
+
+DEFAULT_CACHE_PATH = Path.home() / "negmas" / "anl2024" / "cache"
+"""Default location of the scenario cache"""
+
+DEFAULT_CACHE_SIZE = 1 << 30
+"""Default maximum size of the scenario cache in bytes (1GB)"""
+
+CACHE_FILE_EXT = ".pkl"
+
+
+def _generator_name(generator: str | Callable) -> str:
+    if isinstance(generator, str):
+        return generator
+    return f"{getattr(generator, '__module__', '')}.{getattr(generator, '__qualname__', repr(generator))}"
+
+
+class ScenarioCache:
+    """Caches lists of generated scenarios on disk keyed by everything that affects their generation.
+
+    Args:
+        path: The folder to store cached scenarios in. Created if it does not exist.
+        max_size: Maximum total size in bytes of all cached entries. Least recently used
+                  entries are removed whenever this size is exceeded. Zero or negative
+                  means no limit.
+
+    Remarks:
+        - Entries are keyed by a hash of the generator name, its parameters, the number of
+          scenarios and outcomes, the seed and the versions of anl and negmas. Changing any of
+          these results in a cache miss.
+        - Each entry is a single file of scenarios pickled one after the other so that it can be written while
+          scenarios are generated. The modification time of the file is updated on every hit and is used to decide
+          which entries to evict.
+        - Only seeded generation should be cached. Unseeded generation is supposed to produce
+          different scenarios every time.
+    """
+
+    def __init__(
+        self, path: Path | str = DEFAULT_CACHE_PATH, max_size: int = DEFAULT_CACHE_SIZE
+    ):
+        self.path = Path(path).expanduser().absolute()
+        self.max_size = max_size
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(
+        generator: str | Callable,
+        n_scenarios: int,
+        n_outcomes: int | tuple[int, int] | list[int],
+        seed: int | None,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        """Returns the cache key for the given generation configuration"""
+        from anl import __version__
+
+        config = dict(
+            generator=_generator_name(generator),
+            n_scenarios=n_scenarios,
+            n_outcomes=(
+                list(n_outcomes)
+                if isinstance(n_outcomes, (tuple, list))
+                else n_outcomes
+            ),
+            seed=seed,
+            params=params if params else dict(),
+            anl=__version__,
+            negmas=negmas.__version__,
+        )
+        encoded = json.dumps(config, sort_keys=True, default=repr)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}{CACHE_FILE_EXT}"
+
+    def __contains__(self, key: str) -> bool:
+        return self._file(key).is_file()
+
+    def get(self, key: str) -> list[Scenario] | None:
+        """Returns the scenarios stored under `key` or None if they are not cached (or cannot be read)"""
+        file = self._file(key)
+        scenarios = []
+        try:
+            with open(file, "rb") as f:
+                while True:
+                    try:
+                        s = pickle.load(f)
+                    except EOFError:
+                        break
+                    if not isinstance(s, Scenario):
+                        raise TypeError(f"Unexpected {type(s)} in cache entry {key}")
+                    scenarios.append(s)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # a corrupted entry is treated as a miss and removed
+            file.unlink(missing_ok=True)
+            return None
+        os.utime(file)
+        return scenarios
+
+    def put(self, key: str, scenarios: Iterable[Scenario]) -> None:
+        """Stores the scenarios under `key` then evicts old entries if needed"""
+        for _ in self._write(key, scenarios):
+            pass
+
+    def _write(self, key: str, scenarios: Iterable[Scenario]) -> Iterator[Scenario]:
+        """Yields the scenarios writing each of them to the entry of `key` and stores the entry once all are written.
+
+        Remarks:
+            - Only the scenario being yielded is kept in memory. The entry is written to a temporary file and
+              replaces any existing entry only when `scenarios` is exhausted so that readers never see a partial entry.
+            - If consumption stops early (or fails), nothing is stored.
+        """
+        file = self._file(key)
+        tmp = file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                for s in scenarios:
+                    pickle.dump(s, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    yield s
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, file)
+        self.evict()
+
+    def size(self) -> int:
+        """Total size in bytes of all cached entries"""
+        return sum(_.stat().st_size for _ in self.path.glob(f"*{CACHE_FILE_EXT}"))
+
+    def evict(self, max_size: int | None = None) -> list[str]:
+        """Removes least recently used entries until the cache is not larger than `max_size`.
+
+        Args:
+            max_size: The size to shrink the cache to. If None, the size given during construction is used.
+
+        Returns:
+            The keys of removed entries.
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if max_size <= 0:
+            return []
+        entries = []
+        for file in self.path.glob(f"*{CACHE_FILE_EXT}"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        total = sum(_[1] for _ in entries)
+        removed = []
+        for _, size, file in sorted(entries, key=lambda x: x[0]):
+            if total <= max_size:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
+            removed.append(file.stem)
+        return removed
+
+    def clear(self) -> None:
+        """Removes all cached entries"""
+        for file in self.path.glob(f"*{CACHE_FILE_EXT}"):
+            file.unlink(missing_ok=True)
+
+    def generate(
+        self,
+        generator: Callable[..., list[Scenario]],
+        n_scenarios: int,
+        n_outcomes: int | tuple[int, int] | list[int],
+        **kwargs,
+    ) -> list[Scenario] | Iterator[Scenario]:
+        """Returns cached scenarios for this configuration generating (and caching) them on a miss.
+
+        Args:
+            generator: The scenario generator. Called as `generator(n_scenarios, n_outcomes, **kwargs)` on a miss.
+            n_scenarios: Number of scenarios to generate
+            n_outcomes: Number of outcomes (or a min/max range) passed to the generator
+            kwargs: Other parameters passed to the generator. The cache is bypassed if `seed` is
+                    not one of them (or is None). `njobs` and `lazy` do not affect the key.
+
+        Remarks:
+            - If the generator returns an iterator (e.g. when called with `lazy=True`), it is returned
+              wrapped so that every scenario is written to the cache as it is consumed and the entry is stored once
+              it is exhausted.
+        """
+        seed = kwargs.get("seed", None)
+        if seed is None:
+            return generator(n_scenarios, n_outcomes, **kwargs)
+        params = {k: v for k, v in kwargs.items() if k not in ("njobs", "seed", "lazy")}
+        key = self.key(generator, n_scenarios, n_outcomes, seed, params)
+        scenarios = self.get(key)
+        if scenarios is not None:
+            return scenarios
+        scenarios = generator(n_scenarios, n_outcomes, **kwargs)
+        if not isinstance(scenarios, (list, tuple)):
+            return self._write(key, scenarios)
+        self.put(key, scenarios)
+        return scenarios
@@ -0,0 +1,334 @@
+"""
+Distributed execution of tournaments: a coordinator serving negotiations over TCP to workers on any number of hosts.
+"""
+import itertools
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future
+from multiprocessing import get_context
+from multiprocessing.managers import BaseManager
+from typing import Callable
+
+__all__ = [
+    "DistributedExecutor",
+    "run_worker",
+    "parse_address",
+    "DEFAULT_PORT",
+    "AUTHKEY_ENV",
+]
+
+DEFAULT_PORT = 51966
+"""Default TCP port the coordinator listens on"""
+
+AUTHKEY_ENV = "ANL_AUTHKEY"
+"""Environment variable giving the key shared by the coordinator and its workers if none is passed"""
+
+_STOP = None
+"""Put in the task queue to stop workers. Every worker puts it back so that all of them see it"""
+
+
+def parse_address(
+    address: str | tuple[str, int], default_host: str = "127.0.0.1"
+) -> tuple[str, int]:
+    """Parses an address given as `host:port`, `host` or `:port` (or a tuple) into a (host, port) tuple"""
+    if isinstance(address, tuple):
+        return address[0] or default_host, int(address[1])
+    address = str(address)
+    if ":" not in address:
+        return address or default_host, DEFAULT_PORT
+    host, port = address.rsplit(":", 1)
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+def _authkey(authkey: str | bytes | None) -> bytes | None:
+    """The key given or read from the environment (None if neither is available)"""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV, None)
+    if not authkey:
+        return None
+    return authkey if isinstance(authkey, bytes) else authkey.encode()
+
+
+class _TaskQueue(queue.Queue):
+    """The queue of tasks served to workers. Tasks are claimed by workers through it so that the coordinator knows
+    which worker runs every task and tasks that are no longer pending (e.g. cancelled) are dropped"""
+
+    def __init__(self, claim: Callable[[tuple, str], bool]):
+        super().__init__()
+        self._claim = claim
+
+    def claim(self, worker_id: str, timeout: float) -> tuple | None:
+        """Takes the next task for a worker (raises `queue.Empty` if none is queued within `timeout` seconds)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            task = self.get(timeout=max(0.0, deadline - time.monotonic()))
+            if task is _STOP or self._claim(task, worker_id):
+                return task
+
+
+def _broker_type() -> type[BaseManager]:
+    # registrations are stored on the class so every broker gets its own class
+    return type("Broker", (BaseManager,), {})
+
+
+def run_worker(
+    address: str | tuple[str, int],
+    authkey: str | bytes | None = None,
+    max_tasks: int | None = None,
+    connect_timeout: float = 60.0,
+    poll: float = 1.0,
+    heartbeat: float = 5.0,
+) -> int:
+    """Runs tasks served by a coordinator (see `DistributedExecutor`) until it stops.
+
+    Args:
+        address: The address of the coordinator as `host:port` or a (host, port) tuple
+        authkey: The key shared with the coordinator. Read from the `ANL_AUTHKEY` environment variable if not given.
+        max_tasks: Maximum number of tasks to run before returning. None for no limit.
+        connect_timeout: Seconds to keep trying to connect to a coordinator that is not listening yet
+        poll: Seconds between checks for new tasks (or connection attempts)
+        heartbeat: Seconds between messages telling the coordinator that this worker is alive (see `worker_timeout` in
+                   `DistributedExecutor`)
+
+    Returns:
+        The number of tasks run.
+
+    Remarks:
+        - Tasks are pickled so the worker must be able to import everything used by them (e.g. the competitors).
+        - The worker returns when the coordinator stops or cannot be reached anymore.
+    """
+    key = _authkey(authkey)
+    if key is None:
+        raise ValueError(
+            f"No key to present to the coordinator: pass the key it printed or set {AUTHKEY_ENV}"
+        )
+    broker = _broker_type()
+    broker.register("tasks")
+    broker.register("results")
+    manager = broker(address=parse_address(address), authkey=key)
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except (ConnectionError, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(poll)
+    tasks, results = manager.tasks(), manager.results()  # type: ignore
+    worker_id, done = uuid.uuid4().hex, threading.Event()
+
+    def beat():
+        # proxies open a connection per thread so this never interleaves with the messages of the worker
+        while True:
+            try:
+                results.put(("alive", worker_id))
+            except Exception:
+                break
+            if done.wait(heartbeat):
+                break
+
+    threading.Thread(target=beat, daemon=True).start()
+    n = 0
+    try:
+        while max_tasks is None or n < max_tasks:
+            try:
+                task = tasks.claim(worker_id, poll)
+            except queue.Empty:
+                continue
+            except (EOFError, ConnectionError, OSError):
+                break
+            if task is _STOP:
+                tasks.put(_STOP)
+                break
+            task_id, fn, args, kwargs = task
+            try:
+                try:
+                    result = ("result", worker_id, task_id, True, fn(*args, **kwargs))
+                except Exception as e:
+                    result = ("result", worker_id, task_id, False, e)
+                try:
+                    results.put(result)
+                except (EOFError, ConnectionError, OSError):
+                    raise
+                except Exception as e:
+                    # the result or exception could not be pickled
+                    results.put(
+                        ("result", worker_id, task_id, False, RuntimeError(repr(e)))
+                    )
+            except (EOFError, ConnectionError, OSError):
+                break
+            n += 1
+    finally:
+        done.set()
+    return n
+
+
+class DistributedExecutor(Executor):
+    """An executor running tasks on workers that connect to it over TCP (see `run_worker`).
+
+    Args:
+        address: The address to listen on as `host:port` or a (host, port) tuple. Use port zero to pick a free port
+                 (see `address` for the actual one) and host `0.0.0.0` to accept workers from other hosts.
+        authkey: The key workers must present. Read from the `ANL_AUTHKEY` environment variable if not given. If neither
+                 is available, a random key is generated (see `authkey`) so that workers on other hosts need it to connect.
+        local_workers: Number of worker processes to start on this machine.
+        worker_timeout: Seconds without any message (see `heartbeat` in `run_worker`) after which a worker is considered
+                        dead and the tasks it claimed are queued again. Tasks of live workers are never queued again
+                        however long they take.
+
+    Remarks:
+        - Workers pull one task at a time from a queue and send the result back as soon as it is ready so faster
+          workers simply run more tasks.
+        - Tasks and results are pickled. Only use it on trusted networks with a secret key.
+        - Tasks whose futures are cancelled are dropped when a worker takes them from the queue.
+        - `max_workers` is the number of workers connected (or starting on this machine) at any time so users of the
+          executor (e.g. `streaming_tournament`) queue more tasks ahead as workers join.
+        - Shutting down stops all workers (including those on other hosts). It waits for all pending tasks which never
+          hangs on dead workers as their tasks are queued again for the workers that are still alive.
+    """
+
+    def __init__(
+        self,
+        address: str | tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+        authkey: str | bytes | None = None,
+        local_workers: int = 0,
+        worker_timeout: float = 60.0,
+    ):
+        self.worker_timeout = worker_timeout
+        key = _authkey(authkey)
+        if key is None:
+            key = secrets.token_hex(16).encode()
+        self._authkey = key
+        self._tasks, self._results = _TaskQueue(self._claim), queue.Queue()
+        broker = _broker_type()
+        broker.register("tasks", callable=lambda: self._tasks)
+        broker.register("results", callable=lambda: self._results)
+        host, port = parse_address(address)
+        self._server = broker(address=(host, port), authkey=key).get_server()
+        self._ids = itertools.count()
+        # task id -> [future, task, id of the worker running it]
+        self._pending: dict[int, list] = dict()
+        # worker id -> time of its last message
+        self._seen: dict[str, float] = dict()
+        self._lock = threading.Lock()
+        self._closed, self._stopped = threading.Event(), threading.Event()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+        # spawned (not forked) as this process already runs threads
+        context = get_context("spawn")
+        self._workers = [
+            context.Process(target=run_worker, args=(self.address, key), daemon=True)
+            for _ in range(local_workers)
+        ]
+        for p in self._workers:
+            p.start()
+
+    @property
+    def authkey(self) -> str:
+        """The key workers must present (e.g. to print it if it was generated)"""
+        return self._authkey.decode()
+
+    @property
+    def max_workers(self) -> int:
+        """The number of workers connected to the coordinator (at least the number of local workers)"""
+        with self._lock:
+            return max(len(self._seen), len(self._workers), 1)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The address workers should connect to"""
+        host, port = self._server.address
+        if host in ("", "0.0.0.0"):
+            host = "127.0.0.1"
+        return host, port
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        if self._closed.is_set():
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        future = Future()
+        task = (next(self._ids), fn, args, kwargs)
+        with self._lock:
+            self._pending[task[0]] = [future, task, None]
+        self._tasks.put(task)
+        return future
+
+    def _claim(self, task: tuple, worker_id: str) -> bool:
+        """Records that a worker runs a task. False if the task is not pending anymore (e.g. its future was cancelled)"""
+        with self._lock:
+            self._seen[worker_id] = time.monotonic()
+            entry = self._pending.get(task[0], None)
+            if entry is None or entry[0].cancelled():
+                self._pending.pop(task[0], None)
+                return False
+            entry[2] = worker_id
+            return True
+
+    def _requeue_lost(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            dead = {w for w, t in self._seen.items() if now - t > self.worker_timeout}
+            for w in dead:
+                del self._seen[w]
+            for entry in self._pending.values():
+                if entry[2] in dead:
+                    entry[2] = None
+                    self._tasks.put(entry[1])
+
+    def _collect(self) -> None:
+        last_check = time.monotonic()
+        while not self._stopped.is_set():
+            if time.monotonic() - last_check > 0.2:
+                last_check = time.monotonic()
+                self._requeue_lost()
+            try:
+                message = self._results.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            kind, worker_id, *rest = message
+            with self._lock:
+                self._seen[worker_id] = time.monotonic()
+                if kind != "result":
+                    continue
+                task_id, ok, value = rest
+                entry = self._pending.pop(task_id, None)
+            # results of tasks queued again may arrive twice
+            if entry is None or not entry[0].set_running_or_notify_cancel():
+                continue
+            if ok:
+                entry[0].set_result(value)
+            else:
+                entry[0].set_exception(value)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        if self._stopped.is_set():
+            return
+        self._closed.set()
+        if cancel_futures:
+            with self._lock:
+                for future, *_ in self._pending.values():
+                    future.cancel()
+            while True:
+                try:
+                    self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+        while wait:
+            with self._lock:
+                if all(_[0].done() for _ in self._pending.values()):
+                    break
+            time.sleep(0.05)
+        self._tasks.put(_STOP)
+        self._stopped.set()
+        self._collector.join()
+        for p in self._workers:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+        self._server.stop_event.set()
+        self._server.listener.close()
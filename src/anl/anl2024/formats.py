@@ -0,0 +1,230 @@
+"""
+A compact binary format for scenarios with discrete issues and linear-additive ufuns.
+"""
+import json
+import warnings
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from negmas.inout import Scenario, find_domain_and_utility_files_yaml
+from negmas.outcomes import ContiguousIssue, Issue, make_issue, make_os
+from negmas.preferences import LinearAdditiveUtilityFunction as U
+
+from anl.anl2024.ufuns import ArrayFun, make_index
+
+__all__ = [
+    "save_scenario",
+    "load_scenario",
+    "is_scenario",
+    "save_binary_scenario",
+    "load_binary_scenario",
+    "has_binary_scenario",
+    "BINARY_SCENARIO_FILE_NAME",
+]
+
+BINARY_SCENARIO_FILE_NAME = "scenario.npz"
+"""Name of the file storing a scenario in binary format inside the scenario folder"""
+
+BINARY_FORMAT_VERSION = 1
+
+
+def _issue_values(issue: Issue) -> np.ndarray | None:
+    """The values of an issue as an array or None if they would not load back unchanged (e.g. mixed types)"""
+    original = list(issue.all)
+    values = np.asarray(original)
+    if values.dtype.kind not in "biufU":
+        return None
+    if any(
+        type(a) is not type(b) or a != b for a, b in zip(values.tolist(), original)
+    ):
+        return None
+    return values
+
+
+def _remove_binary_scenario(path: Path) -> None:
+    (path / BINARY_SCENARIO_FILE_NAME).unlink(missing_ok=True)
+
+
+def _remove_text_scenario(path: Path) -> None:
+    if not path.is_dir():
+        return
+    domain, ufuns = find_domain_and_utility_files_yaml(path)
+    for f in ([domain] if domain is not None else []) + list(ufuns):
+        Path(f).unlink(missing_ok=True)
+
+
+def _fun_values(fun, issue: Issue) -> np.ndarray:
+    if isinstance(fun, ArrayFun):
+        return np.asarray(fun.values, dtype=float)
+    return np.fromiter((float(fun(_)) for _ in issue.all), dtype=float)
+
+
+def has_binary_scenario(path: Path | str) -> bool:
+    """Checks whether the given folder contains a scenario in binary format"""
+    return (Path(path) / BINARY_SCENARIO_FILE_NAME).is_file()
+
+
+def save_binary_scenario(
+    scenario: Scenario, path: Path | str, compress: bool = False
+) -> bool:
+    """Saves a scenario in binary format inside the given folder.
+
+    Args:
+        scenario: The scenario to save
+        path: The folder to save the scenario in (created if it does not exist)
+        compress: If given, arrays are compressed (smaller files but slower to save and load)
+
+    Returns:
+        True if the scenario was saved. False if it cannot be represented in binary format (i.e. it has
+        issues that are not discrete or ufuns that are not linear-additive) in which case nothing is saved.
+
+    Remarks:
+        - The file contains the outcome-space (issue names and values), and for every ufun its name,
+          reserved value, weights, bias and the value of every issue value as numpy arrays.
+        - Loaded ufuns are linear-additive with `ArrayFun` value functions giving the same utilities.
+    """
+    os = scenario.outcome_space
+    issues = os.issues
+    arrays: dict[str, np.ndarray] = dict()
+    meta: dict[str, Any] = dict(
+        version=BINARY_FORMAT_VERSION,
+        name=os.name,
+        issues=[],
+        ufuns=[],
+        info=scenario.info,
+    )
+    for k, issue in enumerate(issues):
+        if isinstance(issue, ContiguousIssue):
+            meta["issues"].append(
+                dict(
+                    name=issue.name, min=int(issue.min_value), max=int(issue.max_value)
+                )
+            )
+            continue
+        if not issue.is_discrete():
+            return False
+        values = _issue_values(issue)
+        if values is None:
+            return False
+        arrays[f"issue{k}"] = values
+        meta["issues"].append(dict(name=issue.name))
+    for j, u in enumerate(scenario.ufuns):
+        if not isinstance(u, U) or len(u.values) != len(issues):
+            return False
+        for k, (fun, issue) in enumerate(zip(u.values, issues)):
+            arrays[f"ufun{j}_{k}"] = _fun_values(fun, issue)
+        arrays[f"ufun{j}_weights"] = np.asarray(u.weights, dtype=float)
+        meta["ufuns"].append(
+            dict(
+                name=u.name,
+                reserved_value=float(u.reserved_value),
+                bias=float(u._bias),
+            )
+        )
+    try:
+        encoded = json.dumps(meta)
+    except TypeError:
+        meta["info"] = dict()
+        encoded = json.dumps(meta)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    tmp = path / f"{BINARY_SCENARIO_FILE_NAME}.tmp.npz"
+    save = np.savez_compressed if compress else np.savez
+    save(tmp, meta=np.asarray(encoded), **arrays)
+    tmp.replace(path / BINARY_SCENARIO_FILE_NAME)
+    return True
+
+
+def load_binary_scenario(path: Path | str) -> Scenario:
+    """Loads a scenario saved with `save_binary_scenario` from the given folder"""
+    with np.load(Path(path) / BINARY_SCENARIO_FILE_NAME) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["version"] > BINARY_FORMAT_VERSION:
+            raise ValueError(
+                f"Binary scenario format version {meta['version']} is not supported"
+            )
+        issues, indices, offsets = [], [], []
+        for k, d in enumerate(meta["issues"]):
+            if "min" in d:
+                issues.append(make_issue((d["min"], d["max"]), name=d["name"]))
+                indices.append(None)
+                offsets.append(d["min"])
+                continue
+            values = data[f"issue{k}"].tolist()
+            issues.append(make_issue(values, name=d["name"]))
+            # all ufuns share the same index from issue values to array positions
+            indices.append(make_index(values))
+            offsets.append(0)
+        os = make_os(issues, name=meta["name"])
+        ufuns = tuple(
+            U(
+                values=tuple(
+                    ArrayFun(data[f"ufun{j}_{k}"], index, offset)
+                    for k, (index, offset) in enumerate(zip(indices, offsets))
+                ),
+                weights=data[f"ufun{j}_weights"].tolist(),
+                bias=d["bias"],
+                reserved_value=d["reserved_value"],
+                name=d["name"],
+                outcome_space=os,
+            )
+            for j, d in enumerate(meta["ufuns"])
+        )
+    return Scenario(outcome_space=os, ufuns=ufuns, info=meta["info"])  # type: ignore
+
+
+def is_scenario(path: Path | str) -> bool:
+    """Checks whether a scenario can be loaded from the given folder in any format"""
+    return has_binary_scenario(path) or Scenario.is_loadable(path)
+
+
+def save_scenario(
+    scenario: Scenario,
+    path: Path | str,
+    text: bool = True,
+    binary: bool = True,
+    compress: bool = False,
+) -> None:
+    """Saves a scenario in text (yaml) format, binary format or both.
+
+    Args:
+        scenario: The scenario to save
+        path: The folder to save the scenario in
+        text: Save the scenario in the yaml format readable by NegMAS (`Scenario.load`)
+        binary: Save the scenario in binary format (see `save_binary_scenario`)
+        compress: Compress the binary format
+
+    Remarks:
+        - If the scenario cannot be saved in binary format, it is saved in text format even if `text` is False.
+        - Files of any older scenario saved in the folder are removed (including those of the format not saved)
+          so that it is never loaded instead (see `load_scenario`).
+    """
+    path = Path(path)
+    if binary and save_binary_scenario(scenario, path, compress=compress):
+        if not text:
+            _remove_text_scenario(path)
+            return
+    else:
+        _remove_binary_scenario(path)
+    _remove_text_scenario(path)
+    scenario.dumpas(path)
+
+
+def load_scenario(path: Path | str, safe_parsing: bool = False) -> Scenario | None:
+    """Loads a scenario from a folder using the binary format if available.
+
+    Args:
+        path: The folder containing the scenario
+        safe_parsing: Passed to `Scenario.load` when loading the text format
+
+    Remarks:
+        - If the binary format is present it takes precedence over the text format in the same folder.
+          If it cannot be read, the text format is loaded instead.
+    """
+    if has_binary_scenario(path):
+        try:
+            return load_binary_scenario(path)
+        except Exception as e:
+            warnings.warn(f"Could not load binary scenario from {path}: {e}")
+    return Scenario.load(path, safe_parsing=safe_parsing)
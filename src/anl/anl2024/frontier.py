@@ -0,0 +1,291 @@
+"""
+Fast Pareto frontier, Nash and Kalai point calculations for bilateral scenarios on numpy arrays.
+"""
+import itertools
+import math
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+from negmas.inout import UtilityFunction
+from negmas.outcomes import Outcome, OutcomeSpace
+
+from anl.anl2024.ufuns import issue_utilities, utility_grid
+
+__all__ = [
+    "outcome_at",
+    "outcome_utilities",
+    "iter_outcome_utilities",
+    "pareto_frontier_2d",
+    "streaming_pareto_frontier_2d",
+    "chunked_pareto_frontier_2d",
+    "nash_point_2d",
+    "kalai_point_2d",
+    "DEFAULT_CHUNK_SIZE",
+]
+
+DEFAULT_CHUNK_SIZE = 100_000
+"""Default number of outcomes evaluated at once when streaming utilities"""
+
+
+def outcome_at(outcome_space: OutcomeSpace, indx: int) -> Outcome:
+    """Returns the outcome with the given index (in enumeration order) of a discrete outcome-space without enumerating it"""
+    values = []
+    for issue in reversed(outcome_space.issues):  # type: ignore
+        indx, k = divmod(int(indx), issue.cardinality)
+        values.append(issue.value_at(k))
+    return tuple(reversed(values))
+
+
+def _same_outcome_space(ufuns: Sequence[UtilityFunction]) -> bool:
+    os = ufuns[0].outcome_space
+    return os is not None and all(
+        u.outcome_space is os or u.outcome_space == os for u in ufuns[1:]
+    )
+
+
+def _grid_utilities(ufuns: Sequence[UtilityFunction]) -> np.ndarray | None:
+    if not _same_outcome_space(ufuns):
+        return None
+    grids = []
+    for u in ufuns:
+        grid = utility_grid(u)
+        if grid is None:
+            return None
+        grids.append(grid)
+    return np.column_stack(grids)
+
+
+def outcome_utilities(
+    ufuns: Sequence[UtilityFunction], outcomes: Iterable[Outcome] | None = None
+) -> np.ndarray:
+    """Evaluates all ufuns on all outcomes.
+
+    Args:
+        ufuns: The utility functions
+        outcomes: The outcomes to evaluate. If not given, all outcomes of the outcome-space of the first ufun are used
+
+    Returns:
+        An array of shape (n_outcomes, n_ufuns) with the utility of every outcome for every ufun.
+
+    Remarks:
+        - If outcomes are not given and all ufuns are linear-additive over the same discrete outcome-space, utilities
+          are calculated on the outcome grid without evaluating outcomes one by one (see `utility_grid`).
+    """
+    if outcomes is None:
+        grids = _grid_utilities(ufuns)
+        if grids is not None:
+            return grids
+        os = ufuns[0].outcome_space
+        assert os is not None, "Cannot find the outcomes to evaluate"
+        outcomes = os.enumerate_or_sample()
+    outcomes = list(outcomes)
+    utils = np.empty((len(outcomes), len(ufuns)), dtype=float)
+    for j, u in enumerate(ufuns):
+        utils[:, j] = [float(u(_)) for _ in outcomes]
+    return utils
+
+
+def iter_outcome_utilities(
+    ufuns: Sequence[UtilityFunction],
+    outcomes: Iterable[Outcome] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+    """Evaluates all ufuns on outcomes in chunks without holding all outcomes in memory.
+
+    Args:
+        ufuns: The utility functions
+        outcomes: The outcomes to evaluate. If not given, all outcomes of the outcome-space of the first ufun are
+                  generated lazily in enumeration order (or sampled if the outcome-space is not discrete).
+        chunk_size: Maximum number of outcomes evaluated per chunk
+
+    Returns:
+        An iterator over arrays of shape (n, n_ufuns) with n at most `chunk_size` (see `outcome_utilities`).
+    """
+    if outcomes is None:
+        os = ufuns[0].outcome_space
+        assert os is not None, "Cannot find the outcomes to evaluate"
+        if _same_outcome_space(ufuns) and all(
+            issue_utilities(u) is not None for u in ufuns
+        ):
+            # linear-additive ufuns are evaluated on consecutive parts of the outcome grid
+            for start in range(0, int(os.cardinality), chunk_size):
+                yield np.column_stack(
+                    [utility_grid(u, start, start + chunk_size) for u in ufuns]
+                )
+            return
+        if os.is_discrete():
+            outcomes = itertools.product(*(_.all for _ in os.issues))  # type: ignore
+        else:
+            outcomes = os.enumerate_or_sample()
+    outcomes = iter(outcomes)
+    while chunk := list(itertools.islice(outcomes, chunk_size)):
+        yield outcome_utilities(ufuns, chunk)
+
+
+def pareto_frontier_2d(utils: np.ndarray) -> np.ndarray:
+    """Finds the Pareto frontier of a set of points in a two dimensional utility space in O(n log(n)).
+
+    Args:
+        utils: An array of shape (n, 2) with the utilities of both ufuns for every point.
+
+    Returns:
+        The indices in `utils` of the frontier points ordered by decreasing utility of the first ufun.
+
+    Remarks:
+        - Points are sorted by decreasing first utility (breaking ties by decreasing second utility) then swept
+          once keeping every point that improves on the best second utility seen so far.
+        - Only the first of a set of duplicate points is returned.
+    """
+    utils = np.asarray(utils, dtype=float)
+    if len(utils) == 0:
+        return np.empty(0, dtype=int)
+    order = np.lexsort((-utils[:, 1], -utils[:, 0]))
+    second = utils[order, 1]
+    best_before = np.empty_like(second)
+    best_before[0] = -np.inf
+    np.maximum.accumulate(second[:-1], out=best_before[1:])
+    return order[second > best_before]
+
+
+def _thin(utils: np.ndarray, eps: float) -> np.ndarray:
+    """Keeps the first (i.e. best for the first ufun) frontier point in every `eps` wide band of the second utility"""
+    bands = np.floor(utils[:, 1] / eps)
+    return np.flatnonzero(np.concatenate(([True], bands[1:] != bands[:-1])))
+
+
+def streaming_pareto_frontier_2d(
+    chunks: Iterable[np.ndarray], eps: float = 0.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the Pareto frontier of a stream of points in a two dimensional utility space by merging partial frontiers.
+
+    Args:
+        chunks: Arrays of shape (n, 2) with the utilities of consecutive blocks of points (see `iter_outcome_utilities`)
+        eps: If positive, only one frontier point is kept in every band of width `eps` of the second utility.
+
+    Returns:
+        A tuple with the indices of frontier points (counted over all chunks) and an array of shape (n, 2) with their
+        utilities, both ordered by decreasing utility of the first ufun.
+
+    Remarks:
+        - Only the current chunk and the frontier found so far are kept in memory.
+        - With `eps` zero, the result is exactly the same as `pareto_frontier_2d` on all points.
+        - With a positive `eps`, for every point of the exact frontier there is a returned point with at least the same
+          first utility and a second utility smaller by less than `eps`. At most `1 + range / eps` points are kept where
+          `range` is the range of the second utility so memory is bounded independently of the number of points.
+    """
+    indices = np.empty(0, dtype=int)
+    utils = np.empty((0, 2), dtype=float)
+    n_seen = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=float)
+        if not len(chunk):
+            continue
+        indices = np.concatenate((indices, np.arange(n_seen, n_seen + len(chunk))))
+        utils = np.concatenate((utils, chunk))
+        n_seen += len(chunk)
+        # the partial frontier comes first so ties keep the earliest point
+        frontier = pareto_frontier_2d(utils)
+        if eps > 0:
+            frontier = frontier[_thin(utils[frontier], eps)]
+        indices, utils = indices[frontier], utils[frontier]
+    return indices, utils
+
+
+def chunked_pareto_frontier_2d(
+    ufuns: Sequence[UtilityFunction],
+    outcomes: Iterable[Outcome] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    eps: float = 0.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the (approximate) Pareto frontier of two ufuns evaluating outcomes in chunks.
+
+    Args:
+        ufuns: The two utility functions
+        outcomes: The outcomes to consider. If not given, all outcomes of the outcome-space are generated lazily.
+        chunk_size: Maximum number of outcomes evaluated at once
+        eps: Approximation level (see `streaming_pareto_frontier_2d`). Zero for the exact frontier.
+
+    Returns:
+        A tuple with the indices of frontier outcomes and their utilities (see `streaming_pareto_frontier_2d`).
+    """
+    return streaming_pareto_frontier_2d(
+        iter_outcome_utilities(ufuns, outcomes, chunk_size), eps
+    )
+
+
+def nash_point_2d(
+    frontier: np.ndarray,
+    reserved: tuple[float, float] | Sequence[float | None] = (0.0, 0.0),
+    ranges: Sequence[tuple[float, float]] = ((0.0, 1.0), (0.0, 1.0)),
+    eps: float = 1e-12,
+) -> int | None:
+    """Finds the Nash bargaining solution on a bilateral frontier.
+
+    Args:
+        frontier: An array of shape (n, 2) with the utilities of frontier points
+        reserved: The reserved values of the two ufuns
+        ranges: The utility ranges of the two ufuns. The lower limit is replaced by the reserved value if it is larger
+        eps: Tolerance used for comparing Nash products
+
+    Returns:
+        The index in `frontier` of the Nash point (the first if there are ties) or None if the frontier is empty.
+
+    Remarks:
+        - This is equivalent to taking the first point returned by `negmas.preferences.ops.nash_points` but vectorized.
+    """
+    frontier = np.asarray(frontier, dtype=float)
+    if len(frontier) == 0:
+        return None
+    floors = []
+    for r, (mn, mx) in zip(reserved, ranges):
+        if not (math.isfinite(mn) and math.isfinite(mx)):
+            raise ValueError(f"Cannot find the Nash point for range ({mn}, {mx})")
+        if r is not None and math.isfinite(r) and r >= mn:
+            mn = r
+        if mx - mn <= eps:
+            return 0
+        floors.append(mn)
+    products = np.prod(frontier - np.asarray(floors), axis=1)
+    return int(np.flatnonzero(products >= products.max() - eps)[0])
+
+
+def kalai_point_2d(
+    frontier: np.ndarray,
+    reserved: tuple[float, float] | Sequence[float | None] = (0.0, 0.0),
+    ranges: Sequence[tuple[float, float]] = ((0.0, 1.0), (0.0, 1.0)),
+    eps: float = 1e-12,
+) -> int | None:
+    """Finds the Kalai (egalitarian) bargaining solution on a bilateral frontier.
+
+    Args:
+        frontier: An array of shape (n, 2) with the utilities of frontier points
+        reserved: The reserved values of the two ufuns
+        ranges: The utility ranges of the two ufuns. The lower limit is replaced by the reserved value if it is larger
+        eps: Tolerance used for comparing gains
+
+    Returns:
+        The index in `frontier` of the Kalai point (the first if there are ties) or None if no frontier point is rational.
+
+    Remarks:
+        - This is equivalent to taking the first point returned by `negmas.preferences.ops.kalai_points` but vectorized.
+    """
+    frontier = np.asarray(frontier, dtype=float)
+    if len(frontier) == 0:
+        return None
+    floors, rs = [], []
+    for r, (mn, mx) in zip(reserved, ranges):
+        if not (math.isfinite(mn) and math.isfinite(mx)):
+            raise ValueError(f"Cannot find the Kalai point for range ({mn}, {mx})")
+        r = float("-inf") if r is None else float(r)
+        if r >= mn:
+            mn = r
+        if mx - mn <= eps:
+            return 0
+        floors.append(mn)
+        rs.append(r)
+    gains = np.min(frontier - np.asarray(floors), axis=1)
+    gains[np.any(frontier < np.asarray(rs), axis=1)] = -np.inf
+    best = gains.max()
+    if not np.isfinite(best):
+        return None
+    return int(np.flatnonzero(gains >= best - eps)[0])
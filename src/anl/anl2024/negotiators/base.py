@@ -4,6 +4,8 @@ from negmas.sao.negotiators import SAONegotiator
 from negmas.sao.common import SAOState, SAOResponse
 from negmas.outcomes import Outcome, ExtendedOutcome
 
+from anl.anl2024.analytics import ScenarioAnalytics
+
 __all__ = ["ANLNegotiator"]
 
 
@@ -13,6 +15,19 @@ class ANLNegotiator(SAONegotiator):
         self.__last_offer: Outcome | None | int = 0
         self.__last_response: ResponseType | None = None
 
+    @property
+    def analytics(self) -> ScenarioAnalytics | None:
+        """Analytics of the current scenario calculated once by the tournament (see `ScenarioAnalytics`).
+
+        Remarks:
+            - Gives the utilities of all outcomes for this negotiator and its partner (reserved values are not
+              included), the Pareto frontier, Nash and Kalai points and outcomes sorted by utility for both sides.
+            - The same object is shared by all negotiations on the scenario and must not be modified.
+            - None if the negotiator is not running in an ANL tournament or the tournament was run without
+              `analytics` (see `anl2024_tournament`).
+        """
+        return self.private_info.get("analytics", None)
+
     @abstractmethod
     def __call__(self, state: SAOState, dest: str | None = None) -> SAOResponse: ...
 
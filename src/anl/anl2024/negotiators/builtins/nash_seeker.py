@@ -1,8 +1,14 @@
 import random
 
+import numpy as np
+
+from anl.anl2024.frontier import (
+    chunked_pareto_frontier_2d,
+    nash_point_2d,
+    outcome_at,
+)
 from anl.anl2024.negotiators.base import ANLNegotiator
 
-from negmas import nash_points, pareto_frontier
 from negmas.outcomes import Outcome
 from negmas.sao import ResponseType, SAOResponse, SAOState
 
@@ -40,16 +46,42 @@ class NashSeeker(ANLNegotiator):
         self.opponent_ufun.reserved_value = self._opponent_r
         # consider my and my parther's ufuns
         ufuns = (self.ufun, self.opponent_ufun)
-        # list all outcomes
-        outcomes = list(self.ufun.outcome_space.enumerate_or_sample())
-        # find the pareto-front and the nash point
-        frontier_utils, frontier_indices = pareto_frontier(ufuns, outcomes)
-        frontier_outcomes = [outcomes[_] for _ in frontier_indices]
-        my_frontier_utils = [_[0] for _ in frontier_utils]
-        nash = nash_points(ufuns, frontier_utils)  # type: ignore
+        analytics = self.analytics
+        if analytics is not None:
+            # use the frontier calculated once for the scenario. `pareto_frontier` only considers outcomes
+            # rational for both ufuns and a rational outcome is Pareto-optimal among rational outcomes exactly
+            # when it is Pareto-optimal among all outcomes so this is the same frontier it finds
+            reserved = (self.ufun.reserved_value, self._opponent_r)
+            rational = np.all(analytics.frontier_utilities >= reserved, axis=1)
+            frontier_utils = analytics.frontier_utilities[rational]
+            frontier_outcomes = analytics.outcomes(analytics.frontier[rational])
+            indx = nash_point_2d(frontier_utils, reserved, analytics.ranges)
+            nash = [] if indx is None else [(tuple(frontier_utils[indx]), indx)]
+        else:
+            # only continuous outcome-spaces need listing (a sample of) all outcomes
+            os = self.ufun.outcome_space
+            outcomes = None if os.is_discrete() else list(os.enumerate_or_sample())
+            # find the pareto-front (streaming utilities in chunks evaluated on the outcome grid
+            # if possible) and the nash point
+            reserved = (self.ufun.reserved_value, self._opponent_r)
+            frontier_indices, frontier_utils = chunked_pareto_frontier_2d(
+                ufuns, outcomes
+            )
+            # keep the rational part of the frontier as `pareto_frontier` does (see above)
+            rational = np.all(frontier_utils >= reserved, axis=1)
+            frontier_utils = frontier_utils[rational]
+            # frontier outcomes are found from their indices as with analytics
+            frontier_outcomes = [
+                outcome_at(os, _) if outcomes is None else outcomes[_]
+                for _ in frontier_indices[rational]
+            ]
+            ranges = [u.minmax() for u in ufuns]
+            indx = nash_point_2d(frontier_utils, reserved, ranges)
+            nash = [] if indx is None else [(tuple(frontier_utils[indx]), indx)]
+        my_frontier_utils = [float(_[0]) for _ in frontier_utils]
         if nash:
             # find my utility at the Nash Bargaining Solution.
-            my_nash_utility = nash[0][0][0]
+            my_nash_utility = float(nash[0][0][0])
         else:
             my_nash_utility = 0.5 * (float(self.ufun.max()) + self.ufun.reserved_value)
         # Set the acceptable utility limit
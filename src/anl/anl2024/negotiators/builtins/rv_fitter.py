@@ -1,8 +1,10 @@
 import random
 
+from anl.anl2024.frontier import outcome_utilities
 from anl.anl2024.negotiators.base import ANLNegotiator
 import numpy as np
 from negmas import Outcome, ResponseType, SAOResponse, SAOState
+from negmas.outcomes import DiscreteCartesianOutcomeSpace
 from scipy.optimize import curve_fit
 
 __all__ = ["RVFitter"]
@@ -67,6 +69,8 @@ class RVFitter(ANLNegotiator):
         # keeps track of the rational outcome set given our estimate of the
         # opponent reserved value and our knowledge of ours
         self._rational: list[tuple[float, float, Outcome]] = []
+        # utilities of all outcomes for us and the opponent (found once when first needed)
+        self._utilities: tuple[np.ndarray, list[Outcome]] | None = None
         self._enable_logging = enable_logging
 
     def __call__(self, state: SAOState, dest: str | None = None) -> SAOResponse:
@@ -85,17 +89,7 @@ class RVFitter(ANLNegotiator):
         ):
             # The rational set of outcomes sorted dependingly according to our utility function
             # and the opponent utility function (in that order).
-            self._rational = sorted(
-                [
-                    (my_util, opp_util, _)
-                    for _ in self.nmi.outcome_space.enumerate_or_sample(
-                        levels=10, max_cardinality=100_000
-                    )
-                    if (my_util := float(self.ufun(_))) > self.ufun.reserved_value
-                    and (opp_util := float(self.opponent_ufun(_)))
-                    > self.opponent_ufun.reserved_value
-                ],
-            )
+            self._rational = self._rational_outcomes()
         # If there are no rational outcomes (i.e. our estimate of the opponent rv is very wrogn),
         # then just revert to offering our top offer
         if not self._rational:
@@ -115,6 +109,51 @@ class RVFitter(ANLNegotiator):
         outcome = self._rational[indx][-1]
         return SAOResponse(ResponseType.REJECT_OFFER, outcome)
 
+    def _rational_outcomes(self) -> list[tuple[float, float, Outcome]]:
+        """Finds rational outcomes (given the estimated opponent reserved value) sorted by our then the opponent utility"""
+        assert self.ufun and self.opponent_ufun
+        analytics = self.analytics
+        os = self.ufun.outcome_space
+        if analytics is not None:
+            # use the utilities calculated once for the scenario by the tournament
+            utils, outcome = analytics.utilities, analytics.outcome
+        elif os is not None:
+            # evaluate both ufuns once on the same (capped) outcomes as before. Discrete cartesian spaces are
+            # always fully enumerated and evaluated on the outcome grid for linear-additive ufuns
+            if self._utilities is None:
+                outcomes = list(
+                    os.enumerate_or_sample(levels=10, max_cardinality=100_000)
+                )
+                grid = isinstance(os, DiscreteCartesianOutcomeSpace)
+                self._utilities = (
+                    outcome_utilities(
+                        (self.ufun, self.opponent_ufun), None if grid else outcomes
+                    ),
+                    outcomes,
+                )
+            utils, outcome = self._utilities[0], self._utilities[1].__getitem__
+        else:
+            utils, outcome = None, None
+        if utils is not None and outcome is not None:
+            mine, theirs = utils[:, 0], utils[:, 1]
+            order = np.lexsort((theirs, mine))
+            order = order[
+                (mine[order] > self.ufun.reserved_value)
+                & (theirs[order] > self.opponent_ufun.reserved_value)
+            ]
+            return [(float(mine[_]), float(theirs[_]), outcome(_)) for _ in order]
+        return sorted(
+            [
+                (my_util, opp_util, _)
+                for _ in self.nmi.outcome_space.enumerate_or_sample(
+                    levels=10, max_cardinality=100_000
+                )
+                if (my_util := float(self.ufun(_))) > self.ufun.reserved_value
+                and (opp_util := float(self.opponent_ufun(_)))
+                > self.opponent_ufun.reserved_value
+            ],
+        )
+
     def is_acceptable(self, state: SAOState) -> bool:
         # The acceptance strategy
         assert self.ufun and self.opponent_ufun
@@ -0,0 +1,251 @@
+"""
+Quick evaluation of negotiators on a small subset of scenarios representative of a larger set.
+"""
+import math
+import re
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+from scipy.stats import kendalltau
+
+__all__ = [
+    "scenario_features",
+    "representative_scenarios",
+    "weighted_ranking",
+    "ranking_distance",
+    "quick_eval_report",
+    "QUICK_EVAL_FILE_NAME",
+]
+
+QUICK_EVAL_FILE_NAME = "quick_eval.json"
+"""Name of the file storing the report of a quick evaluation in the tournament folder"""
+
+
+def _kind(name: str) -> str:
+    """The type of scenario (i.e. its generator) which is its name without the index and rotation suffixes"""
+    return re.sub(r"\d*(-\d+)?$", "", str(name))
+
+
+def _base_name(name: str, weights: Mapping[str, float]) -> str:
+    """The name of the scenario a (possibly rotated) scenario was created from"""
+    if name in weights:
+        return name
+    return re.sub(r"-\d+$", "", name)
+
+
+def scenario_features(profiles: pd.DataFrame) -> np.ndarray:
+    """Cheap features of scenarios used for clustering them.
+
+    Args:
+        profiles: Scenario profiles (see `profile_scenarios`) with one row per scenario
+
+    Returns:
+        An array with a row per scenario giving the standardized log number of outcomes, fraction of Pareto outcomes,
+        opposition, rational fraction, reserved values and Nash utilities followed by a one-hot encoding of the scenario type.
+
+    Remarks:
+        - The scenario type is its name without the trailing index (e.g. `DivideThePies` for `DivideThePies3`).
+    """
+    n = profiles["n_outcomes"].to_numpy(dtype=float)
+    columns = [np.log10(np.maximum(n, 1))]
+    if "n_pareto" in profiles:
+        columns.append(profiles["n_pareto"].to_numpy(dtype=float) / np.maximum(n, 1))
+    if "opposition" in profiles:
+        columns.append(
+            np.minimum(profiles["opposition"].to_numpy(dtype=float), math.sqrt(2))
+        )
+    for name in (
+        "rational_fraction",
+        "reserved_first",
+        "reserved_second",
+        "nash_first",
+        "nash_second",
+    ):
+        if name in profiles:
+            columns.append(profiles[name].to_numpy(dtype=float))
+    features = np.nan_to_num(np.column_stack(columns), nan=0.0, posinf=0.0)
+    std = features.std(axis=0)
+    features = (features - features.mean(axis=0)) / np.where(std > 0, std, 1.0)
+    kinds = pd.get_dummies(profiles["scenario"].map(_kind)).to_numpy(dtype=float)
+    return np.column_stack((features, kinds))
+
+
+def _kmeans(
+    x: np.ndarray, k: int, rng: np.random.Generator, iters: int = 50
+) -> np.ndarray:
+    """Clusters rows of x into (at most) k clusters using k-means++ initialization and returns the label of every row"""
+    centers = [x[rng.integers(len(x))]]
+    for _ in range(1, k):
+        d = np.min([((x - c) ** 2).sum(axis=1) for c in centers], axis=0)
+        if d.sum() <= 0:
+            break
+        centers.append(x[rng.choice(len(x), p=d / d.sum())])
+    centers = np.asarray(centers)
+    labels = np.zeros(len(x), dtype=int)
+    for _ in range(iters):
+        d = ((x[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = d.argmin(axis=1)
+        if _ and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for j in range(len(centers)):
+            if np.any(labels == j):
+                centers[j] = x[labels == j].mean(axis=0)
+    return labels
+
+
+def representative_scenarios(
+    profiles: pd.DataFrame, n: int, seed: int | None = None
+) -> tuple[list[int], list[int]]:
+    """Selects a subset of scenarios representing all of them.
+
+    Args:
+        profiles: Scenario profiles (see `profile_scenarios`) with one row per candidate scenario
+        n: Maximum number of scenarios to select
+        seed: Seed used for clustering
+
+    Returns:
+        The positions (in `profiles`) of the selected scenarios and the number of candidates each of them represents.
+
+    Remarks:
+        - Scenarios are clustered on cheap features (see `scenario_features`) and the scenario nearest to the center
+          of every cluster is selected. Fewer than `n` scenarios are selected if some clusters end up empty.
+        - If `n` is not less than the number of candidates, all of them are selected.
+    """
+    if n >= len(profiles):
+        return list(range(len(profiles))), [1] * len(profiles)
+    x = scenario_features(profiles)
+    labels = _kmeans(x, max(1, n), np.random.default_rng(seed))
+    selected, weights = [], []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        center = x[members].mean(axis=0)
+        nearest = members[((x[members] - center) ** 2).sum(axis=1).argmin()]
+        selected.append(int(nearest))
+        weights.append(len(members))
+    order = np.argsort(selected)
+    return [selected[_] for _ in order], [weights[_] for _ in order]
+
+
+def weighted_ranking(
+    scores: pd.DataFrame,
+    weights: Mapping[str, float],
+    final_score: tuple[str, str] = ("advantage", "mean"),
+) -> pd.DataFrame:
+    """Ranks strategies weighting every scenario by the number of scenarios it represents.
+
+    Args:
+        scores: Scores of a tournament (i.e. `SimpleTournamentResults.scores`)
+        weights: The weight of every scenario (by name). Rotated scenarios share the weight of their original scenario.
+        final_score: The metric and statistic used for scoring (as in `anl2024_tournament`)
+
+    Returns:
+        A data frame with the `strategy` and its `score` sorted from best to worst like `SimpleTournamentResults.final_scores`.
+    """
+    metric, stat = final_score
+    per_scenario = (
+        scores.groupby(["strategy", "scenario"])[metric].agg(stat).reset_index()
+    )
+    per_scenario["weight"] = [
+        weights.get(_base_name(_, weights), 1.0) for _ in per_scenario["scenario"]
+    ]
+    per_scenario["weighted"] = per_scenario[metric] * per_scenario["weight"]
+    grouped = per_scenario.groupby("strategy")
+    ranking = (grouped["weighted"].sum() / grouped["weight"].sum()).rename("score")
+    return ranking.sort_values(ascending=False).reset_index()
+
+
+def ranking_distance(a: pd.DataFrame, b: pd.DataFrame) -> dict[str, Any]:
+    """Compares two rankings of strategies (e.g. `final_scores` of a quick and a full run).
+
+    Returns:
+        A dict with Kendall's tau between the scores of strategies in both (`kendall_tau`, one for the same order),
+        the largest change of rank of any strategy (`max_rank_change`) and whether both have the same winner (`same_winner`).
+    """
+    a_ranks = {s: i for i, s in enumerate(a["strategy"])}
+    b_ranks = {s: i for i, s in enumerate(b["strategy"])}
+    common = [_ for _ in a_ranks if _ in b_ranks]
+    if len(common) < 2:
+        tau = 1.0
+    else:
+        tau = kendalltau(
+            [a_ranks[_] for _ in common], [b_ranks[_] for _ in common]
+        ).statistic
+        tau = 1.0 if math.isnan(tau) else float(tau)
+    return dict(
+        kendall_tau=tau,
+        max_rank_change=max((abs(a_ranks[_] - b_ranks[_]) for _ in common), default=0),
+        same_winner=bool(
+            len(a) and len(b) and a["strategy"].iloc[0] == b["strategy"].iloc[0]
+        ),
+    )
+
+
+def quick_eval_report(
+    scores: pd.DataFrame,
+    weights: Mapping[str, float],
+    n_candidates: int,
+    final_score: tuple[str, str] = ("advantage", "mean"),
+    n_bootstrap: int = 200,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Reports the ranking found by a quick evaluation and how sensitive it is to the weights of the selected scenarios.
+
+    Args:
+        scores: Scores of the quick run (i.e. `SimpleTournamentResults.scores`)
+        weights: The number of candidate scenarios represented by every selected scenario (by name)
+        n_candidates: Number of candidate scenarios
+        final_score: The metric and statistic used for scoring
+        n_bootstrap: Number of resamples of the weights
+        seed: Seed used for resampling
+
+    Returns:
+        A json-serializable dict with the selected scenarios and their `weights`, the weighted `ranking` and its mean
+        distance from the rankings found with resampled weights (`reweighted_kendall_tau`, `reweighted_max_rank_change`
+        and `reweighted_winner_stability` which is the fraction of resamples with the same winner).
+
+    Remarks:
+        - Weights are resampled by drawing `n_candidates` scenarios with replacement from the selected ones in proportion
+          to their weights and ranking strategies on them (see `ranking_distance`).
+        - Every drawn scenario is scored as the scenario selected for its cluster so the differences between the scenarios
+          of a cluster are ignored. These fields only measure the sensitivity of the ranking to the weights and do not
+          bound its distance from the ranking of a full run. Run a full tournament and use `ranking_distance` to find it.
+    """
+    ranking = weighted_ranking(scores, weights, final_score)
+    metric, stat = final_score
+    per_scenario = (
+        scores.assign(scenario=[_base_name(_, weights) for _ in scores["scenario"]])
+        .groupby(["scenario", "strategy"])[metric]
+        .agg(stat)
+        .unstack()
+    )
+    names = list(per_scenario.index)
+    p = np.asarray([weights.get(_, 1.0) for _ in names], dtype=float)
+    rng = np.random.default_rng(seed)
+    distances = []
+    for _ in range(n_bootstrap if len(names) > 1 else 0):
+        counts = np.bincount(
+            rng.choice(len(names), size=n_candidates, p=p / p.sum()),
+            minlength=len(names),
+        )
+        sampled = per_scenario.mul(counts, axis=0).sum() / counts.sum()
+        resampled = sampled.sort_values(ascending=False).rename("score").reset_index()
+        distances.append(ranking_distance(ranking, resampled))
+    return dict(
+        n_candidates=n_candidates,
+        n_selected=len(weights),
+        weights=dict(weights),
+        ranking=ranking.to_dict(orient="records"),
+        reweighted_kendall_tau=(
+            float(np.mean([_["kendall_tau"] for _ in distances])) if distances else 1.0
+        ),
+        reweighted_max_rank_change=(
+            float(np.mean([_["max_rank_change"] for _ in distances]))
+            if distances
+            else 0.0
+        ),
+        reweighted_winner_stability=(
+            float(np.mean([_["same_winner"] for _ in distances])) if distances else 1.0
+        ),
+    )
@@ -0,0 +1,174 @@
+"""
+Racing tournaments: running repetitions in rounds and skipping those that can no longer change the ranking.
+"""
+import math
+from collections import defaultdict
+from typing import Any, Callable, Iterable
+
+from negmas.tournaments.neg.simple import SimpleTournamentResults
+from negmas.tournaments.neg.simple.cartesian import make_scores
+from rich import print
+from scipy.stats import t as student_t
+
+from anl.anl2024.tournament import RunKey, _run_key
+
+__all__ = ["score_intervals", "settled_competitors", "RepetitionRace", "race"]
+
+
+def score_intervals(
+    records: Iterable[dict[str, Any]], metric: str = "advantage", alpha: float = 0.05
+) -> dict[str, tuple[float, float, float]]:
+    """Confidence intervals of the mean score of every competitor.
+
+    Args:
+        records: Records of negotiations (e.g. the rows of `details` of tournament results)
+        metric: The score (see `make_scores`) averaged
+        alpha: The error level. Intervals contain the true mean with probability 1 - alpha
+
+    Returns:
+        A mapping from competitor names to their mean, lower and upper bounds. Bounds are infinite for competitors with
+        less than two scores.
+    """
+    values = defaultdict(list)
+    for record in records:
+        for score in make_scores(record):
+            values[score["strategy"]].append(float(score[metric]))
+    intervals = dict()
+    for name, x in values.items():
+        n, mean = len(x), sum(x) / len(x)
+        if n < 2:
+            intervals[name] = (mean, -math.inf, math.inf)
+            continue
+        std = math.sqrt(sum((_ - mean) ** 2 for _ in x) / (n - 1))
+        half = student_t.ppf(1 - alpha / 2, n - 1) * std / math.sqrt(n)
+        intervals[name] = (mean, mean - half, mean + half)
+    return intervals
+
+
+def settled_competitors(intervals: dict[str, tuple[float, float, float]]) -> set[str]:
+    """Competitors whose confidence interval (see `score_intervals`) overlaps with that of no other competitor"""
+    return {
+        name
+        for name, (_, low, high) in intervals.items()
+        if all(
+            high < other_low or other_high < low
+            for other, (_, other_low, other_high) in intervals.items()
+            if other != name
+        )
+    }
+
+
+class RepetitionRace:
+    """Decides which negotiations of a round of repetitions are worth running (see `race`).
+
+    Args:
+        metric: The score whose mean ranks competitors
+        alpha: The error level of the confidence intervals of the mean scores (see `score_intervals`)
+        min_repetitions: Repetitions that are always run
+
+    Remarks:
+        - Calling it with the parameters of a negotiation (see `run_negotiation`) returns whether to run it. Only
+          negotiations of the current `round` (i.e. repetition) are run.
+        - A negotiation is skipped if the ranking of all its partners is settled (see `settled_competitors`) or if all
+          earlier repetitions of the same partners on the same (rotated) scenario gave the same scores (e.g. deterministic
+          negotiators) so that repeating it gives no new information.
+    """
+
+    def __init__(
+        self, metric: str = "advantage", alpha: float = 0.05, min_repetitions: int = 2
+    ):
+        self.metric = metric
+        self.alpha = alpha
+        self.min_repetitions = min_repetitions
+        self.round = 0
+        self.intervals: dict[str, tuple[float, float, float]] = dict()
+        self.settled: set[str] = set()
+        self._constant: set[tuple[str, tuple[str, ...]]] = set()
+
+    def update(self, records: list[dict[str, Any]]) -> None:
+        """Recalculates the state of the race given the records of all negotiations run so far"""
+        self.intervals = score_intervals(records, self.metric, self.alpha)
+        self.settled = settled_competitors(self.intervals)
+        outcomes, counts = defaultdict(set), defaultdict(int)
+        for record in records:
+            cell = (str(record["scenario"]), tuple(record["partners"]))
+            outcomes[cell].add(tuple(_[self.metric] for _ in make_scores(record)))
+            counts[cell] += 1
+        self._constant = {
+            cell
+            for cell, found in outcomes.items()
+            if len(found) == 1 and counts[cell] > 1
+        }
+
+    def __call__(self, info: dict[str, Any]) -> bool:
+        if info["rep"] != self.round:
+            return False
+        if self.round < self.min_repetitions:
+            return True
+        names = tuple(info["partner_names"])
+        if all(_ in self.settled for _ in names):
+            return False
+        return (str(info["s"].outcome_space.name), names) not in self._constant
+
+
+def race(
+    run: Callable[..., SimpleTournamentResults],
+    n_repetitions: int,
+    metric: str = "advantage",
+    alpha: float = 0.05,
+    min_repetitions: int = 2,
+    completed: dict[RunKey, dict[str, Any]] | None = None,
+    verbosity: int = 1,
+) -> SimpleTournamentResults:
+    """Runs the repetitions of a tournament in rounds skipping negotiations that can no longer change the ranking.
+
+    Args:
+        run: Runs the tournament given `n_repetitions`, `completed`, `run_filter` and `verbosity` (e.g.
+             `streaming_tournament` with all other parameters bound). It must use the same scenarios with the same
+             mechanism parameters in every call (e.g. by binding the `seed` of `streaming_tournament`).
+        n_repetitions: Maximum number of repetitions
+        metric: The score whose mean ranks competitors
+        alpha: The error level of the confidence intervals used to decide that a ranking is settled
+        min_repetitions: Repetitions run for all negotiations before any of them is skipped
+        completed: Records of negotiations already completed (see `load_completed_runs`)
+        verbosity: Verbosity level
+
+    Returns:
+        The results of all negotiations run.
+
+    Remarks:
+        - Round r runs the r-th repetition of every negotiation selected by `RepetitionRace` and reuses the records of
+          all earlier rounds. Racing stops early once the ranking of all competitors is settled or a round runs nothing.
+        - Confidence intervals are those of the mean of `metric` whatever the statistic used for final scores.
+    """
+    racer = RepetitionRace(metric, alpha, min_repetitions)
+    completed = dict() if completed is None else dict(completed)
+    results = None
+    for r in range(max(n_repetitions, 1)):
+        racer.round = r
+        n_before = len(completed)
+        results = run(
+            n_repetitions=r + 1,
+            completed=completed,
+            run_filter=racer,
+            verbosity=verbosity - 1,
+        )
+        records = results.details.to_dict("records")
+        completed = {
+            _run_key(_["scenario"], _["partners"], _["rep"]): _ for _ in records
+        }
+        racer.update(records)
+        if verbosity > 0:
+            print(
+                f"Round {r + 1} of {n_repetitions}: ran {len(completed) - n_before} negotiations "
+                f"({len(racer.settled)} of {len(racer.intervals)} competitors settled)",
+                flush=True,
+            )
+        if r + 1 >= min_repetitions and (
+            len(completed) == n_before or racer.settled == set(racer.intervals)
+        ):
+            break
+    assert results is not None
+    if verbosity > 0:
+        print(results.final_scores)
+    return results
@@ -1,14 +1,25 @@
+import inspect
 import itertools
 import random
+import warnings
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from os import cpu_count
 from pathlib import Path
-from typing import Any, Callable, Iterable, Sequence
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
 import numpy as np
+import pandas as pd
+from negmas.helpers.inout import dump
 from negmas.helpers.misc import intin
-from negmas.helpers.strings import unique_name
+from negmas.helpers.strings import shortest_unique_names, unique_name
+from negmas.helpers.types import get_class, get_full_type_name
 from negmas.inout import Scenario, UtilityFunction, pareto_frontier
 from negmas.negotiators import Negotiator
-from negmas.outcomes import make_issue, make_os
+from negmas.outcomes import Issue, make_issue, make_os
 from negmas.preferences import LinearAdditiveUtilityFunction as U
 from negmas.preferences.generators import (
     GENERATOR_MAP,
@@ -16,10 +27,23 @@ from negmas.preferences.generators import (
     generate_utility_values,
 )
 from negmas.preferences.ops import nash_points
-from negmas.preferences.value_fun import TableFun
 from negmas.sao.mechanism import SAOMechanism
 from negmas.tournaments.neg.simple import SimpleTournamentResults, cartesian_tournament
+from negmas.tournaments.neg.simple.cartesian import SCENARIOS_DIR_NAME
 
+from anl.anl2024.analytics import (
+    SCENARIO_PROFILES_FILE_NAME,
+    ScenarioAnalytics,
+    profile_scenarios,
+)
+from anl.anl2024.cache import ScenarioCache
+from anl.anl2024.formats import load_scenario, save_scenario
+from anl.anl2024.frontier import (
+    chunked_pareto_frontier_2d,
+    nash_point_2d,
+    outcome_utilities,
+    pareto_frontier_2d,
+)
 from anl.anl2024.negotiators.builtins import (
     Boulware,
     Conceder,
@@ -28,6 +52,23 @@ from anl.anl2024.negotiators.builtins import (
     NashSeeker,
     RVFitter,
 )
+from anl.anl2024.quick import (
+    QUICK_EVAL_FILE_NAME,
+    quick_eval_report,
+    representative_scenarios,
+)
+from anl.anl2024.racing import race
+from anl.anl2024.scheduling import CostModel
+from anl.anl2024.tournament import (
+    load_completed_runs,
+    resume_scenarios,
+    save_competitors,
+    saved_competitors,
+    saved_mechanism_params,
+    saved_scenarios,
+    streaming_tournament,
+)
+from anl.anl2024.ufuns import OpponentUfun, array_fun, make_index
 
 # from anl.anl2024.negotiators.builtin import (
 #     StochasticBoulware,
@@ -38,11 +79,19 @@ from anl.anl2024.negotiators.builtins import (
 
 __all__ = [
     "anl2024_tournament",
+    "extend_tournament",
     "mixed_scenarios",
     "pie_scenarios",
     "arbitrary_pie_scenarios",
     "monotonic_pie_scenarios",
     "zerosum_pie_scenarios",
+    "generate_scenarios",
+    "iter_scenarios",
+    "plan_issue_sizes",
+    "pie_label",
+    "record_generation_stats",
+    "record_generation_phases",
+    "accepted_params",
     "ScenarioGenerator",
     "DEFAULT_AN2024_COMPETITORS",
     "DEFAULT_TOURNAMENT_PATH",
@@ -109,6 +158,398 @@ ScenarioGenerator = Callable[[int, int | tuple[int, int] | list[int]], list[Scen
 """Type of callable that can be used for generating scenarios. It must receive the number of scenarios and number of outcomes (as int, tuple or list) and return a list of `Scenario` s"""
 
 
+def _bilateral_values(
+    n_outcomes: int, conflict_level: float = 0.5, conflict_delta: float = 0.005
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generates the utility values of two ufuns for all outcomes in one vectorized pass.
+
+    Remarks:
+        - This is the array equivalent of `UtilityFunction.generate_bilateral` and consumes the
+          same random numbers, so both produce the same values for the same random state.
+    """
+    u1 = np.random.random(n_outcomes)
+    rand = np.random.random(n_outcomes)
+    if conflict_level > 0.5:
+        conflicting = 1.0 - u1 + conflict_delta * np.random.random(n_outcomes)
+        u2 = conflicting * conflict_level + rand * (1 - conflict_level)
+    elif conflict_level < 0.5:
+        same = u1 + conflict_delta * np.random.random(n_outcomes)
+        u2 = same * (1 - conflict_level) + rand * conflict_level
+    else:
+        u2 = rand
+    u1 -= u1.min()
+    u2 -= u2.min()
+    u1 = u1 / u1.max()
+    u2 = u2 / u2.max()
+    if random.random() > 0.5:
+        u1, u2 = u2, u1
+    return u1, u2
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    mn, mx = x.min(), x.max()
+    return (x - mn) / (mx - mn)
+
+
+def _make_monotonic(x: np.ndarray, i: int) -> np.ndarray:
+    x = np.sort(x, axis=None)
+
+    if i:
+        x = x[::-1]
+    r = random.random()
+    if r < 0.33:
+        x = np.exp(x)
+    elif r < 0.67:
+        x = np.log(x)
+    else:
+        pass
+    return _normalize(x)
+
+
+_phase_times: dict[str, float] | None = None
+"""Time spent in every phase of scenario generation (see `record_generation_phases`). None when not recording"""
+
+
+class _Laps:
+    """Attributes the time since the last lap to a generation phase when phases are being recorded"""
+
+    def __init__(self):
+        self.last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        if _phase_times is None:
+            return
+        now = perf_counter()
+        _phase_times[phase] = _phase_times.get(phase, 0.0) + now - self.last
+        self.last = now
+
+
+@contextmanager
+def record_generation_phases() -> Iterator[dict[str, float]]:
+    """Records the time spent in every phase of scenario generation within this process.
+
+    Yields:
+        A dict mapping every phase (`values` for generating utility values, `ufuns` for constructing ufuns and
+        `reserved` for sampling reserved values) to the total time spent in it in seconds. The dict is filled while
+        the context is active.
+
+    Remarks:
+        - Only generation in the current process is recorded (i.e. use `njobs=-1`).
+    """
+    global _phase_times
+    old, _phase_times = _phase_times, dict()
+    try:
+        yield _phase_times
+    finally:
+        _phase_times = old
+
+
+_generation_stats: dict[str, dict[str, float]] | None = None
+"""Attempts, failures and time spent per scenario type (see `record_generation_stats`). None when not recording"""
+
+
+def _stats_for(kind: str) -> dict[str, float] | None:
+    if _generation_stats is None:
+        return None
+    return _generation_stats.setdefault(
+        kind, dict(attempts=0, failures=0, skipped=0, seconds=0.0, failed_seconds=0.0)
+    )
+
+
+def _count_attempt(kind: str, seconds: float, failed: bool) -> None:
+    stats = _stats_for(kind)
+    if stats is None:
+        return
+    stats["attempts"] += 1
+    stats["seconds"] += seconds
+    if failed:
+        stats["failures"] += 1
+        stats["failed_seconds"] += seconds
+
+
+def _count_skipped(kind: str) -> None:
+    stats = _stats_for(kind)
+    if stats is not None:
+        stats["skipped"] += 1
+
+
+@contextmanager
+def record_generation_stats() -> Iterator[dict[str, dict[str, float]]]:
+    """Records generation attempts and failures per scenario type within this process.
+
+    Yields:
+        A dict mapping every scenario type (e.g. `zerosum`, `monotonic`, `general`, `pies`) to its
+        number of `attempts`, `failures` and `skipped` scenarios (all attempts failed), the total time
+        spent generating values in `seconds` and the part of it wasted on failed attempts in `failed_seconds`.
+        The dict is filled while the context is active.
+
+    Remarks:
+        - Only generation in the current process is recorded (i.e. use `njobs=-1`).
+    """
+    global _generation_stats
+    old, _generation_stats = _generation_stats, dict()
+    try:
+        yield _generation_stats
+    finally:
+        _generation_stats = old
+
+
+def _positive_gaps(n: int) -> np.ndarray:
+    """Returns `n + 1` strictly increasing values starting at zero and ending at one"""
+    x = np.cumsum(1.0 - np.random.random(n))
+    return np.concatenate(([0.0], x / x[-1]))
+
+
+def _constructive_values(
+    n_pareto: int, n_outcomes: int, pareto_generator: str, pareto_first: bool
+) -> np.ndarray:
+    """Generates bilateral utility values with exactly `n_pareto` Pareto outcomes without rejection.
+
+    Args:
+        n_pareto: Number of Pareto outcomes (clipped to the range [1, n_outcomes])
+        n_outcomes: Total number of outcomes
+        pareto_generator: The shape of the frontier (`zero_sum`, `piecewise_linear` or `curve`) as in negmas' `GENERATOR_MAP`
+        pareto_first: If given, Pareto outcomes come first
+
+    Returns:
+        An array of shape (n_outcomes, 2) with the utilities of every outcome
+
+    Remarks:
+        - The frontier is constructed with strictly increasing first utilities and strictly decreasing
+          second utilities, and every other outcome is strictly dominated by a frontier outcome so the
+          frontier always has exactly `n_pareto` outcomes. This avoids the degenerate cases that make
+          `generate_utility_values` fail (empty frontiers and repeated segment endpoints).
+        - Values are not distributed as those of `generate_utility_values`: frontiers are sampled
+          differently (e.g. `curve` frontiers have second utilities in [0.5, 1]) and every other outcome
+          is a random reduction of a frontier outcome. Mixed scenarios use it only as a fallback after
+          `generate_utility_values` fails.
+    """
+    n_pareto = min(max(1, n_pareto), n_outcomes)
+    x = _positive_gaps(n_pareto - 1) if n_pareto > 1 else np.random.random(1)
+    if pareto_generator == "zero_sum":
+        y = 1.0 - x
+    elif pareto_generator == "curve":
+        y = 1.0 - 0.5 * x ** np.exp(np.random.uniform(np.log(0.1), np.log(6)))
+    else:
+        n_segments = random.randint(2, 5)
+        y = np.interp(x, _positive_gaps(n_segments), 1.0 - _positive_gaps(n_segments))
+    pareto = np.column_stack((x, y))
+    n_extra = n_outcomes - n_pareto
+    parents = pareto[np.random.randint(0, n_pareto, size=n_extra)]
+    # reduce the first, second or both utilities of the parent (never a zero one)
+    which = np.random.randint(0, 3, size=n_extra)
+    reduced = np.column_stack((which != 1, which != 0))
+    reduced[parents[:, 0] <= 0, 1] = True
+    reduced[parents[:, 1] <= 0, 0] = True
+    reduced &= parents > 0
+    extra = parents * (1.0 - reduced * (1.0 - np.random.random((n_extra, 2))))
+    vals = np.concatenate((pareto, extra))
+    if not pareto_first:
+        np.random.shuffle(vals)
+    return vals
+
+
+def _sub_seeds(seed: int, n: int) -> list[int]:
+    """Derives `n` independent sub-seeds (one per scenario) from `seed`"""
+    return [
+        int(_.generate_state(1)[0]) for _ in np.random.SeedSequence(seed).spawn(n)
+    ]
+
+
+@contextmanager
+def _seeded(seed: int | None):
+    """Seeds the global `random` and `np.random` generators restoring their state on exit"""
+    if seed is None:
+        yield
+        return
+    state, np_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+        np.random.set_state(np_state)
+
+
+def _make_seeded(
+    make: Callable[..., Scenario | None], kwargs: dict[str, Any], i: int, seed: int
+) -> Scenario | None:
+    with _seeded(seed):
+        return make(i, **kwargs)
+
+
+def iter_scenarios(
+    make: Callable[..., Scenario | None],
+    n_scenarios: int,
+    seed: int | None = None,
+    njobs: int = -1,
+    **kwargs,
+) -> Iterator[Scenario]:
+    """Lazily generates scenarios by calling `make(i, **kwargs)` for every scenario index `i`
+
+    Args:
+        make: A callable that creates the scenario with the given index (or returns `None` on failure).
+        n_scenarios: Number of scenarios to generate.
+        seed: If given, every scenario is generated with its own sub-seed derived from this seed.
+        njobs: Number of parallel processes to use. -1 for serial and 0 for all cores.
+        kwargs: Passed to `make`
+
+    Remarks:
+        - Scenarios are yielded in order as soon as they are ready. When running in parallel, at most
+          two scenarios per process are generated ahead of the consumer.
+        - See `generate_scenarios` for the effect of `seed` and `njobs`.
+    """
+    if seed is None and njobs < 0:
+        for i in range(n_scenarios):
+            scenario = make(i, **kwargs)
+            if scenario is not None:
+                yield scenario
+        return
+    if seed is None:
+        seed = random.randint(0, 2**31 - 1)
+    seeds = _sub_seeds(seed, n_scenarios)
+    f = partial(_make_seeded, make, kwargs)
+    n_cores = cpu_count() or 4
+    n_workers = min(n_cores, njobs) if njobs > 0 else n_cores
+    n_workers = min(n_workers, n_scenarios)
+    if njobs < 0 or n_workers < 2:
+        for scenario in map(f, range(n_scenarios), seeds):
+            if scenario is not None:
+                yield scenario
+        return
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for i, sub_seed in enumerate(seeds):
+            pending.append(pool.submit(f, i, sub_seed))
+            if len(pending) < 2 * n_workers:
+                continue
+            scenario = pending.popleft().result()
+            if scenario is not None:
+                yield scenario
+        while pending:
+            scenario = pending.popleft().result()
+            if scenario is not None:
+                yield scenario
+
+
+def generate_scenarios(
+    make: Callable[..., Scenario | None],
+    n_scenarios: int,
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    **kwargs,
+) -> list[Scenario] | Iterator[Scenario]:
+    """Generates scenarios by calling `make(i, **kwargs)` for every scenario index `i`
+
+    Args:
+        make: A callable that creates the scenario with the given index (or returns `None` on failure).
+        n_scenarios: Number of scenarios to generate.
+        seed: If given, every scenario is generated with its own sub-seed derived from this seed.
+        njobs: Number of parallel processes to use. -1 for serial and 0 for all cores.
+        lazy: If given, an iterator is returned that generates scenarios on demand (see `iter_scenarios`)
+        kwargs: Passed to `make`
+
+    Remarks:
+        - When a seed is given, the generated scenarios depend only on the seed (not on `njobs`).
+        - If no seed is given and `njobs` is negative, the global random state is used as it is.
+          Otherwise, a seed is drawn from the global random state.
+        - `make` must be picklable (i.e. a module level function) for parallel generation.
+        - The scenario generators of this module (e.g. `pie_scenarios` and `mixed_scenarios`) share these parameters
+          which they pass here (`seed`, `njobs` and `lazy`) or to the functions creating every scenario:
+
+          - storage: If given, utility values are stored in memory-mapped files in this folder instead of memory
+            (see `MappedArrayFun`). The files must remain available for as long as the scenarios are used.
+          - storage_dtype: The type used for storing utility values in files (e.g. `float32` or `float64`)
+          - integer_outcomes: If given, the issue of single-issue scenarios takes the integer values 0 ... n-1 instead
+            of strings (see `pie_label` for the corresponding display labels). Integer outcomes are cheaper to hash,
+            compare, log and save.
+    """
+    scenarios = iter_scenarios(make, n_scenarios, seed, njobs, **kwargs)
+    if lazy:
+        return scenarios
+    return list(scenarios)
+
+
+def pie_label(value: int | str, n: int) -> str:
+    """Returns the display label of an outcome value of a single-issue pie with `n` outcomes.
+
+    Remarks:
+        - Integer value `k` gives `k` portions to the first negotiator and `n - 1 - k` to the second and is
+          displayed as `"k_(n-1-k)"` which is the value used when outcomes are not integers.
+        - String values are returned as they are.
+    """
+    if isinstance(value, str):
+        return value
+    return f"{value}_{n - 1 - value}"
+
+
+def _portions_issue(
+    n: int, name: str, integer_outcomes: bool
+) -> tuple[Issue, dict[Any, int] | None]:
+    """Creates the issue of a single-issue pie and the index mapping its values to array positions"""
+    if integer_outcomes:
+        # values are the integers 0 ... n-1 which are used directly as array positions. Creating the issue
+        # draws random numbers in negmas so the state is restored to generate the same scenarios either way
+        state = random.getstate()
+        issue = make_issue(n, name)
+        random.setstate(state)
+        return issue, None
+    values = [pie_label(_, n) for _ in range(n)]
+    return make_issue(values, name), make_index(values)
+
+
+def _pie_scenario(
+    i: int,
+    n_outcomes: int | tuple[int, int] | list[int],
+    base_name: str,
+    reserved_ranges: ReservedRanges,
+    log_uniform: bool,
+    monotonic: bool,
+    max_jitter_level: float = 0.8,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> Scenario:
+    """Creates a single-issue pie scenario with all utility values generated as arrays"""
+    laps = _Laps()
+    n = intin(n_outcomes, log_uniform)
+    issue, index = _portions_issue(
+        n, "portions" if not monotonic else "i1", integer_outcomes
+    )
+    os = make_os((issue,), name=f"{base_name}{i}")
+    laps.lap("ufuns")
+    funs = _bilateral_values(
+        n,
+        conflict_level=0.5 + 0.5 * random.random(),
+        conflict_delta=random.random(),
+    )
+    jitter_level = random.random() * max_jitter_level
+    funs = [x + np.random.random() * jitter_level for x in funs]
+
+    if monotonic:
+        funs = [_make_monotonic(x, i) for i, x in enumerate(funs)]
+    else:
+        funs = [_normalize(x) for x in funs]
+    laps.lap("values")
+    # all ufuns share the same index from issue values to array positions
+    ufuns = tuple(
+        U(
+            values=(array_fun(vals, index, storage=storage, dtype=storage_dtype),),
+            name=f"{uname}{i}",
+            outcome_space=os,
+        )
+        for (uname, vals) in zip(("First", "Second"), funs)
+    )
+    laps.lap("ufuns")
+    sample_reserved_values(
+        ufuns, pareto=np.column_stack(funs), reserved_ranges=reserved_ranges
+    )
+    laps.lap("reserved")
+    return Scenario(outcome_space=os, ufuns=ufuns)  # type: ignore
+
+
 def pies_scenarios(
     n_scenarios: int = 20,
     n_outcomes: int | tuple[int, int] | list[int] = 100,
@@ -116,7 +557,13 @@ def pies_scenarios(
     reserved_ranges: ReservedRanges = ((0.0, 0.999999), (0.0, 0.999999)),
     log_uniform: bool = True,
     monotonic=True,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     """Creates multi-issue scenarios with arbitrary/monotonically increasing value functions
 
     Args:
@@ -126,88 +573,26 @@ def pies_scenarios(
         reserved_ranges: Ranges of reserved values for first and second negotiators
         log_uniform: If given, the distribution used will be uniform on the logarithm of n. outcomes (only used when n_outcomes is a 2-valued tuple).
         monotonic: If true all ufuns are monotonically increasing in the portion of the pie
+        seed, njobs, lazy, storage, storage_dtype, integer_outcomes: Shared by all generators (see `generate_scenarios`)
 
     Remarks:
         - When n_outcomes is a tuple, the number of outcomes for each scenario will be sampled independently.
     """
-    ufun_sets = []
-    base_name = "DivideTyePies" if monotonic else "S"
-
-    def normalize(x):
-        mn, mx = x.min(), x.max()
-        return ((x - mn) / (mx - mn)).tolist()
-
-    def make_monotonic(x, i):
-        x = np.sort(np.asarray(x), axis=None)
-
-        if i:
-            x = x[::-1]
-        r = random.random()
-        if r < 0.33:
-            x = np.exp(x)
-        elif r < 0.67:
-            x = np.log(x)
-        else:
-            pass
-        return normalize(x)
-
-    max_jitter_level = 0.8
-    for i in range(n_scenarios):
-        n = intin(n_outcomes, log_uniform)
-        issues = (
-            make_issue(
-                [f"{i}_{n-1 - i}" for i in range(n)],
-                "portions" if not monotonic else "i1",
-            ),
-        )
-        # funs = [
-        #     dict(
-        #         zip(
-        #             issues[0].all,
-        #             # adjust(np.asarray([random.random() for _ in range(n)])),
-        #             generate(n, i),
-        #         )
-        #     )
-        #     for i in range(2)
-        # ]
-        os = make_os(issues, name=f"{base_name}{i}")
-        outcomes = list(os.enumerate_or_sample())
-        ufuns = U.generate_bilateral(
-            outcomes,
-            conflict_level=0.5 + 0.5 * random.random(),
-            conflict_delta=random.random(),
-        )
-        jitter_level = random.random() * max_jitter_level
-        funs = [
-            np.asarray([float(u(_)) for _ in outcomes])
-            + np.random.random() * jitter_level
-            for u in ufuns
-        ]
-
-        if monotonic:
-            funs = [make_monotonic(x, i) for i, x in enumerate(funs)]
-        else:
-            funs = [normalize(x) for x in funs]
-        ufuns = tuple(
-            U(
-                values=(TableFun(dict(zip(issues[0].all, vals))),),
-                name=f"{uname}{i}",
-                outcome_space=os,
-                # reserved_value=(r[0] + random.random() * (r[1] - r[0] - 1e-8)),
-            )
-            for (uname, vals) in zip(("First", "Second"), funs)
-            # for (uname, r, vals) in zip(("First", "Second"), reserved_ranges, funs)
-        )
-        sample_reserved_values(ufuns, reserved_ranges=reserved_ranges)
-        ufun_sets.append(ufuns)
-
-    return [
-        Scenario(
-            outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
-            ufuns=ufuns,
-        )
-        for ufuns in ufun_sets
-    ]
+    return generate_scenarios(
+        _pie_scenario,
+        n_scenarios,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
+        n_outcomes=n_outcomes,
+        base_name="DivideTyePies" if monotonic else "S",
+        reserved_ranges=reserved_ranges,
+        log_uniform=log_uniform,
+        monotonic=monotonic,
+    )
 
 
 def pie_scenarios(
@@ -217,7 +602,13 @@ def pie_scenarios(
     reserved_ranges: ReservedRanges = ((0.0, 0.999999), (0.0, 0.999999)),
     log_uniform: bool = True,
     monotonic=False,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     """Creates single-issue scenarios with arbitrary/monotonically increasing utility functions
 
     Args:
@@ -227,88 +618,28 @@ def pie_scenarios(
         reserved_ranges: Ranges of reserved values for first and second negotiators
         log_uniform: If given, the distribution used will be uniform on the logarithm of n. outcomes (only used when n_outcomes is a 2-valued tuple).
         monotonic: If true all ufuns are monotonically increasing in the portion of the pie
+        seed, njobs, lazy, storage, storage_dtype, integer_outcomes: Shared by all generators (see `generate_scenarios`)
 
     Remarks:
         - When n_outcomes is a tuple, the number of outcomes for each scenario will be sampled independently.
+        - Utility values are generated as arrays in a single vectorized pass and the resulting ufuns
+          use `ArrayFun` value functions instead of dict-based `TableFun` ones.
     """
-    ufun_sets = []
-    base_name = "DivideTyePie" if monotonic else "S"
-
-    def normalize(x):
-        mn, mx = x.min(), x.max()
-        return ((x - mn) / (mx - mn)).tolist()
-
-    def make_monotonic(x, i):
-        x = np.sort(np.asarray(x), axis=None)
-
-        if i:
-            x = x[::-1]
-        r = random.random()
-        if r < 0.33:
-            x = np.exp(x)
-        elif r < 0.67:
-            x = np.log(x)
-        else:
-            pass
-        return normalize(x)
-
-    max_jitter_level = 0.8
-    for i in range(n_scenarios):
-        n = intin(n_outcomes, log_uniform)
-        issues = (
-            make_issue(
-                [f"{i}_{n-1 - i}" for i in range(n)],
-                "portions" if not monotonic else "i1",
-            ),
-        )
-        # funs = [
-        #     dict(
-        #         zip(
-        #             issues[0].all,
-        #             # adjust(np.asarray([random.random() for _ in range(n)])),
-        #             generate(n, i),
-        #         )
-        #     )
-        #     for i in range(2)
-        # ]
-        os = make_os(issues, name=f"{base_name}{i}")
-        outcomes = list(os.enumerate_or_sample())
-        ufuns = U.generate_bilateral(
-            outcomes,
-            conflict_level=0.5 + 0.5 * random.random(),
-            conflict_delta=random.random(),
-        )
-        jitter_level = random.random() * max_jitter_level
-        funs = [
-            np.asarray([float(u(_)) for _ in outcomes])
-            + np.random.random() * jitter_level
-            for u in ufuns
-        ]
-
-        if monotonic:
-            funs = [make_monotonic(x, i) for i, x in enumerate(funs)]
-        else:
-            funs = [normalize(x) for x in funs]
-        ufuns = tuple(
-            U(
-                values=(TableFun(dict(zip(issues[0].all, vals))),),
-                name=f"{uname}{i}",
-                outcome_space=os,
-                # reserved_value=(r[0] + random.random() * (r[1] - r[0] - 1e-8)),
-            )
-            for (uname, vals) in zip(("First", "Second"), funs)
-            # for (uname, r, vals) in zip(("First", "Second"), reserved_ranges, funs)
-        )
-        sample_reserved_values(ufuns, reserved_ranges=reserved_ranges)
-        ufun_sets.append(ufuns)
-
-    return [
-        Scenario(
-            outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
-            ufuns=ufuns,
-        )
-        for ufuns in ufun_sets
-    ]
+    return generate_scenarios(
+        _pie_scenario,
+        n_scenarios,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
+        n_outcomes=n_outcomes,
+        base_name="DivideTyePie" if monotonic else "S",
+        reserved_ranges=reserved_ranges,
+        log_uniform=log_uniform,
+        monotonic=monotonic,
+    )
 
 
 def arbitrary_pie_scenarios(
@@ -317,16 +648,80 @@ def arbitrary_pie_scenarios(
     *,
     reserved_ranges: ReservedRanges = ((0.0, 0.999999), (0.0, 0.999999)),
     log_uniform: bool = True,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     return pie_scenarios(
         n_scenarios,
         n_outcomes,
         reserved_ranges=reserved_ranges,
         log_uniform=log_uniform,
         monotonic=False,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
     )
 
 
+@lru_cache(maxsize=4096)
+def plan_issue_sizes(
+    n_outcomes: int, n_issues: int = 3, tolerance: float = 0.1, min_size: int = 2
+) -> tuple[int, ...]:
+    """
+    Finds near-balanced issue sizes with a product close to a target number of outcomes.
+
+    Args:
+        n_outcomes: The target number of outcomes (i.e. the product of all issue sizes)
+        n_issues: The number of issues
+        tolerance: Maximum allowed relative difference between the product of sizes and `n_outcomes`
+        min_size: Minimum size of any issue
+
+    Returns:
+        A tuple of `n_issues` sizes in non-increasing order.
+
+    Remarks:
+        - Sizes are searched in a window around `n_outcomes ** (1/n_issues)` that is widened only until a plan
+          within `tolerance` is found. The last size is always chosen to best match the target so the
+          search is bounded and does not depend on factoring `n_outcomes`.
+        - Among plans within `tolerance`, the most balanced one is returned. If no plan is within `tolerance`
+          (which can only happen for very small targets), the closest plan is returned.
+        - Results are memoized per set of arguments.
+    """
+    if n_issues < 1:
+        raise ValueError(f"Cannot plan sizes for {n_issues} issues")
+    n_outcomes = max(int(n_outcomes), min_size**n_issues)
+    if n_issues == 1:
+        return (n_outcomes,)
+    base = max(min_size, round(n_outcomes ** (1 / n_issues)))
+
+    def cost(sizes: tuple[int, ...]) -> tuple[float, float, float]:
+        err = abs(product(sizes) - n_outcomes) / n_outcomes
+        return (max(err - tolerance, 0.0), max(sizes) / min(sizes), err)
+
+    best, best_cost = None, None
+    for width in itertools.count(1):
+        candidates = range(max(min_size, base - width), base + width + 1)
+        for first in itertools.combinations_with_replacement(
+            reversed(candidates), n_issues - 1
+        ):
+            last = max(min_size, round(n_outcomes / product(first)))
+            sizes = tuple(sorted(first + (last,), reverse=True))
+            c = cost(sizes)
+            if best_cost is None or c < best_cost:
+                best, best_cost = sizes, c
+        assert best_cost is not None and best is not None
+        if best_cost[0] == 0.0 or width >= base:
+            return best
+    return best  # type: ignore (unreachable)
+
+
 def product(generator):
     """
     Calculates the product of all elements in a generator.
@@ -343,64 +738,36 @@ def product(generator):
     return total
 
 
-def find_three_integers(x):
-    """Finds three integers that multiply to a number, considering numbers around x."""
-
-    for offset in itertools.count(0):
-        current_number = x + (-1) ** offset * offset
-
-        # Stop searching downwards at 8
-        if current_number < 8:
-            break
-
-        result = find_three_integers_for_number(current_number)
-        if result:
-            return result
-
-    return None  # No solution found within the search range
-
-
 def find_three_integers_for_number(x, fraction=0.1):
-    """Helper function to find three integers for a given number."""
-    N = 3
-
-    # Check for perfect cubes
-    cube_root = int(x ** (1 / N))
-    if cube_root**N >= x * (1 - fraction):
-        return (
-            cube_root,
-            cube_root + random.randint(-1, 1),
-            cube_root,
-        )
-
-    # Factor x into primes
-    prime_factors = []
-    divisor = 2
-    while x > 1:
-        while x % divisor == 0:
-            prime_factors.append(divisor)
-            x //= divisor
-        divisor += 1
-
-    # Try to group prime factors into threes
-    for combination in itertools.combinations(prime_factors, N):
-        if product(combination) == x:
-            return combination
-
-    # Try combining factors to create three integers
-    if len(prime_factors) > N:
-        for i in range(1, len(prime_factors) - N + 1):
-            if (
-                prime_factors[0] * prime_factors[i] * product(prime_factors[i + 1 :])
-                == x
-            ):
-                return (
-                    prime_factors[0],
-                    prime_factors[i],
-                    product(prime_factors[i + 1 :]),
-                )
-
-    return None
+    """Finds three near-balanced integers with a product within `fraction` of `x` (see `plan_issue_sizes`)."""
+    return plan_issue_sizes(int(x), 3, fraction)
+
+
+def _monotonic_pies_scenario(
+    i: int,
+    n_outcomes: int | tuple[int, int] | list[int],
+    reserved_ranges: ReservedRanges,
+    log_uniform: bool,
+    n_issues: int,
+) -> Scenario:
+    laps = _Laps()
+    sizes = plan_issue_sizes(intin(n_outcomes, log_uniform), n_issues)
+    # negmas generates the values and constructs the ufuns in one call
+    ufuns = generate_multi_issue_ufuns(
+        n_issues,
+        sizes=sizes,
+        os_name=f"DivideThePies{i}",
+    )
+    os = ufuns[0].outcome_space
+    assert os is not None
+    laps.lap("values")
+    sample_reserved_values(
+        ufuns,
+        pareto=outcome_utilities(ufuns),
+        reserved_ranges=reserved_ranges,
+    )
+    laps.lap("reserved")
+    return Scenario(outcome_space=os, ufuns=ufuns)  # type: ignore
 
 
 def monotonic_pies_scenarios(
@@ -409,31 +776,37 @@ def monotonic_pies_scenarios(
     *,
     reserved_ranges: ReservedRanges = ((0.0, 0.999999), (0.0, 0.999999)),
     log_uniform: bool = False,
-) -> list[Scenario]:
-    _ = log_uniform
-    ufun_sets = []
-    for s in range(n_scenarios):
-        ufuns = generate_multi_issue_ufuns(
-            3,
-            sizes=find_three_integers_for_number(n_outcomes),
-            os_name=f"DivideThePies{s}",
-        )
-        os = ufuns[0].outcome_space
-        assert os is not None
-        sample_reserved_values(
-            ufuns,
-            pareto=tuple(tuple(u(_) for u in ufuns) for _ in os.enumerate_or_sample()),
-            reserved_ranges=reserved_ranges,
-        )
-        ufun_sets.append(ufuns)
+    n_issues: int = 3,
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
+    """Creates multi-issue scenarios with monotonic linear-additive utility functions (dividing multiple pies)
 
-    return [
-        Scenario(
-            outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
-            ufuns=ufuns,
-        )
-        for ufuns in ufun_sets
-    ]
+    Args:
+        n_scenarios: Number of scenarios to create
+        n_outcomes: Number of outcomes per scenario. If a tuple it will be interpreted as a min/max range to sample n. outcomes from.
+                    If a list, samples from this list will be used (with replacement).
+        reserved_ranges: Ranges of reserved values for first and second negotiators
+        log_uniform: If given, the distribution used will be uniform on the logarithm of n. outcomes (only used when n_outcomes is a 2-valued tuple).
+        n_issues: Number of issues (pies) in each scenario
+        seed, njobs, lazy: Shared by all generators (see `generate_scenarios`)
+
+    Remarks:
+        - Issue sizes are chosen by `plan_issue_sizes` so the actual number of outcomes is within 10% of the
+          requested one whenever possible.
+    """
+    return generate_scenarios(
+        _monotonic_pies_scenario,
+        n_scenarios,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        n_outcomes=n_outcomes,
+        reserved_ranges=reserved_ranges,
+        log_uniform=log_uniform,
+        n_issues=n_issues,
+    )
 
 
 def monotonic_pie_scenarios(
@@ -442,43 +815,84 @@ def monotonic_pie_scenarios(
     *,
     reserved_ranges: ReservedRanges = ((0.0, 0.999999), (0.0, 0.999999)),
     log_uniform: bool = True,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     return pie_scenarios(
         n_scenarios,
         n_outcomes,
         reserved_ranges=reserved_ranges,
         log_uniform=log_uniform,
         monotonic=True,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
     )
 
 
 def sample_reserved_values(
     ufuns: tuple[UtilityFunction, ...],
-    pareto: tuple[tuple[float, ...], ...] | None = None,
+    pareto: tuple[tuple[float, ...], ...] | np.ndarray | None = None,
     reserved_ranges: ReservedRanges = ((0.0, 1.0), (0.0, 1.0)),
     eps: float = 1e-3,
+    nash: tuple[float, ...] | None = None,
 ) -> tuple[float, ...]:
     """
     Samples reserved values that are guaranteed to allow some rational outcomes for the given ufuns and sets the reserved values.
 
     Args:
         ufuns: tuple of utility functions to sample reserved values for
-        pareto: The pareto frontier. If not given, it will be calculated
+        pareto: The pareto frontier. If not given, it will be calculated. For two ufuns, this can be the utilities
+                of any set of outcomes containing the frontier (e.g. all outcomes) as it will be filtered anyway.
         reserved_ranges: the range to sample reserved values from. Notice that the upper limit of this range will be updated
                          to ensure some rational outcoms
         eps: A small number indicating the absolute guaranteed margin of the sampled reserved value from the Nash point.
+        nash: The utilities at the Nash point if known (e.g. analytically). If given, `pareto` is not used.
+
+    Remarks:
+        - For two ufuns, the frontier and Nash point are found using a sort-and-sweep on numpy arrays (see `pareto_frontier_2d`)
+          which takes O(n log(n)) for n outcomes. If `pareto` is not given, outcomes are evaluated in chunks
+          (see `chunked_pareto_frontier_2d`) so memory does not grow with the size of the outcome-space.
 
     """
     n_funs = len(ufuns)
-    if pareto is None:
-        pareto = pareto_frontier(ufuns)[0]
-    assert pareto is not None, "Cannot find the pareto frontier."
-    nash = nash_points(ufuns, frontier=pareto, ranges=[(0, 1) for _ in range(n_funs)])
-    if not nash:
-        raise ValueError(
-            "Cannot find the Nash point so we cannot find the appropriate reserved ranges"
+    ranges = [(0, 1) for _ in range(n_funs)]
+    if nash is not None:
+        nash_utils = nash
+    elif n_funs == 2:
+        if pareto is None:
+            # stream outcomes so that large outcome-spaces are never held in memory
+            frontier = chunked_pareto_frontier_2d(ufuns)[1]
+        else:
+            utils = np.asarray(pareto)
+            assert utils.ndim == 2, "Cannot find the pareto frontier."
+            frontier = utils[pareto_frontier_2d(utils)] if len(utils) else utils
+        assert len(frontier), "Cannot find the pareto frontier."
+        indx = nash_point_2d(
+            frontier, tuple(u.reserved_value for u in ufuns), ranges  # type: ignore
         )
-    nash_utils = nash[0][0]
+        if indx is None:
+            raise ValueError(
+                "Cannot find the Nash point so we cannot find the appropriate reserved ranges"
+            )
+        nash_utils = tuple(float(_) for _ in frontier[indx])
+    else:
+        if pareto is None:
+            pareto = pareto_frontier(ufuns)[0]
+        assert pareto is not None, "Cannot find the pareto frontier."
+        points = nash_points(ufuns, frontier=pareto, ranges=ranges)  # type: ignore
+        if not points:
+            raise ValueError(
+                "Cannot find the Nash point so we cannot find the appropriate reserved ranges"
+            )
+        nash_utils = points[0][0]
     if not reserved_ranges:
         reserved_ranges = tuple((0, 1) for _ in range(n_funs))
     reserved_ranges = tuple(
@@ -493,13 +907,56 @@ def sample_reserved_values(
     return reserved
 
 
+def _zerosum_pie_scenario(
+    i: int,
+    n_outcomes: int | tuple[int, int] | list[int],
+    reserved_ranges: ReservedRanges,
+    log_uniform: bool,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> Scenario:
+    laps = _Laps()
+    n = intin(n_outcomes, log_uniform)
+    issue, index = _portions_issue(n, "portions", integer_outcomes)
+    os = make_os((issue,), name=f"DivideTyePie{i}")
+    laps.lap("ufuns")
+    # the first negotiator gets i/(n-1) and the second gets the rest of the pie
+    first = np.arange(n, dtype=float) / (n - 1)
+    laps.lap("values")
+    ufuns = tuple(
+        U(
+            values=(array_fun(vals, index, storage=storage, dtype=storage_dtype),),
+            name=f"{uname}{i}",
+            outcome_space=os,
+        )
+        for uname, vals in (("First", first), ("Second", 1.0 - first))
+    )
+    laps.lap("ufuns")
+    # all outcomes are on the frontier and the Nash product k(n-1-k) peaks at the middle of the pie
+    k = (n - 1) // 2
+    sample_reserved_values(
+        ufuns,
+        nash=(k / (n - 1), (n - 1 - k) / (n - 1)),
+        reserved_ranges=reserved_ranges,
+    )
+    laps.lap("reserved")
+    return Scenario(outcome_space=os, ufuns=ufuns)  # type: ignore
+
+
 def zerosum_pie_scenarios(
     n_scenarios: int = 20,
     n_outcomes: int | tuple[int, int] | list[int] = 100,
     *,
     reserved_ranges: ReservedRanges = ((0.0, 0.499999), (0.0, 0.499999)),
     log_uniform: bool = True,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     """Creates scenarios all of the DivideThePie variety with proportions giving utility
 
     Args:
@@ -507,48 +964,148 @@ def zerosum_pie_scenarios(
         n_outcomes: Number of outcomes per scenario (if a tuple it will be interpreted as a min/max range to sample n. outcomes from).
         reserved_ranges: Ranges of reserved values for first and second negotiators
         log_uniform: If given, the distribution used will be uniform on the logarithm of n. outcomes (only used when n_outcomes is a 2-valued tuple).
+        seed, njobs, lazy, storage, storage_dtype, integer_outcomes: Shared by all generators (see `generate_scenarios`)
 
     Remarks:
         - When n_outcomes is a tuple, the number of outcomes for each outcome will be sampled independently
+        - Utilities are a linear ramp generated directly as arrays and the Nash point (needed for sampling
+          reserved values) is calculated analytically without evaluating any outcome.
     """
-    ufun_sets = []
-    for i in range(n_scenarios):
-        n = intin(n_outcomes, log_uniform)
-        issues = (make_issue([f"{i}_{n-1 - i}" for i in range(n)], "portions"),)
+    return generate_scenarios(
+        _zerosum_pie_scenario,
+        n_scenarios,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
+        n_outcomes=n_outcomes,
+        reserved_ranges=reserved_ranges,
+        log_uniform=log_uniform,
+    )
+
+
+def _mixed_scenario(
+    i: int,
+    n_outcomes: int | tuple[int, int] | list[int],
+    reserved_ranges: ReservedRanges,
+    log_uniform: bool,
+    zerosum_fraction: float,
+    monotonic_fraction: float,
+    curve_fraction: float,
+    pies_fraction: float,
+    pareto_first: bool,
+    n_ufuns: int,
+    n_pareto: int | float | tuple[float | int, float | int] | list[int | float],
+    pareto_log_uniform: bool,
+    n_trials: int,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> Scenario | None:
+    laps = _Laps()
+    nongeneral_fraction = zerosum_fraction + monotonic_fraction
+    r = random.random()
+    n = intin(n_outcomes, log_uniform)
+    name = "S"
+    if r < nongeneral_fraction:
+        n_pareto_selected = n
+        name = "DivideThePieGen"
+    else:
+        if isinstance(n_pareto, Iterable):
+            n_pareto = type(n_pareto)(
+                int(_ * n + 0.5) if _ < 1 else int(_)
+                for _ in n_pareto  # type: ignore
+            )
+        else:
+            n_pareto = int(0.5 + n_pareto * n) if n_pareto < 1 else int(n_pareto)
+        n_pareto_selected = intin(n_pareto, log_uniform=pareto_log_uniform)  # type: ignore
+    if r < zerosum_fraction:
+        name, kind, pareto_generator = "DivideThePie", "zerosum", "zero_sum"
+    elif r < zerosum_fraction + pies_fraction:
+        name, kind, pareto_generator = "DivideThePies", "pies", None
+    else:
+        kind = "monotonic" if r < nongeneral_fraction else "general"
+        pareto_generator = (
+            "curve" if random.random() < curve_fraction else "piecewise_linear"
+        )
+        n_pareto_selected = max(2, n_pareto_selected)
+    n_pareto_selected = min(n_pareto_selected, n)
+    ufuns, vals = None, None
+    error = None
+    for _ in range(n_trials):
+        start = perf_counter()
+        try:
+            if pareto_generator is None:
+                ufuns = generate_multi_issue_ufuns(
+                    n_issues=3,
+                    n_values=(9, 11),
+                    pareto_generators=tuple(GENERATOR_MAP.keys()),
+                    ufun_names=("First0", "Second1"),
+                    os_name=f"{name}{i}",
+                )
+            else:
+                vals = generate_utility_values(
+                    n_pareto=n_pareto_selected,
+                    n_outcomes=n,
+                    n_ufuns=n_ufuns,
+                    pareto_first=pareto_first,
+                    pareto_generator=pareto_generator,
+                )
+        except Exception as e:
+            _count_attempt(kind, perf_counter() - start, failed=True)
+            error = e
+            if pareto_generator is not None and n_ufuns == 2:
+                # constructive generation cannot fail so there is no need to retry.
+                # Its frontiers are not distributed as those of `generate_utility_values`
+                # (see `_constructive_values`) so it is only used after a failure
+                start = perf_counter()
+                vals = _constructive_values(
+                    n_pareto_selected, n, pareto_generator, pareto_first
+                )
+                _count_attempt(kind, perf_counter() - start, failed=False)
+                break
+            continue
+        _count_attempt(kind, perf_counter() - start, failed=False)
+        break
+    else:
+        laps.lap("values")
+        _count_skipped(kind)
+        warnings.warn(
+            f"Skipping scenario {i} ({kind}): generation failed {n_trials} times. "
+            f"Last error: {error!r}"
+        )
+        return None
+
+    laps.lap("values")
+    if ufuns is None:
+        issue, index = _portions_issue(n, "portions", integer_outcomes)
+        issues = (issue,)
+        vals = np.asarray(vals, dtype=float)[:n]
         ufuns = tuple(
             U(
                 values=(
-                    TableFun(
-                        {
-                            _: float(int(str(_).split("_")[k]) / (n - 1))
-                            for _ in issues[0].all
-                        }
-                    ),
+                    array_fun(vals[:, k], index, storage=storage, dtype=storage_dtype),
                 ),
                 name=f"{uname}{i}",
                 # reserved_value=(r[0] + random.random() * (r[1] - r[0] - 1e-8)),
-                outcome_space=make_os(issues, name=f"DivideTyePie{i}"),
+                outcome_space=make_os(issues, name=f"{name}{i}"),
             )
             for k, uname in enumerate(("First", "Second"))
             # for k, (uname, r) in enumerate(zip(("First", "Second"), reserved_ranges))
         )
-        sample_reserved_values(
-            ufuns,
-            pareto=tuple(
-                tuple(u(_) for u in ufuns)
-                for _ in make_os(issues).enumerate_or_sample()
-            ),
-            reserved_ranges=reserved_ranges,
-        )
-        ufun_sets.append(ufuns)
-
-    return [
-        Scenario(
-            outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
-            ufuns=ufuns,
-        )
-        for ufuns in ufun_sets
-    ]
+    laps.lap("ufuns")
+    sample_reserved_values(
+        ufuns,
+        pareto=None if vals is None else vals[:, :2],
+        reserved_ranges=reserved_ranges,
+    )
+    laps.lap("reserved")
+    return Scenario(
+        outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
+        ufuns=ufuns,
+    )
 
 
 def mixed_scenarios(
@@ -573,7 +1130,13 @@ def mixed_scenarios(
     | list[int | float] = DEFAULT2024SETTINGS["generator_params"]["n_pareto"],  # type: ignore
     pareto_log_uniform: bool = False,
     n_trials=10,
-) -> list[Scenario]:
+    seed: int | None = None,
+    njobs: int = -1,
+    lazy: bool = False,
+    storage: Path | str | None = None,
+    storage_dtype: str = "float64",
+    integer_outcomes: bool = False,
+) -> list[Scenario] | Iterator[Scenario]:
     """Generates a mix of zero-sum, monotonic and general scenarios
 
     Args:
@@ -594,95 +1157,40 @@ def mixed_scenarios(
                 Can be specified as a number, a tuple of a min and max to sample within, a list of possibilities.
                 Each value can either be an integer > 1 or a fraction of the number of outcomes in the scenario.
         pareto_log_uniform: Use log-uniform instead of uniform sampling if n_pareto is a tuple
-        n_trials: Number of times to retry generating each scenario if failures occures
+        n_trials: Number of times to retry generating each scenario if failures occures. Bilateral single-issue
+                  scenarios are generated constructively and never need retries.
+        seed, njobs, lazy, storage, storage_dtype, integer_outcomes: Shared by all generators (see `generate_scenarios`)
 
     Returns:
         A list `Scenario` s
+
+    Remarks:
+        - A warning is issued for every scenario skipped because all its trials failed. Use
+          `record_generation_stats` to find out how many attempts failed and the time they took.
     """
     assert zerosum_fraction + monotonic_fraction <= 1.0
-    nongeneral_fraction = zerosum_fraction + monotonic_fraction
-    ufun_sets = []
-    for i in range(n_scenarios):
-        r = random.random()
-        n = intin(n_outcomes, log_uniform)
-        name = "S"
-        if r < nongeneral_fraction:
-            n_pareto_selected = n
-            name = "DivideThePieGen"
-        else:
-            if isinstance(n_pareto, Iterable):
-                n_pareto = type(n_pareto)(
-                    int(_ * n + 0.5) if _ < 1 else int(_)
-                    for _ in n_pareto  # type: ignore
-                )
-            else:
-                n_pareto = int(0.5 + n_pareto * n) if n_pareto < 1 else int(n_pareto)
-            n_pareto_selected = intin(n_pareto, log_uniform=pareto_log_uniform)  # type: ignore
-        ufuns, vals = None, None
-        for _ in range(n_trials):
-            try:
-                if r < zerosum_fraction:
-                    name = "DivideThePie"
-                    vals = generate_utility_values(
-                        n_pareto=n_pareto_selected,
-                        n_outcomes=n,
-                        n_ufuns=n_ufuns,
-                        pareto_first=pareto_first,
-                        pareto_generator="zero_sum",
-                    )
-                elif r < zerosum_fraction + pies_fraction:
-                    name = "DivideThePies"
-                    ufuns = generate_multi_issue_ufuns(
-                        n_issues=3,
-                        n_values=(9, 11),
-                        pareto_generators=tuple(GENERATOR_MAP.keys()),
-                        ufun_names=("First0", "Second1"),
-                        os_name=f"{name}{i}",
-                    )
-                else:
-                    if n_pareto_selected < 2:
-                        n_pareto_selected = 2
-                    vals = generate_utility_values(
-                        n_pareto=n_pareto_selected,
-                        n_outcomes=n,
-                        n_ufuns=n_ufuns,
-                        pareto_first=pareto_first,
-                        pareto_generator="curve"
-                        if random.random() < curve_fraction
-                        else "piecewise_linear",
-                    )
-                break
-            except Exception:
-                continue
-        else:
-            continue
-
-        if ufuns is None:
-            issues = (make_issue([f"{i}_{n-1 - i}" for i in range(n)], "portions"),)
-            ufuns = tuple(
-                U(
-                    values=(
-                        TableFun(
-                            {_: float(vals[i][k]) for i, _ in enumerate(issues[0].all)}  # type: ignore
-                        ),
-                    ),
-                    name=f"{uname}{i}",
-                    # reserved_value=(r[0] + random.random() * (r[1] - r[0] - 1e-8)),
-                    outcome_space=make_os(issues, name=f"{name}{i}"),
-                )
-                for k, uname in enumerate(("First", "Second"))
-                # for k, (uname, r) in enumerate(zip(("First", "Second"), reserved_ranges))
-            )
-        sample_reserved_values(ufuns, reserved_ranges=reserved_ranges)
-        ufun_sets.append(ufuns)
-
-    return [
-        Scenario(
-            outcome_space=ufuns[0].outcome_space,  # type: ignore We are sure this is not None
-            ufuns=ufuns,
-        )
-        for ufuns in ufun_sets
-    ]
+    return generate_scenarios(
+        _mixed_scenario,
+        n_scenarios,
+        seed=seed,
+        njobs=njobs,
+        lazy=lazy,
+        storage=storage,
+        storage_dtype=storage_dtype,
+        integer_outcomes=integer_outcomes,
+        n_outcomes=n_outcomes,
+        reserved_ranges=reserved_ranges,
+        log_uniform=log_uniform,
+        zerosum_fraction=zerosum_fraction,
+        monotonic_fraction=monotonic_fraction,
+        curve_fraction=curve_fraction,
+        pies_fraction=pies_fraction,
+        pareto_first=pareto_first,
+        n_ufuns=n_ufuns,
+        n_pareto=n_pareto,
+        pareto_log_uniform=pareto_log_uniform,
+        n_trials=n_trials,
+    )
 
 
 GENMAP = dict(
@@ -698,6 +1206,42 @@ DEFAULT2024GENERATOR = mixed_scenarios
 """Default generator type for ANL 2024"""
 
 
+def _opponent_private_infos(s: Scenario, analytics: bool = False) -> tuple[dict, ...]:
+    """Creates the private information of both negotiators.
+
+    Remarks:
+        - Every negotiator receives a view of its partner's ufun without its reserved value.
+        - If `analytics` is given, every negotiator also receives the analytics of the scenario seen from its side
+          (see `ANLNegotiator.analytics`).
+    """
+    infos = tuple(
+        dict(opponent_ufun=OpponentUfun(u, reserved_value=0))  # type: ignore
+        for u in s.ufuns[::-1]
+    )
+    if not analytics:
+        return infos
+    found = ScenarioAnalytics.from_scenario(s)
+    for i, info in enumerate(infos):
+        info["analytics"] = None if found is None else found.for_side(i)
+    return infos
+
+
+def _save_binary_scenarios(path: Path) -> None:
+    """Replaces the scenarios saved in yaml format in a tournament folder (e.g. by `cartesian_tournament`) by binary ones"""
+    for folder in sorted((path / SCENARIOS_DIR_NAME).glob("*")):
+        scenario = load_scenario(folder) if folder.is_dir() else None
+        if scenario is not None:
+            save_scenario(scenario, folder, text=False)
+
+
+def accepted_params(f: Callable, **kwargs) -> dict[str, Any]:
+    """Returns the subset of `kwargs` that `f` accepts as keyword arguments"""
+    params = inspect.signature(f).parameters
+    if any(_.kind == inspect.Parameter.VAR_KEYWORD for _ in params.values()):
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in params}
+
+
 def anl2024_tournament(
     scenarios: tuple[Scenario, ...] | list[Scenario] = tuple(),
     n_scenarios: int = DEFAULT2024SETTINGS["n_scenarios"],  # type: ignore
@@ -734,6 +1278,7 @@ def anl2024_tournament(
     name: str | None = None,
     nologs: bool = False,
     njobs: int = 0,
+    generation_njobs: int = -1,
     plot_fraction: float = 0.2,
     verbosity: int = 1,
     save_every: int = 0,
@@ -741,6 +1286,19 @@ def anl2024_tournament(
     base_path: Path | None = None,
     plot_params: dict[str, Any] | None = None,
     raise_exceptions: bool = True,
+    seed: int | None = None,
+    cache_path: Path | str | None = None,
+    stream: bool = False,
+    prefetch: int = 2,
+    quick_eval: int | float | None = None,
+    resume: bool = False,
+    executor: Executor | None = None,
+    shard: tuple[int, int] | None = None,
+    longest_first: bool = False,
+    racing: float | None = None,
+    share_scenarios: bool = False,
+    analytics: bool = False,
+    binary_scenarios: bool = False,
 ) -> SimpleTournamentResults:
     """Runs an ANL 2024 tournament
 
@@ -767,19 +1325,91 @@ def anl2024_tournament(
         verbosity: Verbosity level. The higher the more verbose
         self_play: Allow negotiators to run against themselves.
         randomize_runs: Randomize the order of negotiations
-        sort_runs: Make negotiations with shorter limits and outcome space sizes
+        sort_runs: Make negotiations with shorter limits and outcome space sizes (and easier scenarios among those of the same size) run first
         save_every: Save logs every this number of negotiations
-        save_stats: Save statistics for scenarios
+        save_stats: Save statistics for scenarios. The profiles of all scenarios are also saved in one table (see `profile_scenarios`)
         known_partner: Allow negotiators to know the type of their partner (through their ID)
         final_score: The metric and statistic used to calculate the score. Metrics are: advantage, utility, welfare, partner_welfare and Stats are: median, mean, std, min, max
         base_path: Folder in which to generate the logs folder for this tournament. Default is ~/negmas/anl2024/tournaments
         scenario_generator: An alternative method for generating bilateral negotiation scenarios. Must receive the number of scenarios and number of outcomes.
         generator_params: Parameters passed to the scenario generator
         plot_params: If given, overrides plotting parameters. See `nemgas.sao.SAOMechanism.plot()` for all parameters
+        seed: If given, scenarios are generated deterministically from this seed whatever the number of jobs used.
+              It is passed to the scenario generator if it accepts it. Negotiations are also run with the global random
+              generators seeded with it so that mechanism parameters given as ranges (e.g. `n_steps`) are drawn the same
+              way by every run. Sharded and resumed tournaments draw them for every scenario independently of the other
+              scenarios (see `seed` in `streaming_tournament`) so that all shards draw the same ones.
+        generation_njobs: Number of parallel processes used by the scenario generator (if it accepts `njobs`).
+                          -1 for serial (the default as a pool only pays off for many or large scenarios) and 0 for all cores.
+        cache_path: If given (and `seed` is given), generated scenarios are cached in this folder and reused
+                    whenever the same generator is called with the same parameters and seed. See `ScenarioCache`.
+        stream: If given, scenarios are generated lazily and negotiations start as soon as the first scenario is ready.
+                `sort_runs` is ignored and `randomize_runs` only shuffles negotiations within each scenario (see `streaming_tournament`).
+        prefetch: Maximum number of scenarios generated ahead of negotiations when streaming
+        quick_eval: If given, only a representative subset of the scenarios is used. Either the number of scenarios to use
+                    or (if less than one) the fraction of scenarios to use. Scenarios are selected by clustering (see
+                    `representative_scenarios`) and a report of the ranking weighted by the number of scenarios each selected
+                    scenario represents and its sensitivity to these weights is printed and saved in the tournament folder
+                    (see `quick_eval_report`). Scenarios are never streamed in quick evaluation.
+        resume: If given and the tournament folder (see `name` and `base_path`) has results of an interrupted run of the same
+                tournament, negotiations completed in that run are not repeated and their saved results are used instead
+                (see `load_completed_runs`). Scenarios saved in the folder replace the given or generated scenarios of the
+                same name so that all negotiations use the same scenarios (see `resume_scenarios`) with the same mechanism
+                parameters (e.g. `n_steps` drawn from a range, see `saved_mechanism_params`). Generated scenarios need the
+                `seed` of the interrupted run. Resumed tournaments are always run as streaming tournaments (see
+                `streaming_tournament`). Has no effect if `nologs` is given.
+        executor: If given, negotiations are run by this executor instead of local processes (e.g. a `DistributedExecutor`
+                  to run them on workers on several hosts). Tournaments with an executor are always run as streaming
+                  tournaments. The executor is left running and the caller shuts it down.
+        shard: If given as (i, n), only the i-th of n disjoint subsets of the negotiations is run (starting from zero) so that
+               one tournament can be split into independent jobs. All shards must be run with the same settings and `seed`
+               (or `scenarios`) and `combine_shards` merges their results into those of the whole tournament. Sharded
+               tournaments are always run as streaming tournaments (see `shard` in `streaming_tournament`).
+        longest_first: If given, negotiations are dispatched to free processes longest-expected-first using a cost model
+                       (number of steps, outcome-space size and the step time of every competitor) refined as results
+                       arrive (see `CostModel`) so that long negotiations do not leave most processes idle at the end.
+                       `sort_runs` and `randomize_runs` are ignored and the tournament is run as a streaming tournament.
+                       Has no effect on serial runs.
+        racing: If given, repetitions are run in rounds and negotiations that can no longer change the ranking are not
+                repeated (see `race`). The value is the error level of the confidence intervals of the mean `final_score`
+                metric of competitors (e.g. 0.05) and `n_repetitions` becomes the maximum number of repetitions.
+                Racing tournaments are always run as streaming tournaments on all scenarios loaded in memory and cannot
+                be combined with `quick_eval`.
+        share_scenarios: If given, parallel workers on this machine load every scenario once from shared memory and
+                         negotiations only reference it instead of pickling the scenario, ufuns and private information
+                         for every negotiation (see `SharedScenarios`). The tournament is run as a streaming tournament.
+        analytics: If given, the analytics of every scenario are calculated once and passed to negotiators with their
+                   private information (see `ANLNegotiator.analytics`). They are sent with every negotiation run by
+                   other processes (unless `share_scenarios` is given) so they are only worth it for competitors that
+                   use them.
+        binary_scenarios: If given, scenarios are saved in the tournament folder in binary format (which loads fast, e.g.
+                          in the visualizer) instead of yaml (see `save_scenario`). Saved scenarios are loaded in either
+                          format (see `load_scenario`).
 
     Returns:
         Tournament results as a `SimpleTournamentResults` object.
     """
+    if racing is not None and not 0 < racing < 1:
+        raise ValueError(
+            f"Invalid error level {racing} for racing: expected a value in (0, 1)"
+        )
+    if racing is not None and quick_eval:
+        raise ValueError("Racing cannot be combined with quick evaluation")
+    if shard is not None:
+        if not 0 <= shard[0] < shard[1]:
+            raise ValueError(
+                f"Invalid shard {shard}: expected (i, n) with 0 <= i < n"
+            )
+        if n_scenarios > 0 and seed is None:
+            raise ValueError(
+                "All shards must generate the same scenarios: pass a seed"
+            )
+    if resume and not nologs and n_scenarios > 0 and seed is None:
+        # scenarios generated without a seed may not even have the same names as those of the interrupted run
+        raise ValueError(
+            "Resumed tournaments must generate the same scenarios: "
+            "pass the seed of the interrupted run"
+        )
     if generator_params is None:
         generator_params = dict()
     if isinstance(scenario_generator, str):
@@ -814,29 +1444,31 @@ def anl2024_tournament(
     )
     if plot_params:
         params = params.update(plot_params)
-    scenarios = list(scenarios) + list(
-        scenario_generator(n_scenarios, n_outcomes, **generator_params)
-    )
-    private_infos = [
-        tuple(
-            dict(
-                opponent_ufun=U(
-                    values=_.values,  # type: ignore
-                    weights=_.weights,  # type: ignore
-                    bias=_._bias,  # type: ignore
-                    reserved_value=0,
-                    outcome_space=_.outcome_space,
-                )
-            )  # type: ignore
-            for _ in s.ufuns[::-1]
+    generator_params = accepted_params(
+        scenario_generator, seed=seed, njobs=generation_njobs, lazy=stream
+    ) | generator_params
+    if cache_path is not None:
+        generated = ScenarioCache(cache_path).generate(
+            scenario_generator, n_scenarios, n_outcomes, **generator_params
         )
-        for s in scenarios
-    ]
-    return cartesian_tournament(
+    else:
+        generated = scenario_generator(n_scenarios, n_outcomes, **generator_params)
+    completed, scenario_mparams = None, None
+    if resume and path is not None:
+        completed = load_completed_runs(path)
+        # negotiations not completed yet use the limits drawn for their scenario in the interrupted run
+        scenario_mparams = partial(saved_mechanism_params, path)
+        scenarios = resume_scenarios(scenarios, path)
+        generated = resume_scenarios(generated, path)
+        if verbosity > 0:
+            print(
+                f"Resuming {path}: {len(completed)} negotiations are already completed"
+            )
+    private_infos_for = partial(_opponent_private_infos, analytics=analytics)
+    run_streaming = partial(
+        streaming_tournament,
         competitors=tuple(competitors),
-        scenarios=scenarios,
         competitor_params=competitor_params,
-        private_infos=private_infos,  # type: ignore
         rotate_ufuns=rotate_ufuns,
         n_repetitions=n_repetitions,
         path=path,
@@ -854,7 +1486,6 @@ def anl2024_tournament(
         verbosity=verbosity,
         self_play=self_play,
         randomize_runs=randomize_runs,
-        sort_runs=sort_runs,
         save_every=save_every,
         save_stats=save_stats,
         final_score=final_score,
@@ -862,6 +1493,258 @@ def anl2024_tournament(
         name_reveals_type=True,
         plot_params=params,
         raise_exceptions=raise_exceptions,
+        prefetch_size=prefetch,
+        completed=completed,
+        executor=executor,
+        shard=shard,
+        scheduler=CostModel() if longest_first else None,
+        scenario_mechanism_params=scenario_mparams,
+        share_scenarios=share_scenarios,
+        binary_scenarios=binary_scenarios,
+        # shards run different subsets of the scenarios so each scenario draws its limits on its own
+        seed=seed if shard is not None or completed is not None else None,
+    )
+    # cartesian_tournament cannot skip completed negotiations, use an executor, run a shard,
+    # schedule runs or share scenarios
+    use_streaming = longest_first or share_scenarios or any(
+        _ is not None for _ in (completed, executor, shard)
+    )
+    if racing is not None:
+        scenarios = list(scenarios) + list(generated)
+        # every round draws the same limits for a scenario and reuses its rotations and statistics
+        return race(
+            partial(
+                run_streaming,
+                scenarios=scenarios,
+                private_infos=[private_infos_for(s) for s in scenarios],
+                seed=seed if seed is not None else random.randrange(2**31),
+                rotations_cache=dict(),
+            ),
+            n_repetitions,
+            metric=final_score[0],
+            alpha=racing,
+            completed=completed,
+            verbosity=verbosity,
+        )
+    if (stream or use_streaming) and not quick_eval:
+        with _seeded(seed):
+            return run_streaming(
+                scenarios=itertools.chain(scenarios, generated),
+                private_infos=private_infos_for,
+            )
+    scenarios = list(scenarios) + list(generated)
+    private_infos = [private_infos_for(s) for s in scenarios]
+    n_candidates, quick_weights = len(scenarios), dict()
+    if quick_eval:
+        n_quick = (
+            int(quick_eval) if quick_eval >= 1 else round(quick_eval * n_candidates)
+        )
+        selected, weights = representative_scenarios(
+            profile_scenarios(
+                scenarios, [p[0].get("analytics", None) for p in private_infos]
+            ),
+            max(1, n_quick),
+            seed=seed,
+        )
+        scenarios = [scenarios[_] for _ in selected]
+        private_infos = [private_infos[_] for _ in selected]
+        quick_weights = {
+            str(s.outcome_space.name): w for s, w in zip(scenarios, weights)
+        }
+    profiles = None
+    if save_stats and path is not None:
+        # profiles reuse the analytics already calculated for negotiators if any
+        profiles = profile_scenarios(
+            scenarios,
+            [p[0].get("analytics", None) for p in private_infos],
+            rotate_ufuns=rotate_ufuns,
+        )
+    if sort_runs:
+        # runs are sorted by scenario size so easier scenarios of the same size come first if profiles are saved
+        if profiles is not None:
+            base = profiles.iloc[:: 2 if rotate_ufuns else 1].reset_index(drop=True)
+            order = base.sort_values(["n_outcomes", "difficulty"], kind="stable").index
+        else:
+            order = sorted(
+                range(len(scenarios)),
+                key=lambda i: scenarios[i].outcome_space.cardinality,
+            )
+        scenarios = [scenarios[_] for _ in order]
+        private_infos = [private_infos[_] for _ in order]
+    with _seeded(seed):
+        if use_streaming:
+            results = run_streaming(scenarios=scenarios, private_infos=private_infos)
+        else:
+            # newer versions of NegMAS run serial negotiations with time limits in forked worker processes which hang
+            # after negotiations ran in this process (e.g. of an earlier tournament). Serial runs stay in this process.
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="process_isolation is disabled")
+                results = cartesian_tournament(
+                    competitors=tuple(competitors),
+                    scenarios=scenarios,
+                    competitor_params=competitor_params,
+                    private_infos=private_infos,  # type: ignore
+                    rotate_ufuns=rotate_ufuns,
+                    n_repetitions=n_repetitions,
+                    path=path,
+                    njobs=njobs,
+                    mechanism_type=SAOMechanism,
+                    n_steps=n_steps,
+                    time_limit=time_limit,
+                    hidden_time_limit=hidden_time_limit,
+                    pend=pend,
+                    pend_per_second=pend_per_second,
+                    step_time_limit=step_time_limit,
+                    negotiator_time_limit=negotiator_time_limit,
+                    mechanism_params=None,
+                    plot_fraction=plot_fraction,
+                    verbosity=verbosity,
+                    self_play=self_play,
+                    randomize_runs=randomize_runs,
+                    sort_runs=sort_runs,
+                    save_every=save_every,
+                    save_stats=save_stats,
+                    final_score=final_score,
+                    id_reveals_type=known_partner,
+                    name_reveals_type=True,
+                    plot_params=params,
+                    raise_exceptions=raise_exceptions,
+                    **accepted_params(
+                        cartesian_tournament,
+                        process_isolation=False if njobs < 0 else None,
+                    ),
+                )
+            if path is not None:
+                save_competitors(path, competitors, competitor_params, self_play)
+                if binary_scenarios:
+                    _save_binary_scenarios(path)
+    if profiles is not None:
+        profiles.to_csv(Path(path) / SCENARIO_PROFILES_FILE_NAME, index=False)
+    if quick_eval:
+        report = quick_eval_report(
+            results.scores, quick_weights, n_candidates, final_score, seed=seed
+        )
+        if verbosity > 0:
+            print(
+                f"Quick evaluation on {report['n_selected']} of {n_candidates} scenarios: "
+                f"Kendall tau to rankings with resampled weights {report['reweighted_kendall_tau']:0.3f} "
+                f"(same winner in {report['reweighted_winner_stability']:0.0%} of resamples, "
+                "ignoring differences between the scenarios each selected scenario represents)"
+            )
+            print(pd.DataFrame.from_records(report["ranking"]))
+        if path is not None:
+            dump(report, Path(path) / QUICK_EVAL_FILE_NAME)
+    return results
+
+
+def extend_tournament(
+    path: Path | str,
+    competitors: Sequence[type[Negotiator] | str],
+    competitor_params: Sequence[dict | None] | None = None,
+    njobs: int = 0,
+    verbosity: int = 1,
+    self_play: bool | None = None,
+    randomize_runs: bool = True,
+    save_every: int = 0,
+    known_partner: bool = False,
+    final_score: tuple[str, str] = ("advantage", "mean"),
+    raise_exceptions: bool = True,
+    executor: Executor | None = None,
+    analytics: bool = False,
+) -> SimpleTournamentResults:
+    """Adds competitors to a completed tournament running only the negotiations they take part in.
+
+    Args:
+        path: The tournament folder (e.g. `DEFAULT_TOURNAMENT_PATH / name` for a tournament run with `name`)
+        competitors: The competitors to add
+        competitor_params: Parameters of the added competitors
+        njobs: Number of parallel processes. -1 for serial and 0 for all cores
+        self_play: Whether added competitors negotiate against themselves. If not given, the setting of the tournament
+                   is used. It must match the setting of the tournament if given.
+        executor: If given, negotiations are run by this executor instead of local processes (see `anl2024_tournament`)
+
+    Returns:
+        Tournament results of all competitors (existing and added) which are also saved in the tournament folder.
+
+    Remarks:
+        - Negotiations run on the scenarios saved in the folder with the mechanism parameters (e.g. number of steps) saved
+          with each of them (see `saved_scenarios` and `saved_mechanism_params`) and the number of repetitions of the
+          existing negotiations. Only pairings with at least one added competitor are run (in all orders) so adding one
+          competitor to a tournament of N costs O(N) negotiations instead of O(N^2).
+        - Existing competitors are found from the saved negotiations and use the parameters saved with the tournament
+          (see `saved_competitors`). Tournaments with no saved competitors can only be extended if all existing
+          competitors used their default parameters. If adding competitors changes their shortened names, the saved
+          results are renamed accordingly.
+        - All other parameters have the same meaning as in `anl2024_tournament`.
+    """
+    path = Path(path)
+    completed = load_completed_runs(path)
+    if not completed:
+        raise ValueError(f"No completed negotiations found in {path}")
+    found: dict[str, str] = dict()
+    for record in completed.values():
+        found.update(zip(record["partners"], record["negotiator_types"]))
+    existing = list(dict.fromkeys(found[_] for _ in sorted(found)))
+    saved = saved_competitors(path)
+    if saved is not None:
+        existing_params, saved_self_play = saved
+    elif any(record.get("params", None) for record in completed.values()):
+        raise ValueError(
+            f"The competitors of the tournament at {path} used parameters that were not saved"
+        )
+    else:
+        existing_params = dict()
+        saved_self_play = any(
+            len(set(record["partners"])) == 1 for record in completed.values()
+        )
+    if self_play is None:
+        self_play = saved_self_play
+    elif self_play != saved_self_play:
+        raise ValueError(
+            f"The tournament at {path} was run with self_play={saved_self_play}"
+        )
+    added = [get_full_type_name(get_class(_)) for _ in competitors]
+    if repeated := [_ for _ in added if _ in existing]:
+        raise ValueError(f"{repeated} already competed in the tournament at {path}")
+    all_types = existing + added
+    names = dict(zip(all_types, shortest_unique_names(all_types)))
+    if any(names[t] != name for name, t in found.items()):
+        for record in completed.values():
+            record["partners"] = [names[found[_]] for _ in record["partners"]]
+        completed = {
+            (scenario, tuple(names[found[_]] for _ in partners), rep): record
+            for (scenario, partners, rep), record in completed.items()
+        }
+    if competitor_params is None:
+        competitor_params = [dict() for _ in added]
+    n_repetitions = 1 + max(rep for _, _, rep in completed)
+    if verbosity > 0:
+        print(
+            f"Extending {path} ({len(completed)} negotiations between {len(existing)} competitors) with {added}"
+        )
+    return streaming_tournament(
+        competitors=tuple(all_types),
+        scenarios=saved_scenarios(path),
+        private_infos=partial(_opponent_private_infos, analytics=analytics),
+        competitor_params=[existing_params.get(_, dict()) for _ in existing]
+        + list(competitor_params),
+        rotate_ufuns=False,
+        n_repetitions=n_repetitions,
+        path=path,
+        njobs=njobs,
+        mechanism_type=SAOMechanism,
+        verbosity=verbosity,
+        self_play=self_play,
+        randomize_runs=randomize_runs,
+        save_every=save_every,
+        save_scenario_figs=False,
+        final_score=final_score,
+        id_reveals_type=known_partner,
+        name_reveals_type=True,
+        raise_exceptions=raise_exceptions,
+        completed=completed,
+        executor=executor,
+        scenario_mechanism_params=partial(saved_mechanism_params, path),
     )
 
 
@@ -0,0 +1,132 @@
+"""
+Scheduling negotiations of a tournament longest-expected-first using an online cost model.
+"""
+import bisect
+import itertools
+import math
+from typing import Any
+
+__all__ = ["CostModel", "RunQueue"]
+
+
+def _limit(x) -> float:
+    return float("inf") if x is None else float(x)
+
+
+class CostModel:
+    """Estimates the running time of negotiations and refines its estimates as results arrive.
+
+    Args:
+        step_time: The time of one step of one negotiator (in seconds) assumed before any result of it is known
+        smoothing: The weight of every new result in the running estimate of the fraction of the allowed steps used
+                   by every combination of partners
+
+    Remarks:
+        - The expected time of a negotiation is its number of steps times the sum of the expected step time of all partners
+          on outcome-spaces of the same order of magnitude (bounded by its time limits if any).
+        - The number of steps is the allowed number of steps times the fraction of it used by the same partners
+          before (e.g. partners that agree quickly use only a small fraction).
+        - Step times are the total time of past negotiations divided by their steps and shared between partners in
+          proportion to their own time (`negotiator_times` of the results).
+    """
+
+    def __init__(self, step_time: float = 1e-3, smoothing: float = 0.3):
+        self.step_time = step_time
+        self.smoothing = smoothing
+        self._used: dict[tuple[str, ...], float] = dict()
+        self._times: dict[tuple[str, int], list[float]] = dict()
+        self._competitor_times: dict[str, list[float]] = dict()
+
+    @staticmethod
+    def size_bucket(info: dict[str, Any]) -> int:
+        """The order of magnitude of the number of outcomes of a negotiation (i.e. of a run of `run_negotiation`)"""
+        n = info["s"].outcome_space.cardinality
+        return math.ceil(math.log10(n)) if 1 <= n < float("inf") else -1
+
+    @staticmethod
+    def run_class(info: dict[str, Any]) -> tuple[tuple[str, ...], int]:
+        """Negotiations of the same class differ in their expected time only through their limits"""
+        return tuple(info["partner_names"]), CostModel.size_bucket(info)
+
+    @staticmethod
+    def limits(info: dict[str, Any]) -> tuple[float, float]:
+        """The allowed number of steps and time of a negotiation (infinite if not limited)"""
+        mparams = info.get("mechanism_params") or dict()
+        time_limit = min(
+            _limit(mparams.get("time_limit", None)),
+            _limit(mparams.get("hidden_time_limit", None)),
+        )
+        return _limit(mparams.get("n_steps", None)), time_limit
+
+    def competitor_step_time(self, name: str, bucket: int) -> float:
+        """The expected time of one step of a competitor on outcome-spaces with the given order of magnitude"""
+        t, n = self._times.get((name, bucket), (0.0, 0))
+        if n > 0:
+            return t / n
+        t, n = self._competitor_times.get(name, (0.0, 0))
+        return t / n if n > 0 else self.step_time
+
+    def estimate(self, info: dict[str, Any]) -> float:
+        """The expected time of a negotiation in seconds (infinite if it is not limited)"""
+        names, bucket = self.run_class(info)
+        n_steps, time_limit = self.limits(info)
+        per_step = sum(self.competitor_step_time(_, bucket) for _ in names)
+        steps = n_steps * self._used.get(names, 1.0)
+        return min(steps * per_step, time_limit)
+
+    def update(self, info: dict[str, Any], record: dict[str, Any]) -> None:
+        """Refines the estimates given the record of a completed negotiation"""
+        names, bucket = self.run_class(info)
+        steps = max(1, int(record.get("last_step", None) or record.get("step", 0) or 0))
+        n_steps, _ = self.limits(info)
+        if math.isfinite(n_steps) and n_steps > 0:
+            used, old = min(1.0, steps / n_steps), self._used.get(names, None)
+            self._used[names] = (
+                used if old is None else old + self.smoothing * (used - old)
+            )
+        total = float(record.get("execution_time", 0.0) or 0.0)
+        times = [float(_ or 0.0) for _ in record.get("negotiator_times", None) or []]
+        if len(times) != len(names) or sum(times) <= 0:
+            times = [1.0] * len(names)
+        for name, t in zip(names, times):
+            share = total * t / sum(times)
+            for stats, key in (
+                (self._times, (name, bucket)),
+                (self._competitor_times, name),
+            ):
+                old_t, old_n = stats.get(key, (0.0, 0))
+                stats[key] = [old_t + share, old_n + steps]
+
+
+class RunQueue:
+    """Negotiations waiting to be dispatched longest-expected-first according to a `CostModel`.
+
+    Remarks:
+        - Negotiations of the same class (see `CostModel.run_class`) are kept sorted by their limits so finding the longest
+          one only needs one estimate per class. Estimates are recalculated on every `pop` so they always use the latest
+          state of the model.
+    """
+
+    def __init__(self, model: CostModel | None = None):
+        self.model = model if model is not None else CostModel()
+        self._classes: dict[tuple, list] = dict()
+        self._ids = itertools.count()
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def add(self, info: dict[str, Any]) -> None:
+        """Adds a negotiation (i.e. the parameters of `run_negotiation`)"""
+        runs = self._classes.setdefault(self.model.run_class(info), [])
+        bisect.insort(runs, (self.model.limits(info), next(self._ids), info))
+        self._n += 1
+
+    def pop(self) -> dict[str, Any]:
+        """Removes and returns the negotiation with the longest expected time"""
+        key = max(
+            (_ for _ in self._classes if self._classes[_]),
+            key=lambda _: self.model.estimate(self._classes[_][-1][-1]),
+        )
+        self._n -= 1
+        return self._classes[key].pop()[-1]
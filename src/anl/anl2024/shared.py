@@ -0,0 +1,198 @@
+"""
+Scenarios shared with local worker processes through memory-mapped files so that tasks only reference them.
+"""
+import itertools
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from negmas.inout import Scenario
+from negmas.preferences.ops import ScenarioStats
+from negmas.tournaments.neg.simple.cartesian import run_negotiation
+
+__all__ = [
+    "SharedScenarios",
+    "ScenarioRef",
+    "write_shared",
+    "load_shared",
+    "run_shared_negotiation",
+    "SHARED_CACHE_SIZE",
+]
+
+ScenarioRef = tuple[str, tuple[tuple[int, int], ...]]
+"""An object written by `write_shared`: the path of its file and the byte spans of its pickle and out-of-band buffers"""
+
+SHARED_CACHE_SIZE = 64
+"""Maximum number of shared objects every process keeps loaded (see `load_shared`)"""
+
+_ALIGNMENT = 64
+
+
+def _shared_folder() -> Path:
+    """The folder of shared files: `/dev/shm` (i.e. memory) if available and the temporary folder otherwise"""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+def write_shared(obj: Any, path: Path | str) -> ScenarioRef:
+    """Pickles an object to a file storing its numpy arrays out-of-band so that they can be mapped without copying.
+
+    Args:
+        obj: The object to write
+        path: The file to write it to
+
+    Returns:
+        A reference to pass to `load_shared` (in any process on this machine).
+    """
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    spans, offset = [], 0
+    with open(path, "wb") as f:
+        for chunk in [memoryview(data)] + [_.raw() for _ in buffers]:
+            offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+            f.seek(offset)
+            f.write(chunk)
+            spans.append((offset, offset + chunk.nbytes))
+            offset += chunk.nbytes
+    return str(path), tuple(spans)
+
+
+@lru_cache(maxsize=SHARED_CACHE_SIZE)
+def load_shared(ref: ScenarioRef) -> Any:
+    """Loads an object written by `write_shared` once per process.
+
+    Remarks:
+        - Arrays stored out-of-band are copy-on-write views on the mapped file so all processes share their pages.
+        - The file can be deleted once loaded. The mapping lives as long as the object does.
+    """
+    path, spans = ref
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapped)
+    (start, end), *buffers = spans
+    return pickle.loads(view[start:end], buffers=[view[a:b] for a, b in buffers])
+
+
+def run_shared_negotiation(ref: ScenarioRef, **kwargs) -> dict[str, Any]:
+    """Runs a negotiation (see `run_negotiation`) on a scenario shared by `SharedScenarios`.
+
+    Args:
+        ref: The shared scenario with the private information and statistics used with it
+        kwargs: All other parameters of `run_negotiation`
+    """
+    s, private_infos, stats = load_shared(ref)
+    return run_negotiation(s=s, private_infos=private_infos, stats=stats, **kwargs)
+
+
+class SharedScenarios:
+    """Scenarios written once to shared memory so that local worker processes load every one of them only once.
+
+    Args:
+        folder: The folder to create the shared files in. By default, `/dev/shm` (i.e. memory) is used if available.
+
+    Remarks:
+        - Every scenario is written with the private information and statistics used with it (see `write_shared`).
+          Utility tables and other numpy arrays are mapped by workers without copying and tasks only carry a small
+          `ScenarioRef` (see `run_shared_negotiation`) instead of pickling the scenario for every negotiation.
+        - Scenarios are identified by object so every (rotated) scenario is written once whatever the number of
+          negotiations on it. Its file is deleted when all negotiations reserved (or acquired) on it are released so
+          reserving all the negotiations planned on a scenario before running any of them keeps its file until the
+          last one is done whatever the order they run in.
+        - If the folder runs out of space, files are written to the temporary folder instead. If that fails too,
+          `ref` returns None and the scenario has to be passed to negotiations as usual.
+        - Only processes on this machine can load shared scenarios.
+    """
+
+    def __init__(self, folder: Path | str | None = None):
+        base = Path(folder) if folder is not None else _shared_folder()
+        base.mkdir(parents=True, exist_ok=True)
+        self.folder = Path(tempfile.mkdtemp(prefix="anl-scenarios-", dir=base))
+        self._folders = [self.folder]
+        # id of the scenario -> [scenario, reference (None until written, False if it cannot be), negotiations]
+        self._entries: dict[int, list] = dict()
+        self._ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reserve(self, s: Scenario, n: int = 1) -> None:
+        """Counts `n` more negotiations on a scenario without writing it (see `ref`)"""
+        # the scenario is kept so that its id is not reused while shared
+        entry = self._entries.setdefault(id(s), [s, None, 0])
+        entry[2] += n
+
+    def ref(
+        self,
+        s: Scenario,
+        private_infos: tuple[dict, ...] | None = None,
+        stats: ScenarioStats | None = None,
+    ) -> ScenarioRef | None:
+        """Returns the reference of a reserved scenario writing it first if needed (None if it cannot be written)"""
+        entry = self._entries.get(id(s), None)
+        if entry is None:
+            raise ValueError("Scenarios must be reserved (or acquired) before use")
+        if entry[1] is None:
+            entry[1] = self._write((s, private_infos, stats)) or False
+        return entry[1] or None
+
+    def _write(self, obj: Any) -> ScenarioRef | None:
+        name = f"{next(self._ids)}.pkl"
+        for k in range(2):
+            if k == len(self._folders):
+                # e.g. /dev/shm is full: fall back to the temporary folder
+                try:
+                    self._folders.append(
+                        Path(
+                            tempfile.mkdtemp(
+                                prefix="anl-scenarios-", dir=tempfile.gettempdir()
+                            )
+                        )
+                    )
+                except OSError:
+                    return None
+            path = self._folders[k] / name
+            try:
+                return write_shared(obj, path)
+            except OSError:
+                path.unlink(missing_ok=True)
+        return None
+
+    def acquire(
+        self,
+        s: Scenario,
+        private_infos: tuple[dict, ...] | None = None,
+        stats: ScenarioStats | None = None,
+    ) -> ScenarioRef | None:
+        """Returns the reference of a scenario for one more negotiation writing it first if needed (see `ref`)"""
+        self.reserve(s)
+        return self.ref(s, private_infos, stats)
+
+    def release(self, s: Scenario) -> None:
+        """Marks one negotiation on a scenario as done deleting its file after the last one"""
+        entry = self._entries.get(id(s), None)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del self._entries[id(s)]
+            if entry[1]:
+                Path(entry[1][0]).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Deletes all shared files"""
+        self._entries.clear()
+        for folder in self._folders:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def __enter__(self) -> "SharedScenarios":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,897 @@
+"""
+A streaming cartesian tournament in which negotiations start while scenarios are still being generated.
+
+Tournaments are run with `cartesian_tournament` unless they need something it cannot do (e.g. skipping completed
+negotiations, running a shard or using an external executor, see `anl2024_tournament`). Only then is the streaming
+tournament used. It runs every negotiation with negmas' `run_negotiation`, scores it with `make_scores` and saves
+results in the layout of `cartesian_tournament` so that they load with `SimpleTournamentResults.load`.
+"""
+
+import copy
+import itertools
+import math
+import queue
+import re
+import sys
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import product
+from os import cpu_count
+from pathlib import Path
+from random import Random, randint, random, shuffle
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import matplotlib.pyplot as plt
+import pandas as pd
+from negmas.helpers.inout import dump, load
+from negmas.helpers.strings import shortest_unique_names
+from negmas.helpers.types import get_class, get_full_type_name
+from negmas.inout import Scenario
+from negmas.mechanisms import Mechanism
+from negmas.negotiators import Negotiator
+from negmas.plots.util import plot_offline_run
+from negmas.preferences.ops import ScenarioStats, calc_scenario_stats
+from negmas.sao.mechanism import SAOMechanism
+from negmas.serialization import PYTHON_CLASS_IDENTIFIER, deserialize, serialize
+from negmas.tournaments.neg.simple import SimpleTournamentResults
+from negmas.tournaments.neg.simple.cartesian import (
+    ALL_RESULTS_FILE_NAME,
+    ALL_SCORES_FILE_NAME,
+    MECHANISM_FILE_NAME,
+    NEGOTIATIONS_DIR_NAME,
+    RESULTS_DIR_NAME,
+    SCENARIOS_DIR_NAME,
+    make_scores,
+    run_negotiation,
+)
+from rich import print
+from rich.progress import Progress
+
+from anl.anl2024.analytics import (
+    SCENARIO_PROFILES_FILE_NAME,
+    ScenarioAnalytics,
+    scenario_profile,
+)
+from anl.anl2024.formats import is_scenario, load_scenario, save_scenario
+from anl.anl2024.scheduling import CostModel, RunQueue
+from anl.anl2024.shared import SharedScenarios, run_shared_negotiation
+
+__all__ = [
+    "streaming_tournament",
+    "prefetch",
+    "load_completed_runs",
+    "resume_scenarios",
+    "saved_scenarios",
+    "saved_mechanism_params",
+    "combine_shards",
+    "save_competitors",
+    "saved_competitors",
+    "PrivateInfoMaker",
+    "RunKey",
+    "SHARD_FILE_NAME",
+    "COMPETITORS_FILE_NAME",
+]
+
+PrivateInfoMaker = Callable[[Scenario], tuple[dict, ...] | None]
+"""Type of callable that creates the private information of all negotiators in a scenario"""
+
+Rotation = tuple[Scenario, tuple[dict, ...], ScenarioStats | None]
+"""A scenario (possibly with rotated ufuns) with the private infos and statistics to use with it"""
+
+RunKey = tuple[str, tuple[str, ...], int]
+"""Identifies a negotiation of a tournament by its scenario name (with the rotation suffix), partner names and repetition"""
+
+SHARD_FILE_NAME = "shard.json"
+"""Name of the file describing the shard of a tournament stored in a tournament folder (see `streaming_tournament`)"""
+
+COMPETITORS_FILE_NAME = "competitors.json"
+"""Name of the file storing the competitors of a tournament and their settings in a tournament folder (see `save_competitors`)"""
+
+LOG_UNIFORM_LIMIT = 10
+"""Integer limits are sampled log-uniformly from ranges whose maximum is at least this multiple of their minimum"""
+
+MAX_TASKS_PER_CHILD = 10
+"""Number of negotiations after which processes of the local pool are replaced (python 3.13 or later)"""
+
+
+def prefetch(items: Iterable, f: Callable, size: int = 2) -> Iterator:
+    """Applies `f` to `items` in a background thread yielding the results in order.
+
+    Args:
+        items: The items to process. Consumed only by the background thread.
+        f: The function to apply to every item
+        size: Maximum number of results kept ready ahead of the consumer. Zero or negative processes items on demand
+              (i.e. no background thread).
+
+    Remarks:
+        - Exceptions raised while consuming `items` or in `f` are re-raised in the consumer.
+        - If the consumer stops early (e.g. by closing the iterator), the background thread stops after finishing the
+          item it is working on.
+    """
+    if size <= 0:
+        yield from map(f, items)
+        return
+    done = object()
+    ready = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for x in items:
+                if not put((f(x), None)):
+                    return
+        except BaseException as e:
+            put((None, e))
+        put((done, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            result, exception = ready.get()
+            if exception is not None:
+                raise exception
+            if result is done:
+                break
+            yield result
+    finally:
+        stop.set()
+
+
+def _rotations(
+    s: Scenario,
+    pinfo: tuple[dict, ...] | None,
+    rotate_ufuns: bool,
+    rotate_private_infos: bool,
+    save_stats: bool,
+) -> list[Rotation]:
+    """Creates all the versions of a scenario to negotiate about and calculates their statistics.
+
+    Remarks:
+        - This is what `cartesian_tournament` does for every scenario before saving it except that the given
+          scenario is not modified (ufuns are renamed on copies).
+        - It involves no I/O and no plotting so it is safe to run in a background thread.
+    """
+    pinfolst = list(pinfo) if pinfo else [dict() for _ in s.ufuns]
+    ufuns = [copy.copy(_) for _ in s.ufuns]
+    for i, u in enumerate(ufuns):
+        u.name = f"{i}_{u.name}"
+    # shallow copies share value functions with the scenario and the views of them in private information
+    # (see `OpponentUfun`) so tables are pickled once per negotiation
+    ufun_sets = [[copy.copy(_) for _ in ufuns]]
+    pinfo_sets = [tuple(pinfolst)]
+    if rotate_ufuns:
+        for _ in range(len(ufun_sets)):
+            last = ufun_sets[-1]
+            # copies are needed as every rotation renames its ufuns
+            ufun_sets.append([copy.copy(_) for _ in [last[-1]] + last[:-1]])
+            if rotate_private_infos and pinfolst:
+                pinfo_sets.append(tuple([pinfolst[-1]] + pinfolst[:-1]))
+            else:
+                pinfo_sets.append(tuple(pinfolst))
+    original_name = s.outcome_space.name
+    rotations = []
+    for i, (ufun_set, pinfo_tuple) in enumerate(zip(ufun_sets, pinfo_sets)):
+        if len(ufun_sets) > 1:
+            for j, u in enumerate(ufun_set):
+                n = "_".join(u.name.split("_")[1:])
+                u.name = f"{j}_{n}"
+            scenario = Scenario(
+                type(s.outcome_space)(
+                    issues=s.outcome_space.issues,
+                    name=f"{original_name}-{i}" if i else original_name,
+                ),
+                tuple(ufun_set),
+            )
+        else:
+            scenario = Scenario(s.outcome_space, tuple(ufuns))
+        stats = calc_scenario_stats(scenario.ufuns) if save_stats else None
+        rotations.append((scenario, pinfo_tuple, stats))
+    return rotations
+
+
+def _save_scenario(
+    scenario: Scenario,
+    original: Scenario,
+    stats: ScenarioStats | None,
+    mparams: dict[str, Any],
+    scenarios_path: Path,
+    mechanism_type: type[Mechanism],
+    save_scenario_figs: bool,
+    binary_scenarios: bool = False,
+    python_class_identifier=PYTHON_CLASS_IDENTIFIER,
+) -> None:
+    """Saves a scenario, its figure, statistics and mechanism parameters the same way `cartesian_tournament` does"""
+    this_path = scenarios_path / str(scenario.outcome_space.name)
+    if binary_scenarios:
+        save_scenario(scenario, this_path, text=False)
+    else:
+        scenario.to_yaml(this_path)
+    if save_scenario_figs:
+        plot_offline_run(
+            trace=[],
+            ids=["First", "Second"],
+            ufuns=original.ufuns,  # type: ignore
+            agreement=None,
+            timedout=False,
+            broken=False,
+            has_error=False,
+            names=["First", "Second"],
+            save_fig=True,
+            path=str(this_path),
+            fig_name="fig.png",
+            only2d=True,
+            show_annotations=False,
+            show_agreement=False,
+            show_pareto_distance=False,
+            show_nash_distance=False,
+            show_kalai_distance=False,
+            show_ks_distance=False,
+            show_max_welfare_distance=False,
+            show_max_relative_welfare_distance=False,
+            show_end_reason=False,
+            show_reserved=True,
+            show_total_time=False,
+            show_relative_time=False,
+            show_n_steps=False,
+        )
+    plt.close()
+    if stats is not None:
+        # newer versions of NegMAS load the fields of stats.json with the scenario and reject the class marker
+        stats_dict = serialize(stats, python_class_identifier=python_class_identifier)
+        stats_dict.pop(python_class_identifier, None)
+        dump(stats_dict, this_path / "stats.json")
+    dump(
+        dict(type=get_full_type_name(mechanism_type)) | mparams,
+        this_path / MECHANISM_FILE_NAME,
+    )
+
+
+def _sample(x, rng: Random | None = None, integer: bool = False):
+    """Samples a limit given as a value or a range the way `cartesian_tournament` does.
+
+    Args:
+        x: The limit or a (min, max) tuple to sample it from
+        rng: The generator to use. The global `random` generator if not given.
+        integer: Sample an integer. Ranges spanning an order of magnitude (or more) are sampled log-uniformly.
+    """
+    if not isinstance(x, tuple):
+        return x
+    if x[0] == x[-1]:
+        return x[0]
+    uniform = random if rng is None else rng.random
+    if not integer:
+        return x[0] + uniform() * (x[1] - x[0])
+    if x[0] > 0 and x[1] / x[0] >= LOG_UNIFORM_LIMIT:
+        low, high = (math.log(_) for _ in x)
+        return min(x[1], max(x[0], int(math.exp(uniform() * (high - low) + low))))
+    return randint(*x) if rng is None else rng.randint(*x)
+
+
+def _run_key(scenario: str, partners: Iterable[str], rep: int) -> RunKey:
+    return str(scenario), tuple(str(_) for _ in partners), int(rep)
+
+
+def load_completed_runs(path: Path | str) -> dict[RunKey, dict[str, Any]]:
+    """Loads the records of all negotiations already completed in a tournament folder.
+
+    Args:
+        path: The tournament folder
+
+    Returns:
+        A mapping from the key of every completed negotiation (see `RunKey`) to its record.
+
+    Remarks:
+        - Records are read from the per-negotiation files that `run_negotiation` writes as soon as a negotiation ends
+          so they are available even if the tournament was killed before saving any of its tables.
+        - Files that cannot be read (e.g. partially written when the tournament was killed) are ignored.
+    """
+    completed = dict()
+    for file_name in sorted((Path(path) / RESULTS_DIR_NAME).glob("*.json")):
+        try:
+            record = load(file_name)
+            rep = record.get("rep", (record.get("annotation") or dict()).get("rep"))
+            key = _run_key(record["scenario"], record["partners"], rep)
+        except Exception:
+            continue
+        # json has no tuples
+        if record.get("agreement", None) is not None:
+            record["agreement"] = tuple(record["agreement"])
+        completed.setdefault(key, record)
+    return completed
+
+
+def resume_scenarios(
+    scenarios: Iterable[Scenario], path: Path | str
+) -> Iterator[Scenario]:
+    """Replaces scenarios with the versions saved in a tournament folder under the same name.
+
+    Args:
+        scenarios: The scenarios of the tournament
+        path: The tournament folder
+
+    Remarks:
+        - This makes a resumed tournament negotiate on exactly the scenarios (including reserved values) of the interrupted
+          one even if they were generated without a seed. Scenarios not saved yet are used as they are.
+        - Scenarios are loaded lazily as they are consumed.
+        - Tournaments prefix the names of ufuns with their position before saving them. The prefix is removed.
+    """
+    folder = Path(path) / SCENARIOS_DIR_NAME
+    for s in scenarios:
+        loaded = _load_saved_scenario(folder / str(s.outcome_space.name))
+        yield s if loaded is None else loaded
+
+
+def _load_saved_scenario(folder: Path) -> Scenario | None:
+    """Loads a scenario saved by a tournament removing the position prefix of its ufun names (None if it cannot be loaded)"""
+    if not folder.is_dir() or not is_scenario(folder):
+        return None
+    try:
+        loaded = load_scenario(folder)
+    except Exception:
+        return None
+    for u in loaded.ufuns:
+        if u.name:
+            u.name = re.sub(r"^\d+_", "", u.name)
+    return loaded
+
+
+def saved_scenarios(path: Path | str) -> list[Scenario]:
+    """Loads all the scenarios saved in a tournament folder sorted by name.
+
+    Remarks:
+        - These are the scenarios negotiated about (i.e. including all rotations of ufuns) so they should be used
+          without rotating them again (see `saved_mechanism_params` for the mechanism parameters used with each).
+    """
+    folder = Path(path) / SCENARIOS_DIR_NAME
+    if not folder.is_dir():
+        return []
+    loaded = [_load_saved_scenario(_) for _ in sorted(folder.iterdir())]
+    return [_ for _ in loaded if _ is not None]
+
+
+def saved_mechanism_params(path: Path | str, scenario: Scenario) -> dict[str, Any]:
+    """The mechanism parameters (e.g. the number of steps drawn) saved with a scenario in a tournament folder (empty if none)"""
+    file_name = Path(path) / SCENARIOS_DIR_NAME / str(scenario.outcome_space.name)
+    file_name /= MECHANISM_FILE_NAME
+    if not file_name.exists():
+        return dict()
+    params = load(file_name)
+    params.pop("type", None)
+    return params
+
+
+def save_competitors(
+    path: Path | str,
+    competitors: Sequence[type[Negotiator] | str],
+    competitor_params: Sequence[dict | None] | None,
+    self_play: bool,
+    python_class_identifier=PYTHON_CLASS_IDENTIFIER,
+) -> None:
+    """Saves the competitors of a tournament with their parameters and whether they played against themselves.
+
+    Remarks:
+        - Tournaments save these in their folder so that they can be extended later with the same settings
+          (see `saved_competitors` and `extend_tournament`).
+    """
+    if competitor_params is None:
+        competitor_params = [dict() for _ in competitors]
+    dump(
+        dict(
+            competitors=[get_full_type_name(get_class(_)) for _ in competitors],
+            competitor_params=[
+                serialize(
+                    _ if _ else dict(), python_class_identifier=python_class_identifier
+                )
+                for _ in competitor_params
+            ],
+            self_play=self_play,
+        ),
+        Path(path) / COMPETITORS_FILE_NAME,
+    )
+
+
+def saved_competitors(
+    path: Path | str, python_class_identifier=PYTHON_CLASS_IDENTIFIER
+) -> tuple[dict[str, dict], bool] | None:
+    """Loads the competitors saved in a tournament folder by `save_competitors`.
+
+    Returns:
+        A mapping from the full type name of every competitor to its parameters and whether competitors played
+        against themselves. None if the folder has no saved competitors (e.g. tournaments run by `cartesian_tournament` directly).
+    """
+    file_name = Path(path) / COMPETITORS_FILE_NAME
+    if not file_name.exists():
+        return None
+    info = load(file_name)
+    params = [
+        deserialize(_, python_class_identifier=python_class_identifier)
+        for _ in info["competitor_params"]
+    ]
+    return dict(zip(info["competitors"], params, strict=True)), info["self_play"]
+
+
+def streaming_tournament(
+    competitors: list[type[Negotiator] | str] | tuple[type[Negotiator] | str, ...],
+    scenarios: Iterable[Scenario],
+    private_infos: Iterable[tuple[dict, ...] | None] | PrivateInfoMaker | None = None,
+    competitor_params: Sequence[dict | None] | None = None,
+    rotate_ufuns: bool = True,
+    rotate_private_infos: bool = True,
+    n_repetitions: int = 1,
+    path: Path | None = None,
+    njobs: int = 0,
+    mechanism_type: type[Mechanism] = SAOMechanism,
+    mechanism_params: dict[str, Any] | None = None,
+    n_steps: int | tuple[int, int] | None = 100,
+    time_limit: float | tuple[float, float] | None = None,
+    pend: float | tuple[float, float] = 0.0,
+    pend_per_second: float | tuple[float, float] = 0.0,
+    step_time_limit: float | tuple[float, float] | None = None,
+    negotiator_time_limit: float | tuple[float, float] | None = None,
+    hidden_time_limit: float | tuple[float, float] | None = None,
+    plot_fraction: float = 0.0,
+    plot_params: dict[str, Any] | None = None,
+    verbosity: int = 1,
+    self_play: bool = True,
+    randomize_runs: bool = True,
+    save_every: int = 0,
+    save_stats: bool = True,
+    save_scenario_figs: bool = True,
+    final_score: tuple[str, str] = ("advantage", "mean"),
+    id_reveals_type: bool = False,
+    name_reveals_type: bool = True,
+    shorten_names: bool = True,
+    raise_exceptions: bool = True,
+    mask_scenario_names: bool = True,
+    only_failures_on_self_play: bool = False,
+    prefetch_size: int = 2,
+    completed: dict[RunKey, dict[str, Any]] | None = None,
+    executor: Executor | None = None,
+    shard: tuple[int, int] | None = None,
+    scheduler: CostModel | None = None,
+    run_filter: Callable[[dict[str, Any]], bool] | None = None,
+    scenario_mechanism_params: Callable[[Scenario], dict[str, Any]] | None = None,
+    share_scenarios: bool = False,
+    binary_scenarios: bool = False,
+    seed: int | None = None,
+    rotations_cache: dict[str, list[Rotation]] | None = None,
+    python_class_identifier=PYTHON_CLASS_IDENTIFIER,
+) -> SimpleTournamentResults:
+    """A version of `cartesian_tournament` that consumes scenarios lazily and pipelines their preparation with negotiations.
+
+    Args:
+        competitors: A tuple of the competing negotiator types.
+        scenarios: An iterable of base scenarios (e.g. a generator returned by a scenario generator called with `lazy=True`).
+        private_infos: Either an iterable giving the private information of every negotiator for each scenario (in the same order)
+                       or a callable that creates it from the scenario. None for no private information.
+        prefetch_size: Maximum number of scenarios prepared (generated and with statistics calculated) ahead of the negotiations.
+                       Zero or negative prepares every scenario only when it is needed.
+        completed: Records of negotiations that are already completed (see `load_completed_runs`). These negotiations are
+                   not run again and their records are used instead (e.g. to resume an interrupted tournament).
+        executor: If given, negotiations are run by this executor (e.g. a `DistributedExecutor` serving workers on other hosts)
+                  instead of a local process pool whatever `njobs` is. It is not shut down so the caller can reuse it.
+        shard: If given as (i, n), only the i-th of n disjoint subsets of the negotiations is run (starting from zero).
+               Negotiations are enumerated in the same order by all shards given the same scenarios and settings and
+               every n-th one starting from the i-th is run. Use `combine_shards` to merge the results of all shards.
+        scheduler: If given in parallel runs, negotiations are dispatched longest-expected-first according to this cost
+                   model which is refined with the result of every negotiation (see `RunQueue`). Only one negotiation per
+                   process is pending so that the order is decided as late as possible. All scenarios are prepared
+                   before dispatching as the whole workload is needed to minimize the time of the tournament.
+        run_filter: If given, only negotiations (given as the parameters of `run_negotiation`) for which it returns True
+                    are run. Others are neither run nor recorded. It is applied after `shard` and `completed`.
+        scenario_mechanism_params: If given, returns mechanism parameters overriding those drawn for every (rotated) scenario
+                                   (e.g. `saved_mechanism_params` to use the same limits as an earlier tournament).
+        share_scenarios: If given in parallel runs on local processes, every scenario is written once to shared memory
+                         with its private information and statistics and negotiations only reference it so that
+                         workers load it once instead of unpickling it for every negotiation (see `SharedScenarios`).
+                         Ignored if `executor` is given.
+        binary_scenarios: If given, scenarios are saved in the tournament folder in binary format (which loads fast, e.g.
+                          in the visualizer) instead of the yaml format of `cartesian_tournament` (see `save_scenario`).
+                          Saved scenarios are loaded in either format (see `load_scenario`).
+        seed: If given, the mechanism parameters (e.g. `n_steps`) of every (rotated) scenario are drawn from their ranges
+              by a generator seeded with it and the position of the scenario so that they do not depend on the order of
+              drawing (e.g. all shards draw the same ones). Otherwise, they are drawn from the global `random` generator.
+        rotations_cache: If given, the rotated versions of every scenario and their statistics are stored in it by scenario
+                         name and reused by later calls with the same cache (e.g. the rounds of `race`) instead of being
+                         calculated again.
+
+    Remarks:
+        - All other parameters have the same meaning as in `cartesian_tournament`.
+        - Scenarios are pulled from `scenarios` by a background thread and at most `prefetch_size` prepared scenarios wait
+          for negotiations. In parallel runs, a new scenario is only taken when fewer than two negotiations per process are pending
+          so the number of scenarios in memory is bounded whatever the size of the tournament.
+        - `randomize_runs` shuffles negotiations within each scenario only. Runs cannot be sorted by scenario size
+          as scenarios are not known in advance (use `scheduler` to order all of them by their expected time).
+        - Timeouts of negotiations are enforced only through the time limits passed to the mechanism.
+        - Scenarios are saved (and figures plotted) in the main thread. Scenarios already saved in the tournament folder
+          (e.g. by an earlier call on it) are not saved again.
+        - With `save_stats`, the profiles of all scenarios are saved in one table (see `profile_scenarios`).
+        - Competitors, their parameters and `self_play` are saved in the tournament folder (see `save_competitors`).
+    """
+    if mechanism_params is None:
+        mechanism_params = dict()
+    mechanism_params["ignore_negotiator_exceptions"] = not raise_exceptions
+
+    competitors = [get_class(_) for _ in competitors]
+    if competitor_params is None:
+        competitor_params = [dict() for _ in competitors]
+    if shorten_names:
+        competitor_names = shortest_unique_names(
+            [get_full_type_name(_) for _ in competitors]
+        )
+    else:
+        competitor_names = [get_full_type_name(_) for _ in competitors]
+    competitor_info = list(
+        zip(competitors, competitor_params, competitor_names, strict=True)
+    )
+    scenarios_path = path if path is None else Path(path) / SCENARIOS_DIR_NAME
+    if scenarios_path is not None:
+        scenarios_path.mkdir(exist_ok=True, parents=True)
+
+    if private_infos is None:
+        pairs = ((s, None) for s in scenarios)
+    elif callable(private_infos):
+        make_pinfo = private_infos
+        pairs = ((s, make_pinfo(s)) for s in scenarios)
+    else:
+        pairs = zip(scenarios, private_infos)
+
+    def prepare(pair: tuple[Scenario, tuple[dict, ...] | None]):
+        s, pinfo = pair
+        name = str(s.outcome_space.name)
+        if rotations_cache is not None and name in rotations_cache:
+            return s, rotations_cache[name]
+        rotations = _rotations(s, pinfo, rotate_ufuns, rotate_private_infos, save_stats)
+        if rotations_cache is not None:
+            rotations_cache[name] = rotations
+        return s, rotations
+
+    def partners_for(s: Scenario) -> list:
+        partners_list = list(product(*tuple([competitor_info] * len(s.ufuns))))
+        if self_play:
+            return partners_list
+        return [
+            _
+            for _ in partners_list
+            if len(
+                {
+                    str(serialize(p, python_class_identifier=python_class_identifier))
+                    for p in _
+                }
+            )
+            > 1
+        ]
+
+    profiles: list[dict[str, Any]] = []
+
+    def add_profiles(s: Scenario, rotations: list[Rotation]) -> None:
+        # reuse the analytics given to negotiators if any (rotations after the first swap the sides)
+        pinfo = rotations[0][1]
+        analytics = pinfo[0].get("analytics", None) if pinfo else None
+        if not isinstance(analytics, ScenarioAnalytics):
+            analytics = ScenarioAnalytics.from_scenario(s)
+        for i, (scenario, _, _) in enumerate(rotations):
+            view = None if analytics is None else analytics.for_side(i % 2)
+            profiles.append(scenario_profile(scenario, view))
+
+    def draw_limits(rng: Random | None) -> dict[str, Any]:
+        return dict(
+            n_steps=_sample(n_steps, rng, integer=True),
+            time_limit=_sample(time_limit, rng),
+            pend=_sample(pend, rng),
+            pend_per_second=_sample(pend_per_second, rng),
+            negotiator_time_limit=_sample(negotiator_time_limit, rng),
+            step_time_limit=_sample(step_time_limit, rng),
+            hidden_time_limit=_sample(hidden_time_limit, rng),
+        )
+
+    def make_runs(s: Scenario, rotations: list[Rotation]) -> list[dict[str, Any]]:
+        runs = []
+        partners_list = partners_for(s)
+        if save_stats and path:
+            add_profiles(s, rotations)
+        k = next(scenario_indices)
+        for j, (scenario, pinfo_tuple, stats) in enumerate(rotations):
+            mparams = copy.deepcopy(mechanism_params)
+            # a generator per scenario so that limits do not depend on which scenarios (or shards) drew before
+            mparams.update(
+                draw_limits(None if seed is None else Random(f"{seed}:{k}:{j}"))
+            )
+            if scenario_mechanism_params is not None:
+                mparams.update(scenario_mechanism_params(scenario))
+            saved = scenarios_path is not None and (
+                scenarios_path / str(scenario.outcome_space.name) / MECHANISM_FILE_NAME
+            ).exists()
+            if scenarios_path and not saved:
+                _save_scenario(
+                    scenario,
+                    s,
+                    stats,
+                    mparams,
+                    scenarios_path,
+                    mechanism_type,
+                    save_scenario_figs,
+                    binary_scenarios,
+                    python_class_identifier,
+                )
+            for partners in partners_list:
+                runs += [
+                    dict(
+                        s=scenario,
+                        partners=[_[0] for _ in partners],
+                        partner_names=[_[2] for _ in partners],
+                        partner_params=[_[1] for _ in partners],
+                        rep=i,
+                        annotation=dict(rep=i, n_repetitions=n_repetitions),
+                        path=path if path else None,
+                        mechanism_type=mechanism_type,
+                        mechanism_params=mparams,
+                        full_names=True,
+                        verbosity=verbosity - 1,
+                        plot=random() < plot_fraction,
+                        stats=stats,
+                        id_reveals_type=id_reveals_type,
+                        name_reveals_type=name_reveals_type,
+                        plot_params=plot_params,
+                        mask_scenario_name=mask_scenario_names,
+                        private_infos=pinfo_tuple,
+                    )
+                    for i in range(n_repetitions)
+                ]
+        if shard is not None:
+            runs = [_ for _ in runs if next(run_indices) % shard[1] == shard[0]]
+        if completed:
+            remaining = []
+            for info in runs:
+                record = completed.get(
+                    _run_key(
+                        info["s"].outcome_space.name, info["partner_names"], info["rep"]
+                    )
+                )
+                if record is None:
+                    remaining.append(info)
+                    continue
+                process_record(record)
+                reused.append(record)
+            runs = remaining
+        if run_filter is not None:
+            runs = [_ for _ in runs if run_filter(_)]
+        if randomize_runs:
+            shuffle(runs)
+        return runs
+
+    results, scores, reused = [], [], []
+    run_indices, scenario_indices = itertools.count(), itertools.count()
+    results_path = path if not path else Path(path) / ALL_RESULTS_FILE_NAME
+    scores_path = path if not path else Path(path) / ALL_SCORES_FILE_NAME
+
+    def process_record(record):
+        if self_play and only_failures_on_self_play:
+            is_self_play = len(set(record["partners"])) == 1
+            if is_self_play and record["agreement"] is not None:
+                return
+        results.append(record)
+        scores.extend(make_scores(record))
+        if results_path and save_every and len(results) % save_every == 0:
+            pd.DataFrame.from_records(results).to_csv(results_path, index_label="index")
+            pd.DataFrame.from_records(scores).to_csv(scores_path, index_label="index")
+
+    def get_run_id(info):
+        return hash(
+            str(serialize(info, python_class_identifier=python_class_identifier))
+        )
+
+    prepared = prefetch(pairs, prepare, prefetch_size)
+    n_scenarios = 0
+    shared = (
+        SharedScenarios()
+        if share_scenarios and executor is None and njobs >= 0
+        else None
+    )
+
+    def submit(pool: Executor, info: dict[str, Any]):
+        ref = None
+        if shared is not None:
+            ref = shared.ref(info["s"], info["private_infos"], info["stats"])
+        if ref is None:
+            return pool.submit(run_negotiation, **info, run_id=get_run_id(info))
+        rest = {
+            k: v for k, v in info.items() if k not in ("s", "private_infos", "stats")
+        }
+        # the reference identifies the scenario so it is not serialized for every negotiation
+        run_id = hash(get_run_id(rest) + hash(ref[0]))
+        return pool.submit(run_shared_negotiation, ref, **rest, run_id=run_id)
+
+    try:
+        with Progress(disable=verbosity < 1) as progress:
+            task = progress.add_task(NEGOTIATIONS_DIR_NAME, total=None)
+            n_runs = 0
+            if njobs < 0 and executor is None:
+                for s, rotations in prepared:
+                    runs = make_runs(s, rotations)
+                    n_scenarios += 1
+                    n_runs += len(runs)
+                    progress.update(task, total=n_runs)
+                    for info in runs:
+                        process_record(run_negotiation(**info, run_id=get_run_id(info)))
+                        progress.advance(task)
+            else:
+                n_cores = cpu_count() or 4
+                cpus = min(n_cores, njobs) if njobs else n_cores
+                kwargs_ = dict(max_workers=cpus)
+                # recycling workers can deadlock the pool before python 3.13 (cpython issue 115634)
+                if sys.version_info >= (3, 13):
+                    kwargs_.update(max_tasks_per_child=MAX_TASKS_PER_CHILD)
+                queued = None if scheduler is None else RunQueue(scheduler)
+                per_worker = 2 if queued is None else 1
+
+                def max_pending() -> int:
+                    # executors may gain workers while running (e.g. workers joining a `DistributedExecutor`)
+                    if executor is None:
+                        return per_worker * cpus
+                    return per_worker * getattr(executor, "max_workers", cpus)
+
+                pending: dict = dict()
+                exhausted = False
+                # executors given by the caller are left running (e.g. for the next round of `race`)
+                pool = executor
+                if pool is None:
+                    pool = ProcessPoolExecutor(**kwargs_)  # type: ignore
+                try:
+                    while True:
+                        while not exhausted and (
+                            queued is not None or len(pending) < max_pending()
+                        ):
+                            try:
+                                s, rotations = next(prepared)
+                            except StopIteration:
+                                exhausted = True
+                                break
+                            runs = make_runs(s, rotations)
+                            n_scenarios += 1
+                            n_runs += len(runs)
+                            progress.update(task, total=n_runs)
+                            if shared is not None:
+                                # files are kept until the last negotiation planned on them whatever the order
+                                for info in runs:
+                                    shared.reserve(info["s"])
+                            if queued is not None:
+                                for info in runs:
+                                    queued.add(info)
+                                continue
+                            for info in runs:
+                                pending[submit(pool, info)] = info
+                        while queued and len(pending) < max_pending():
+                            info = queued.pop()
+                            pending[submit(pool, info)] = info
+                        if not pending:
+                            break
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for f in done:
+                            info = pending.pop(f)
+                            progress.advance(task)
+                            if shared is not None:
+                                shared.release(info["s"])
+                            try:
+                                record = f.result()
+                                process_record(record)
+                                if scheduler is not None:
+                                    scheduler.update(info, record)
+                            except BrokenProcessPool as e:
+                                if verbosity > 1:
+                                    print("[red]Broken Pool[/red]")
+                                    print(e)
+                                exhausted = True
+                                queued = None
+                                pending.clear()
+                                break
+                            except Exception as e:
+                                if verbosity > 1:
+                                    print("[red]Exception[/red]")
+                                    if verbosity > 2:
+                                        print(traceback.format_exc())
+                                    print(e)
+                finally:
+                    if executor is None:
+                        pool.shutdown(wait=True, cancel_futures=True)
+                    else:
+                        for f in pending:
+                            f.cancel()
+    finally:
+        prepared.close()
+        if shared is not None:
+            shared.close()
+
+    if verbosity > 0:
+        print(
+            f"Ran {len(results)} negotiations on {n_scenarios} scenarios between {len(competitors)} competitors",
+            flush=True,
+        )
+        if reused:
+            print(f"{len(reused)} of them were already completed", flush=True)
+    # keywords as later versions of negmas take a configuration first
+    tresults = SimpleTournamentResults.from_records(
+        scores=scores, results=results, final_score_stat=final_score, path=path
+    )
+    if verbosity > 0:
+        print(tresults.final_scores)
+    if path:
+        tresults.save(path)
+        save_competitors(
+            path, competitors, competitor_params, self_play, python_class_identifier
+        )
+        if save_stats:
+            pd.DataFrame.from_records(profiles).to_csv(
+                Path(path) / SCENARIO_PROFILES_FILE_NAME, index=False
+            )
+        if shard is not None:
+            dump(
+                dict(shard=shard[0], n_shards=shard[1], n_runs=next(run_indices)),
+                Path(path) / SHARD_FILE_NAME,
+            )
+    return tresults
+
+
+def combine_shards(
+    paths: Iterable[Path | str],
+    dst: Path | str | None = None,
+    final_score: tuple[str, str] = ("advantage", "mean"),
+    verbosity: int = 1,
+) -> SimpleTournamentResults:
+    """Merges the results of the shards of a tournament (see `shard` in `streaming_tournament`).
+
+    Args:
+        paths: The tournament folders of the shards
+        dst: If given, the merged results are saved in this folder
+        final_score: The metric and statistic used for the final score (as in `cartesian_tournament`)
+        verbosity: Verbosity level
+
+    Returns:
+        The results of the whole tournament as if it was run at once.
+
+    Remarks:
+        - Records are read from the per-negotiation files of every shard (see `load_completed_runs`) so the scores
+          are exactly those of the negotiations run. Scenarios are not renamed as all shards share them.
+        - A warning is printed if some shards are missing or incomplete.
+    """
+    records: dict[RunKey, dict[str, Any]] = dict()
+    found, n_runs = set(), set()
+    for path in paths:
+        path = Path(path)
+        if (path / SHARD_FILE_NAME).exists():
+            info = load(path / SHARD_FILE_NAME)
+            found.add((info["shard"], info["n_shards"]))
+            n_runs.add(info["n_runs"])
+        for key, record in load_completed_runs(path).items():
+            records.setdefault(key, record)
+    n_shards = {n for _, n in found}
+    expected = {(i, n) for n in n_shards for i in range(n)}
+    complete = len(n_shards) == 1 and found == expected and n_runs == {len(records)}
+    if verbosity > 0 and not complete:
+        print(
+            f"[yellow]Shards may be missing or incomplete[/yellow]: found shards {sorted(found)} "
+            f"with {len(records)} of {sorted(n_runs)} negotiations"
+        )
+    results = [records[_] for _ in sorted(records)]
+    scores = [_ for record in results for _ in make_scores(record)]
+    tresults = SimpleTournamentResults.from_records(
+        scores=scores,
+        results=results,
+        final_score_stat=final_score,
+        path=Path(dst) if dst else None,
+    )
+    if dst:
+        tresults.save(Path(dst))
+    return tresults
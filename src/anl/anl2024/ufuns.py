@@ -0,0 +1,323 @@
+"""
+Array-backed value and utility functions used by the ANL scenario generators.
+"""
+import copy
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+from negmas.outcomes import Issue
+from negmas.preferences import LinearAdditiveUtilityFunction as U
+from negmas.preferences.value_fun import BaseFun, TableFun
+from negmas.helpers.types import get_full_type_name
+from negmas.serialization import PYTHON_CLASS_IDENTIFIER, serialize
+
+__all__ = [
+    "ArrayFun",
+    "MappedArrayFun",
+    "OpponentUfun",
+    "array_fun",
+    "issue_utilities",
+    "make_index",
+    "store_values",
+    "utility_grid",
+]
+
+
+def make_index(values: Sequence[Any]) -> dict[Any, int]:
+    """Maps every issue value to its position. Share the result among all ufuns of the same issue."""
+    return {v: i for i, v in enumerate(values)}
+
+
+class ArrayFun(BaseFun):
+    """A table value function backed by a numpy array of values.
+
+    Args:
+        values: The value assigned to each issue value in the order of the issue (i.e. `issue.all`)
+        index: A mapping from issue values to positions in `values`. If not given, the issue values
+               are assumed to be the consecutive integers `offset`, `offset + 1`, ...
+        offset: The first issue value (only used if `index` is not given)
+
+    Remarks:
+        - This is a drop-in replacement for `TableFun` that needs no dict per ufun. The same
+          `index` can (and should) be shared by all ufuns defined on the same issue.
+        - It is serialized as a `TableFun` so saved scenarios can be loaded by NegMAS directly.
+        - It is immutable (shifting and scaling return new objects) so copies (including deep copies)
+          share the same array.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray | Sequence[float],
+        index: Mapping[Any, int] | None = None,
+        offset: int = 0,
+    ):
+        self.values = np.asarray(values, dtype=float)
+        self.index = index
+        self.offset = offset
+
+    def position(self, x) -> int:
+        """Returns the position of the issue value `x` in `values`"""
+        if self.index is None:
+            return int(x) - self.offset
+        return self.index[x]
+
+    def keys(self) -> list:
+        """Returns the issue values in order"""
+        if self.index is None:
+            return list(range(self.offset, self.offset + len(self.values)))
+        return list(self.index.keys())
+
+    @property
+    def mapping(self) -> dict:
+        return dict(zip(self.keys(), self.values.tolist()))
+
+    def minmax(self, input: Issue) -> tuple[float, float]:
+        _ = input
+        return float(self.values.min()), float(self.values.max())
+
+    def shift_by(self, offset: float) -> "ArrayFun":
+        return ArrayFun(self.values + offset, self.index, self.offset)
+
+    def scale_by(self, scale: float) -> "ArrayFun":
+        return ArrayFun(self.values * scale, self.index, self.offset)
+
+    def to_table(self) -> TableFun:
+        """Converts this value function into an equivalent `TableFun`"""
+        return TableFun(self.mapping)
+
+    def xml(self, indx: int, issue: Issue, bias=0.0) -> str:
+        return self.to_table().xml(indx, issue, bias)
+
+    def to_dict(
+        self, python_class_identifier=PYTHON_CLASS_IDENTIFIER
+    ) -> dict[str, Any]:
+        d = serialize(
+            dict(mapping=self.mapping), python_class_identifier=python_class_identifier
+        )
+        d[python_class_identifier] = "negmas.preferences.value_fun.TableFun"
+        return d
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ArrayFun):
+            return self.keys() == other.keys() and np.array_equal(
+                self.values, other.values
+            )
+        if isinstance(other, TableFun):
+            return self.mapping == other.mapping
+        return NotImplemented
+
+    def __deepcopy__(self, memo) -> "ArrayFun":
+        return self
+
+    def __call__(self, x) -> float:
+        return float(self.values[self.position(x)])
+
+
+def store_values(
+    values: np.ndarray | Sequence[float], path: Path | str, dtype: Any = np.float64
+) -> np.ndarray:
+    """Stores utility values in a `.npy` file and returns a read-only memory map of it.
+
+    Args:
+        values: The values to store
+        path: The file to store the values in
+        dtype: The type used to store values on disk (`float32` halves the size of `float64`)
+    """
+    values = np.asarray(values)
+    mapped = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=values.shape)
+    mapped[...] = values
+    mapped.flush()
+    del mapped
+    return np.load(path, mmap_mode="r")
+
+
+class MappedArrayFun(ArrayFun):
+    """An `ArrayFun` whose values live in a memory-mapped `.npy` file.
+
+    Args:
+        path: The `.npy` file with the values (see `store_values`)
+        index: A mapping from issue values to positions in the file (see `ArrayFun`)
+        offset: The first issue value (only used if `index` is not given)
+
+    Remarks:
+        - Values are only paged in when accessed so ufuns on very large outcome spaces take
+          (almost) no memory and all processes mapping the same file share the same pages.
+        - Pickling only stores the path of the file which must stay available for as long as
+          the ufun is used (including when sent to other processes or cached).
+        - Shifting or scaling returns an in-memory `ArrayFun`.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        index: Mapping[Any, int] | None = None,
+        offset: int = 0,
+    ):
+        self.path = Path(path)
+        self.index = index
+        self.offset = offset
+        self._values = None
+
+    @property
+    def values(self) -> np.ndarray:  # type: ignore
+        if self._values is None:
+            self._values = np.load(self.path, mmap_mode="r")
+        return self._values
+
+    def __getstate__(self) -> dict[str, Any]:
+        return dict(self.__dict__, _values=None)
+
+
+def array_fun(
+    values: np.ndarray | Sequence[float],
+    index: Mapping[Any, int] | None = None,
+    offset: int = 0,
+    storage: Path | str | None = None,
+    dtype: Any = np.float64,
+) -> ArrayFun:
+    """Creates an `ArrayFun` keeping its values in memory or in a memory-mapped file.
+
+    Args:
+        values: The value of each issue value in order
+        index: A mapping from issue values to positions (see `ArrayFun`)
+        offset: The first issue value (only used if `index` is not given)
+        storage: A folder to store values in. If given, a `MappedArrayFun` backed by a file in
+                 this folder is returned. Otherwise values are kept in memory.
+        dtype: The type used to store values on disk. Only used with `storage`.
+
+    Remarks:
+        - Files are named after the hash of their contents so equal values (e.g. the same scenario
+          generated again with the same seed) reuse the same file instead of adding a new one.
+    """
+    if storage is None:
+        return ArrayFun(values, index, offset)
+    storage = Path(storage).expanduser()
+    storage.mkdir(parents=True, exist_ok=True)
+    values = np.ascontiguousarray(values, dtype=dtype)
+    digest = hashlib.sha1(
+        f"{values.dtype.str}{values.shape}".encode() + values.tobytes()
+    ).hexdigest()
+    path = storage / f"{digest}.npy"
+    if not path.exists():
+        # written under a temporary name so that other processes never map a partial file
+        tmp = storage / f"{digest}.{os.getpid()}.tmp.npy"
+        store_values(values, tmp, dtype)
+        os.replace(tmp, path)
+    return MappedArrayFun(path, index, offset)
+
+
+def issue_utilities(ufun: Any) -> list[np.ndarray] | None:
+    """Finds the weighted utility of every value of every issue of a linear-additive ufun.
+
+    Returns:
+        A list with an array per issue giving the weighted value of every issue value (in the order of `issue.all`)
+        or None if the ufun is not linear-additive over a discrete outcome-space.
+    """
+    if not isinstance(ufun, U) or ufun.outcome_space is None:
+        return None
+    issues = ufun.outcome_space.issues  # type: ignore
+    if len(issues) != len(ufun.values) or not all(_.is_discrete() for _ in issues):
+        return None
+    arrays = []
+    for issue, fun, w in zip(issues, ufun.values, ufun.weights):
+        try:
+            values = np.fromiter((float(fun(_)) for _ in issue.all), dtype=float)
+        except TypeError:
+            return None
+        arrays.append(w * values)
+    return arrays
+
+
+def utility_grid(
+    ufun: Any, start: int = 0, stop: int | None = None
+) -> np.ndarray | None:
+    """Evaluates a linear-additive ufun on all outcomes of its outcome-space at once.
+
+    Args:
+        ufun: The ufun to evaluate
+        start: Index (in enumeration order) of the first outcome to evaluate
+        stop: Index after the last outcome to evaluate. None for all outcomes after `start`.
+
+    Returns:
+        An array with the utility of every outcome from `start` to `stop` in the order of `outcome_space.enumerate()`
+        or None if the ufun is not linear-additive over a discrete outcome-space (see `issue_utilities`).
+
+    Remarks:
+        - All outcomes are evaluated by broadcasting the sum of the per-issue arrays over the Cartesian grid. Parts of the
+          grid are evaluated by decoding outcome indices instead so memory is proportional to `stop - start`.
+        - Utilities are identical to calling the ufun on every outcome (the same additions in the same order).
+    """
+    arrays = issue_utilities(ufun)
+    if arrays is None:
+        return None
+    sizes = [len(_) for _ in arrays]
+    n = int(np.prod(sizes, dtype=np.int64))
+    start, stop = max(0, start), n if stop is None else min(stop, n)
+    if start == 0 and stop == n:
+        utils = np.full([1] * len(arrays), float(ufun._bias))
+        for k, values in enumerate(arrays):
+            shape = [1] * len(arrays)
+            shape[k] = -1
+            utils = utils + values.reshape(shape)
+        return np.broadcast_to(utils, sizes).flatten()
+    indices = np.arange(start, max(start, stop), dtype=np.int64)
+    digits = []
+    for size in reversed(sizes):
+        indices, digit = np.divmod(indices, size)
+        digits.append(digit)
+    utils = np.full(len(indices), float(ufun._bias))
+    for values, digit in zip(arrays, reversed(digits)):
+        utils += values[digit]
+    return utils
+
+
+class OpponentUfun(U):
+    """A view of the value functions of a linear-additive ufun with its own reserved value.
+
+    Args:
+        ufun: The ufun to view. Only its value functions, weights, bias and outcome-space are used.
+        reserved_value: The reserved value of the view (the real reserved value of `ufun` is never exposed).
+
+    Remarks:
+        - Value functions, weights and the outcome-space are shared with `ufun` and must not be modified.
+          Only the reserved value (and caches depending on it) belongs to the view.
+        - Copying (including the deep copy NegMAS makes of private information for every negotiation)
+          creates a new view over the same tables in constant time so negotiators can change the
+          reserved value of their copy without affecting others.
+        - Pickling it together with the scenario of `ufun` (e.g. in the parameters of a negotiation) stores
+          the shared value functions once so private information adds (almost) nothing to the tables.
+        - It is serialized as a `LinearAdditiveUtilityFunction`.
+    """
+
+    def __init__(self, ufun: U, reserved_value: float = 0.0):
+        super().__init__(
+            values=ufun.values,
+            weights=ufun.weights,
+            bias=ufun._bias,
+            reserved_value=reserved_value,
+            outcome_space=ufun.outcome_space,
+        )
+        self.values = tuple(self.values)
+
+    def __copy__(self) -> "OpponentUfun":
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view._changes = []
+        view._cached_inverse = None
+        view._cached_inverse_type = None
+        return view
+
+    def __deepcopy__(self, memo) -> "OpponentUfun":
+        view = copy.copy(self)
+        memo[id(self)] = view
+        return view
+
+    def to_dict(
+        self, python_class_identifier=PYTHON_CLASS_IDENTIFIER
+    ) -> dict[str, Any]:
+        d = super().to_dict(python_class_identifier=python_class_identifier)
+        d[python_class_identifier] = get_full_type_name(U)
+        return d
@@ -2,12 +2,16 @@
 """The ANL universal command line tool"""
 
 import math
+import os
+import random
 import sys
 import warnings
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib
 from functools import partial
 from itertools import chain
+from os import cpu_count
 from pathlib import Path
 from time import perf_counter
 from typing import Iterable, List
@@ -16,21 +20,38 @@ import click
 import click_config_file
 import matplotlib.pyplot as plt
 import negmas
+import pandas as pd
 from negmas.helpers import humanize_time, unique_name
-from negmas.helpers.inout import load
+from negmas.helpers.inout import dump, load
 from negmas.helpers.types import get_class
-from negmas.inout import Scenario
 from negmas.plots.util import plot_offline_run
 from negmas.tournaments.neg.simple.cartesian import RESULTS_DIR_NAME
 from rich import print
 
 import anl
 from anl import DEFAULT_AN2024_COMPETITORS
+from anl.anl2024.formats import is_scenario, load_scenario, save_scenario
+from anl.anl2024.bench import (
+    BENCH_GENERATORS,
+    DEFAULT_BENCH_OUTCOMES,
+    DEFAULT_BENCH_SCENARIOS,
+)
+from anl.anl2024.bench import bench_generators as run_generator_benchmarks
 from anl.anl2024.runner import (
     DEFAULT2024SETTINGS,
     DEFAULT_TOURNAMENT_PATH,
     GENMAP,
+    accepted_params,
     anl2024_tournament,
+    extend_tournament,
+)
+from anl.anl2024.quick import ranking_distance
+from anl.anl2024.tournament import SHARD_FILE_NAME, combine_shards
+from anl.anl2024.distributed import (
+    AUTHKEY_ENV,
+    DistributedExecutor,
+    parse_address,
+    run_worker,
 )
 
 from negmas.tournaments.neg.simple import SimpleTournamentResults, combine_tournaments
@@ -140,6 +161,35 @@ def main():
     pass
 
 
+def find_type_name(stem: str):
+    for pre in (
+        "",
+        "anl.anl2024.negotiators.",
+        "negmas.sao.negotiators.",
+        "negmas.genius.gnegotiators.",
+    ):
+        s = pre + stem
+        try:
+            get_class(s)
+            return s
+        except Exception:
+            pass
+    print(f"[red]ERROR[/red] Unknown Competitor Type: {stem}")
+    sys.exit()
+
+
+def _shard(ctx, param, value) -> tuple[int, int] | None:
+    if value is None:
+        return None
+    try:
+        i, n = (int(_) for _ in value.split("/"))
+    except ValueError:
+        raise click.BadParameter(f"{value} is not of the form I/N")
+    if not 0 <= i < n:
+        raise click.BadParameter(f"{value}: I must be at least zero and less than N")
+    return i, n
+
+
 @main.command(help="Runs an ANL 2024 tournament")
 @click.option(
     "--parallel/--serial",
@@ -375,6 +425,12 @@ def main():
     type=float,
     help="Fraction of monotonic and general scenarios generated using a Pareto curve not piecewise linear Pareto (used when generator=mix)",
 )
+@click.option(
+    "--integer-outcomes/--string-outcomes",
+    default=False,
+    help="Use integer issue values (0 ... n-1) instead of strings (e.g. 3_96) for single-issue scenarios. "
+    "Integer outcomes are faster to compare and produce smaller logs.",
+)
 @click.option(
     "--rotate/--no-rotate",
     default=DEFAULT2024SETTINGS["rotate_ufuns"],  # type: ignore
@@ -390,6 +446,37 @@ def main():
     default=DEFAULT2024SETTINGS["sort_runs"],  # type: ignore
     help="Sort the negotiations by size",
 )
+@click.option(
+    "--longest-first/--no-longest-first",
+    default=False,
+    help="Dispatch negotiations to free processes longest-expected-first using a cost model (steps, outcomes and "
+    "the step time of every competitor) refined as results arrive. Overrides --sort and --randomize",
+)
+@click.option(
+    "--racing",
+    default=0.0,
+    type=float,
+    help="Run repetitions in rounds and stop repeating negotiations that can no longer change the ranking at this "
+    "error level (e.g. 0.05). --repetitions becomes the maximum number of repetitions. Zero to run all repetitions. "
+    "Cannot be combined with --quick",
+)
+@click.option(
+    "--share-scenarios/--no-share-scenarios",
+    default=False,
+    help="Let parallel workers load every scenario once from shared memory instead of receiving it with every "
+    "negotiation",
+)
+@click.option(
+    "--analytics/--no-analytics",
+    default=False,
+    help="Calculate the analytics of every scenario (utilities, Pareto frontier, Nash and Kalai points) once and pass "
+    "them to negotiators",
+)
+@click.option(
+    "--binary-scenarios/--text-scenarios",
+    default=False,
+    help="Save the scenarios of the tournament in binary format (fast to load) instead of text (yaml) format",
+)
 @click.option(
     "--two/--cartesian",
     default=False,  # type: ignore
@@ -420,6 +507,77 @@ def main():
     help="A path to be added to PYTHONPATH in which all competitors are stored. You can pass a : separated list of "
     "paths on linux/mac and a ; separated list in windows",
 )
+@click.option(
+    "--seed",
+    default=None,
+    type=int,
+    help="If given, scenarios are generated deterministically from this seed",
+)
+@click.option(
+    "--generation-jobs",
+    default=-1,
+    type=int,
+    help="Number of parallel processes used to generate scenarios. -1 for serial and 0 for all cores",
+)
+@click.option(
+    "--cache-path",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="If given with --seed, generated scenarios are cached in this folder and reused by later runs with the same settings",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=False,
+    help="Generate scenarios lazily and start negotiations as soon as the first scenario is ready",
+)
+@click.option(
+    "--quick",
+    default=0.0,
+    type=float,
+    help="Quick evaluation: run only this number (or fraction if less than one) of scenarios selected to represent all of "
+    "the generated/loaded scenarios. Zero (default) to use all scenarios. Scenarios are never streamed in quick evaluation.",
+)
+@click.option(
+    "--quick-compare/--no-quick-compare",
+    default=False,
+    help="After a quick evaluation, run the full tournament as well and report how far the quick ranking is from it",
+)
+@click.option(
+    "--resume",
+    default=None,
+    type=click.Path(file_okay=False, exists=True),
+    help="Resume the interrupted tournament saved in this folder: negotiations already completed are not run again. "
+    "Pass the same settings used to start it (overrides --name and --no-logs).",
+)
+@click.option(
+    "--distributed",
+    default=None,
+    type=str,
+    help="Serve negotiations to workers (see the worker command) listening on this HOST:PORT instead of running them "
+    "in local processes. Use 0.0.0.0 as the host to accept workers on other machines.",
+)
+@click.option(
+    "--local-workers",
+    default=0,
+    type=int,
+    help="With --distributed, number of workers to start on this machine as well",
+)
+@click.option(
+    "--authkey",
+    default=None,
+    type=str,
+    help=f"With --distributed, the key workers must present. Read from the {AUTHKEY_ENV} environment variable if not "
+    "given. If neither is given, a random key is generated and printed",
+)
+@click.option(
+    "--shard",
+    default=None,
+    type=str,
+    callback=_shard,
+    help="Run only shard I/N of the tournament (e.g. 0/4 ... 3/4) to split it into independent jobs. Needs --seed "
+    "(unless all scenarios are loaded) and the same settings for all shards. Merge the shards with the combine command. "
+    "The shard is appended to the tournament name",
+)
 @click_config_file.configuration_option()
 def tournament2024(
     parallel,
@@ -438,6 +596,11 @@ def tournament2024(
     save_every,
     randomize,
     sort,
+    longest_first,
+    racing,
+    share_scenarios,
+    analytics,
+    binary_scenarios,
     self_play,
     plot,
     pend,
@@ -461,8 +624,20 @@ def tournament2024(
     monotonic,
     curve,
     pies,
+    integer_outcomes,
     two,
     scenarios_path,
+    seed,
+    generation_jobs,
+    cache_path,
+    stream,
+    quick,
+    quick_compare,
+    resume,
+    distributed,
+    local_workers,
+    authkey,
+    shard,
 ):
     if two:
         competitorslst = competitors.split(";")
@@ -489,6 +664,10 @@ def tournament2024(
             curve_fraction=curve,
             pies_fraction=pies,
         )
+    if integer_outcomes and generator in GENMAP:
+        generator_params.update(
+            accepted_params(GENMAP[generator], integer_outcomes=True)
+        )
     if small:
         scenarios = min(scenarios, 2)
         steps = -1
@@ -503,8 +682,21 @@ def tournament2024(
     pend = read_range(pend, min_pend, max_pend)
     if len(path) > 0:
         sys.path.append(path)
+    base_path = None
+    if resume is not None:
+        base_path, name, save_logs = Path(resume).parent, Path(resume).name, True
     if name == "random":
         name = unique_name(base="", rand_digits=0)
+    if shard is not None and resume is None:
+        name = f"{name}-shard{shard[0]}of{shard[1]}"
+    if shard is not None and seed is None and scenarios > 0:
+        print("[red]ERROR[/red] All shards must generate the same scenarios: pass --seed")
+        sys.exit(1)
+    if resume is not None and seed is None and scenarios > 0:
+        print(
+            "[red]ERROR[/red] Resumed tournaments must generate the same scenarios: pass the --seed of the interrupted run"
+        )
+        sys.exit(1)
 
     all_competitors = competitors.split(";")
     all_params = [dict() for _ in all_competitors]
@@ -533,22 +725,6 @@ def tournament2024(
         for i, c in enumerate(all_competitors):
             all_params[i] = params_map.get(c, dict())
 
-    def find_type_name(stem: str):
-        for pre in (
-            "",
-            "anl.anl2024.negotiators.",
-            "negmas.sao.negotiators.",
-            "negmas.genius.gnegotiators.",
-        ):
-            s = pre + stem
-            try:
-                get_class(s)
-                return s
-            except Exception:
-                pass
-        print(f"[red]ERROR[/red] Unknown Competitor Type: {stem}")
-        sys.exit()
-
     for i, cp in enumerate(all_competitors):
         all_competitors[i] = find_type_name(cp)  # type: ignore
 
@@ -586,11 +762,11 @@ def tournament2024(
             path = Path(path)
             if not path.is_dir():
                 continue
-            if not Scenario.is_loadable(path):
+            if not is_scenario(path):
                 print(f"{path} is not loadable")
                 continue
             try:
-                scenario = Scenario.load(path, safe_parsing=False)
+                scenario = load_scenario(path, safe_parsing=False)
                 if scenario:
                     loaded_scenarios.append(scenario)
             except Exception as e:
@@ -613,8 +789,14 @@ def tournament2024(
             f"You must either pass --scenarios with the number of scenarios to be generated or pass --scenarios-path with a folder containing scenarios to use.\nYou are passing {scenarios=}, {scenarios_path=}. \nWill exit"
         )
         exit()
+    if quick > 0 and racing > 0:
+        print("--racing cannot be combined with --quick.\nWill exit")
+        exit()
+    if quick > 0 and quick_compare and seed is None:
+        # the full run must generate the same scenarios as the candidates of the quick run
+        seed = random.randint(0, 2**31 - 1)
     tic = perf_counter()
-    results = anl2024_tournament(
+    tournament_params = dict(
         scenarios=loaded_scenarios,
         n_scenarios=scenarios,
         n_outcomes=outcomes,
@@ -634,18 +816,65 @@ def tournament2024(
         self_play=self_play,
         randomize_runs=randomize,
         sort_runs=sort,
+        longest_first=longest_first,
+        racing=racing if racing > 0 else None,
+        share_scenarios=share_scenarios,
+        analytics=analytics,
+        binary_scenarios=binary_scenarios,
         save_every=save_every,
         known_partner=known_partner,
         final_score=(metric, stat),
         scenario_generator=generator,
         generator_params=generator_params,
         raise_exceptions=raise_exceptions,
+        seed=seed,
+        generation_njobs=generation_jobs,
+        cache_path=cache_path,
+        stream=stream,
+        base_path=base_path,
     )
+    executor = None
+    if distributed is not None:
+        executor = DistributedExecutor(
+            parse_address(distributed),
+            authkey=authkey,
+            local_workers=local_workers,
+        )
+        print(f"Serving negotiations to workers at {executor.address}")
+        if authkey is None and not os.environ.get(AUTHKEY_ENV, None):
+            print(
+                f"Workers must pass --authkey {executor.authkey} (or set {AUTHKEY_ENV} to it)"
+            )
+    try:
+        results = anl2024_tournament(
+            **tournament_params,  # type: ignore
+            quick_eval=quick if quick > 0 else None,
+            resume=resume is not None,
+            executor=executor,
+            shard=shard,
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
     if verbosity <= 0:
         print(results.final_scores)
     print(f"Done in {humanize_time(perf_counter() - tic, show_ms=True)}")
+    if quick > 0 and quick_compare:
+        print("Running the full tournament for comparison")
+        tournament_params.update(name=f"{name}-full")
+        full = anl2024_tournament(**tournament_params)  # type: ignore
+        if verbosity <= 0:
+            print(full.final_scores)
+        distance = ranking_distance(results.final_scores, full.final_scores)
+        print(
+            f"Quick vs. full ranking: Kendall tau {distance['kendall_tau']:0.3f}, "
+            f"max. rank change {distance['max_rank_change']}, "
+            f"same winner: {distance['same_winner']}"
+        )
     if save_logs:
-        print(f"Detailed logs are stored at: {DEFAULT_TOURNAMENT_PATH / name}")
+        print(
+            f"Detailed logs are stored at: {(base_path or DEFAULT_TOURNAMENT_PATH) / name}"
+        )
 
 
 @main.command(
@@ -714,6 +943,12 @@ def tournament2024(
     type=float,
     help="Fraction of monotonic and general scenarios generated using a Pareto curve not piecewise linear Pareto (used when generator=mix)",
 )
+@click.option(
+    "--integer-outcomes/--string-outcomes",
+    default=False,
+    help="Use integer issue values (0 ... n-1) instead of strings (e.g. 3_96) for single-issue scenarios. "
+    "Integer outcomes are faster to compare and produce smaller logs.",
+)
 @click.option(
     "--settings-file",
     default=None,
@@ -739,6 +974,25 @@ def tournament2024(
     default=None,
     help="Whether to set matplotlib to be interactive.",
 )
+@click.option(
+    "--seed",
+    default=None,
+    type=int,
+    help="If given, scenarios are generated deterministically from this seed",
+)
+@click.option(
+    "--format",
+    "format_",
+    default="both",
+    type=click.Choice(["both", "binary", "text"]),
+    help="Save scenarios in binary format (fast to load), text (yaml) format or both. "
+    "Loaders use the binary format when available. Scenarios that cannot be saved in binary format are saved as text.",
+)
+@click.option(
+    "--compress/--no-compress",
+    default=False,
+    help="Compress scenarios saved in binary format",
+)
 @click_config_file.configuration_option()
 def make_scenarios(
     path,
@@ -751,9 +1005,13 @@ def make_scenarios(
     zerosum,
     monotonic,
     curve,
+    integer_outcomes,
     plot,
     backend,
     interactive,
+    seed,
+    format_,
+    compress,
 ):
     if scenarios == 0:
         print("You must pass --scenarios with the number of scenarios to be generated")
@@ -769,11 +1027,17 @@ def make_scenarios(
             monotonic_fraction=monotonic,
             curve_fraction=curve,
         )
+    if integer_outcomes:
+        generator_params.update(
+            accepted_params(GENMAP[generator], integer_outcomes=True)
+        )
 
     outcomes = read_range(outcomes, min_outcomes, max_outcomes)
 
     print(f"Will generate {scenarios} scenarios of {outcomes} outcomes each.")
     scenario_generator = GENMAP[generator]
+    if seed is not None:
+        generator_params["seed"] = seed
     scenarios = scenario_generator(
         n_scenarios=scenarios, n_outcomes=outcomes, **generator_params
     )
@@ -784,7 +1048,13 @@ def make_scenarios(
     path = Path(path)
     for s in scenarios:
         mypath = path / s.outcome_space.name  # type: ignore
-        s.dumpas(mypath)  # type: ignore
+        save_scenario(
+            s,  # type: ignore
+            mypath,
+            text=format_ != "binary",
+            binary=format_ != "text",
+            compress=compress,
+        )
         if plot:
             plot_offline_run(
                 trace=[],
@@ -815,6 +1085,213 @@ def make_scenarios(
             plt.close()
 
 
+def _int_list(ctx, param, value) -> list[int]:
+    _ = ctx, param
+    try:
+        return [int(float(_)) for _ in value.split(",") if _.strip()]
+    except ValueError:
+        raise click.BadParameter(f"{value} is not a comma separated list of numbers")
+
+
+@main.command(help="Benchmarks scenario generators")
+@click.option(
+    "--generators",
+    "-g",
+    default=",".join(BENCH_GENERATORS.keys()),
+    help=f"Comma separated list of generators to benchmark. Possible values are: {', '.join(BENCH_GENERATORS.keys())}",
+)
+@click.option(
+    "--outcomes",
+    "-o",
+    default=",".join(str(_) for _ in DEFAULT_BENCH_OUTCOMES),
+    callback=_int_list,
+    help="Comma separated list of numbers of outcomes to try",
+)
+@click.option(
+    "--scenarios",
+    "-S",
+    default=",".join(str(_) for _ in DEFAULT_BENCH_SCENARIOS),
+    callback=_int_list,
+    help="Comma separated list of numbers of scenarios to try",
+)
+@click.option("--seed", default=0, type=int, help="Seed used for generation")
+@click.option(
+    "--repeats",
+    "-r",
+    default=1,
+    type=int,
+    help="Number of timed runs of each configuration (the fastest is reported)",
+)
+@click.option(
+    "--memory/--no-memory",
+    default=True,
+    help="Measure peak memory (needs one extra run of each configuration)",
+)
+@click.option(
+    "--budget",
+    default=60.0,
+    type=float,
+    help="Skip larger outcome counts of a generator once a configuration takes longer than this number of seconds. Nonpositive for no limit",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Path to save the results as json",
+)
+@click.option("--verbosity", default=1, type=int, help="Verbosity")
+def bench_generators(
+    generators, outcomes, scenarios, seed, repeats, memory, budget, output, verbosity
+):
+    names = [_.strip() for _ in generators.split(",") if _.strip()]
+    unknown = [_ for _ in names if _ not in BENCH_GENERATORS]
+    if unknown:
+        print(f"[red]ERROR[/red] Unknown generators: {unknown}")
+        sys.exit(1)
+    results = run_generator_benchmarks(
+        names,
+        n_outcomes=outcomes,
+        n_scenarios=scenarios,
+        seed=seed,
+        repeats=repeats,
+        memory=memory,
+        time_budget=budget if budget > 0 else None,
+        verbosity=verbosity - 1,
+    )
+    rows = []
+    for r in results["results"]:
+        row = {k: v for k, v in r.items() if k != "phases"}
+        for k, v in r.get("phases", dict()).items():
+            row[f"{k}_seconds"] = v
+        if row.get("peak_memory") is not None:
+            row["peak_memory"] = row["peak_memory"] / (1 << 20)
+        rows.append(row)
+    if verbosity > 0:
+        df = pd.DataFrame.from_records(rows)
+        df = df.rename(columns=dict(peak_memory="peak_memory_mb"))
+        print(df.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+    if output:
+        dump(results, Path(output))
+        if verbosity > 0:
+            print(f"Results saved to {output}")
+
+
+@main.command(
+    help="Runs negotiations served by a tournament started with --distributed.\n\nYou must pass the HOST:PORT of the tournament"
+)
+@click.argument("address", type=str)
+@click.option(
+    "--authkey",
+    default=None,
+    type=str,
+    help=f"The key given to the tournament. Read from the {AUTHKEY_ENV} environment variable if not given",
+)
+@click.option(
+    "--processes",
+    "-p",
+    default=1,
+    type=int,
+    help="Number of worker processes to run on this machine. Zero or negative for all cores",
+)
+@click.option(
+    "--max-tasks",
+    default=0,
+    type=int,
+    help="Stop every process after running this number of negotiations. Zero or negative for no limit",
+)
+@click.option(
+    "--connect-timeout",
+    default=60.0,
+    type=float,
+    help="Seconds to keep trying to connect to a tournament that is not started yet",
+)
+@click.option(
+    "--path",
+    default="",
+    help="A path to be added to PYTHONPATH in which all competitors are stored. You can path a : separated list of paths on linux/mac and a ; separated list in windows",
+)
+def worker(address, authkey, processes, max_tasks, connect_timeout, path):
+    if len(path) > 0:
+        sys.path.append(path)
+    if authkey is None and not os.environ.get(AUTHKEY_ENV, None):
+        print(
+            f"[red]ERROR[/red] Pass the key printed by the tournament with --authkey or set {AUTHKEY_ENV}"
+        )
+        sys.exit(1)
+    params = dict(
+        address=parse_address(address),
+        authkey=authkey,
+        max_tasks=max_tasks if max_tasks > 0 else None,
+        connect_timeout=connect_timeout,
+    )
+    if processes <= 0:
+        processes = cpu_count() or 4
+    print(f"Running {processes} worker(s) for {params['address']}")
+    if processes == 1:
+        n = run_worker(**params)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            n = sum(
+                _.result()
+                for _ in [pool.submit(run_worker, **params) for _ in range(processes)]
+            )
+    print(f"Done after running {n} negotiations")
+
+
+@main.command(
+    help="Adds competitors to a completed tournament running only the negotiations they take part in on the saved "
+    "scenarios (with the same limits and repetitions) and recalculates the scores of all competitors"
+)
+@click.argument(
+    "tournament",
+    type=click.Path(file_okay=False, exists=True),
+)
+@click.option(
+    "--competitors",
+    required=True,
+    help="A semicolon (;) separated list of agent types to add to the tournament",
+)
+@click.option(
+    "--parallel/--serial",
+    default=True,
+    help="Run a parallel/serial tournament (for debugging)",
+)
+@click.option(
+    "--metric",
+    default=DEFAULT2024SETTINGS["final_score"][0],  # type: ignore
+    help="The metric to use for evaluating agents. Can be one of: utility, advantage, partner_welfare, welfare",
+)
+@click.option(
+    "--stat",
+    default=DEFAULT2024SETTINGS["final_score"][1],  # type: ignore
+    help="The statistic applied to the metric to evaluate agents. Can be one of: mean, median, std, min, max",
+)
+@click.option("--verbosity", default=1, type=int, help="Verbosity")
+@click.option(
+    "--path",
+    default="",
+    help="A path to be added to PYTHONPATH in which all competitors are stored. You can path a : separated list of paths on linux/mac and a ; separated list in windows",
+)
+def extend(tournament, competitors, parallel, metric, stat, verbosity, path):
+    if len(path) > 0:
+        sys.path.append(path)
+    tic = perf_counter()
+    try:
+        results = extend_tournament(
+            Path(tournament),
+            [find_type_name(_) for _ in competitors.split(";") if _],
+            njobs=0 if parallel else -1,
+            final_score=(metric, stat),
+            verbosity=verbosity,
+        )
+    except ValueError as e:
+        print(f"[red]ERROR[/red] {e}")
+        sys.exit(1)
+    if verbosity <= 0:
+        print(results.final_scores)
+    print(f"Done in {humanize_time(perf_counter() - tic, show_ms=True)}")
+
+
 @main.command(help="Displays ANL and NegMAS versions")
 def version():
     print(f"anl: {anl.__version__} (NegMAS: {negmas.__version__})")
@@ -830,7 +1307,9 @@ def display(path: Path):
 
 
 @main.command(
-    help="Combines results of multiple tournaments into a new folder (last one given)"
+    help="Combines results of multiple tournaments into a new folder (last one given). If the tournaments are shards "
+    "of one tournament (see --shard), their negotiations are merged into the results of the whole tournament and all "
+    "other options except --metric, --stat and --verbosity are ignored"
 )
 @click.argument(
     "srcs",
@@ -929,6 +1408,18 @@ def combine(
         print(
             f"[red]Error[/red]Destination {dst} exists. Provide --override to override it."
         )
+    shards = [Path(_) for _ in srcs if (Path(_) / SHARD_FILE_NAME).exists()]
+    if shards:
+        if len(shards) != len(srcs):
+            print(
+                "[red]Error[/red] Cannot combine shards of a tournament with other tournaments"
+            )
+            sys.exit(1)
+        results = combine_shards(
+            shards, dst, final_score=(metric, stat), verbosity=verbosity
+        )
+        print(results.final_scores)
+        return
     if add_folders is None:
         add_folders = not rename
     if add_tournament_column is None:
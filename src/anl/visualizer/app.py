@@ -8,10 +8,12 @@ import seaborn as sns
 import streamlit as st
 from negmas.helpers import distribute_integer_randomly
 from negmas.helpers.inout import load, np
-from negmas.inout import Scenario
 from negmas.plots.util import TraceElement, plot_offline_run
 
 from anl import DEFAULT_TOURNAMENT_PATH
+from anl.anl2024.analytics import SCENARIO_PROFILES_FILE_NAME, profile_scenarios
+from anl.anl2024.formats import load_scenario
+from anl.anl2024.tournament import saved_scenarios
 
 
 def is_tournament_folder(base: Path):
@@ -57,6 +59,18 @@ def read_scenarios(path: Path):
     return sorted([_.name for _ in base.glob("*") if _.is_dir()])
 
 
+@st.cache_resource
+def read_scenario_profiles(path: Path) -> pd.DataFrame | None:
+    """Reads the profiles saved with the tournament indexed by scenario name (calculated if they were not saved)"""
+    profiles_path = path / SCENARIO_PROFILES_FILE_NAME
+    if profiles_path.is_file():
+        return pd.read_csv(profiles_path, index_col="scenario")
+    scenarios = saved_scenarios(path)
+    if not scenarios:
+        return None
+    return profile_scenarios(scenarios).set_index("scenario")
+
+
 ScoreDataFrames = namedtuple(
     "ScoresDataFrame", ["final_scores", "type_scores", "all_scores", "details"]
 )
@@ -207,6 +221,7 @@ def run(base: Path = DEFAULT_TOURNAMENT_PATH):
         return
     st.write(f"#### Tournament: {tournament}")
     scenarios = read_scenarios(base / tournament)
+    profiles = read_scenario_profiles(base / tournament)
     dfs = read_score_dfs(
         base,
         tournament,
@@ -245,6 +260,11 @@ def run(base: Path = DEFAULT_TOURNAMENT_PATH):
                 "The maximum number of steps {selected_n_steps_max} is smaller than the minimum number {selected_n_steps_min}"
             )
             return
+        selected_difficulty = (0.0, 1.0)
+        if profiles is not None:
+            selected_difficulty = st.slider(
+                "Difficulty", min_value=0.0, max_value=1.0, value=(0.0, 1.0)
+            )
     with st.expander("Strategy Filter"):
         types = sorted(scores["strategy"].unique().tolist())
         type_ = st.multiselect("Strategies", types)
@@ -261,6 +281,15 @@ def run(base: Path = DEFAULT_TOURNAMENT_PATH):
         for _ in selected_scenarios
         if selected_n_steps_min <= steps_of[_] <= selected_n_steps_max
     ]
+    if profiles is not None and selected_difficulty != (0.0, 1.0):
+        difficulty = profiles["difficulty"].to_dict()
+        selected_scenarios = [
+            _
+            for _ in selected_scenarios
+            if selected_difficulty[0]
+            <= difficulty.get(_, 1.0)
+            <= selected_difficulty[1]
+        ]
     st.write(
         f"Selected scenarios: {selected_scenarios if selected_scenarios  and len(selected_scenarios) < len(scenarios) else 'ALL'} and "
         f"Selected strategies: {type_ if type_ else 'ALL'} and "
@@ -276,6 +305,8 @@ def run(base: Path = DEFAULT_TOURNAMENT_PATH):
         selected_strategies=type_ if type_ else None,
     )
 
+    if profiles is not None and st.sidebar.checkbox("Show Scenario Profiles"):
+        st.dataframe(profiles.loc[profiles.index.isin(selected_scenarios)])
     if st.sidebar.checkbox("Show Scenario Stats"):
         st.dataframe(make_scenario_stats(selected_scenarios, dfs.details))
     if st.sidebar.checkbox("Show Scenario x Strategy Stats"):
@@ -339,7 +370,7 @@ def run(base: Path = DEFAULT_TOURNAMENT_PATH):
             results_path = base / tournament / "results" / (negotiation + ".json")
             parts = negotiation.split("_")
             scenario_name = parts[0]
-            scenario = Scenario.load(base / tournament / "scenarios" / scenario_name)
+            scenario = load_scenario(base / tournament / "scenarios" / scenario_name)
             if scenario is None:
                 return
             col1, col2 = st.columns(2)
@@ -0,0 +1,149 @@
+import copy
+import pickle
+import random
+from functools import partial
+
+import numpy as np
+import pytest
+from negmas.preferences.ops import (
+    calc_scenario_stats,
+    kalai_points,
+    nash_points,
+    pareto_frontier,
+)
+from negmas.sao import SAOMechanism
+
+import anl.anl2024.runner as runner
+from anl.anl2024.analytics import ScenarioAnalytics, profile_scenarios
+from anl.anl2024.negotiators.builtins import NashSeeker, RVFitter
+from anl.anl2024.runner import (
+    _opponent_private_infos,
+    mixed_scenarios,
+    monotonic_pies_scenarios,
+    pie_scenarios,
+)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_analytics_match_negmas(seed):
+    for s in pie_scenarios(1, 100, seed=seed) + monotonic_pies_scenarios(
+        1, 100, seed=seed
+    ):
+        analytics = ScenarioAnalytics.from_scenario(s)
+        assert analytics is not None
+        outcomes = list(s.outcome_space.enumerate())
+        assert analytics.outcomes(range(len(outcomes))) == outcomes
+        ufuns = [copy.copy(_) for _ in s.ufuns]
+        for u in ufuns:
+            u.reserved_value = 0.0
+        frontier, _ = pareto_frontier(ufuns, outcomes)
+        assert set(map(tuple, analytics.frontier_utilities)) == set(frontier)
+        nash = nash_points(ufuns, frontier)[0][0]
+        kalai = kalai_points(ufuns, frontier)[0][0]
+        assert np.prod(analytics.utilities[analytics.nash]) == pytest.approx(
+            np.prod(nash)
+        )
+        assert min(analytics.utilities[analytics.kalai]) == pytest.approx(min(kalai))
+        for k in range(2):
+            assert np.all(np.diff(analytics.utilities[analytics.orders[k], k]) <= 0)
+
+
+def test_analytics_sides_share_arrays():
+    s = pie_scenarios(1, 100, seed=1)[0]
+    assert all("analytics" not in _ for _ in _opponent_private_infos(s))
+    first, second = (_["analytics"] for _ in _opponent_private_infos(s, True))
+    assert (first.side, second.side) == (0, 1)
+    assert np.array_equal(first.utilities, second.utilities[:, ::-1])
+    assert np.array_equal(first.orders, second.orders[::-1])
+    assert np.all(np.diff(second.frontier_utilities[:, 0]) <= 0)
+    assert first.nash == second.nash and first.kalai == second.kalai
+    assert copy.deepcopy(first) is first
+    with pytest.raises(ValueError):
+        first.utilities[0, 0] = 2.0
+    one = len(pickle.dumps(first))
+    assert len(pickle.dumps((first, second))) < one + 200
+    assert not pickle.loads(pickle.dumps(first)).utilities.flags.writeable
+
+
+def _run(s, negotiator, with_analytics):
+    infos = _opponent_private_infos(s, with_analytics)
+    m = SAOMechanism(outcome_space=s.outcome_space, n_steps=30)
+    for u, info in zip(s.ufuns, infos):
+        m.add(negotiator(private_info=info), ufun=copy.deepcopy(u))
+    random.seed(0)
+    m.run()
+    return m
+
+
+def test_rv_fitter_behaves_the_same_with_analytics():
+    s = pie_scenarios(1, 100, seed=5)[0]
+    traces = [
+        [(step, offer) for step, _, offer in _run(s, RVFitter, _).extended_trace]
+        for _ in (True, False)
+    ]
+    assert traces[0] == traces[1]
+
+
+@pytest.mark.parametrize(
+    "generator", [pie_scenarios, partial(mixed_scenarios, pies_fraction=1)]
+)
+def test_nash_seeker_finds_the_same_outcomes_with_analytics(generator):
+    s = generator(1, 100, seed=5)[0]
+    results = [
+        [
+            (sorted(n._outcomes), pytest.approx(n._min_acceptable))
+            for n in _run(s, NashSeeker, _).negotiators
+        ]
+        for _ in (True, False)
+    ]
+    assert results[0] == results[1]
+    # the outcomes offered are those negmas' pareto frontier (of rational outcomes) gives above the nash factor
+    for n in _run(s, NashSeeker, True).negotiators:
+        ufuns = (n.ufun, n.opponent_ufun)
+        outcomes = list(s.outcome_space.enumerate())
+        frontier, indices = pareto_frontier(ufuns, outcomes)
+        limit = nash_points(ufuns, frontier)[0][0][0] * n._nash_factor
+        assert sorted(n._outcomes) == sorted(
+            outcomes[i] for u, i in zip(frontier, indices) if u[0] >= limit
+        )
+
+
+def test_profiles_match_negmas_stats():
+    scenarios = mixed_scenarios(8, 200, seed=4)
+    profiles = profile_scenarios(scenarios, rotate_ufuns=True)
+    assert len(profiles) == 2 * len(scenarios)
+    for k, s in enumerate(scenarios):
+        stats = calc_scenario_stats(s.ufuns)
+        row, rotated = profiles.iloc[2 * k], profiles.iloc[2 * k + 1]
+        assert row.scenario == s.outcome_space.name
+        assert rotated.scenario == f"{s.outcome_space.name}-1"
+        assert row.opposition == pytest.approx(stats.opposition)
+        assert row.n_rational_pareto == len(stats.pareto_utils)
+        assert (row.nash_first, row.nash_second) == pytest.approx(stats.nash_utils[0])
+        assert (row.kalai_first, row.kalai_second) == pytest.approx(
+            stats.kalai_utils[0]
+        )
+        assert (rotated.nash_first, rotated.nash_second) == (
+            row.nash_second,
+            row.nash_first,
+        )
+        assert rotated.difficulty == row.difficulty
+        assert 0 <= row.difficulty <= 1
+        assert row.size_bucket >= row.n_outcomes > row.size_bucket / 10
+
+
+def test_profiles_are_only_calculated_when_saved(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("profiles calculated")
+
+    monkeypatch.setattr(runner, "profile_scenarios", fail)
+    results = runner.anl2024_tournament(
+        n_scenarios=2,
+        n_outcomes=20,
+        n_steps=10,
+        nologs=True,
+        njobs=-1,
+        verbosity=0,
+        sort_runs=True,
+    )
+    assert len(results.details)
@@ -0,0 +1,27 @@
+import json
+
+from anl.anl2024.bench import bench_generators
+
+
+def test_bench_generators_reports_phases_and_memory():
+    report = bench_generators(
+        ["zerosum", "pie"], n_outcomes=(10, 50), n_scenarios=(1, 2), memory=True
+    )
+    json.dumps(report)
+    assert len(report["results"]) == 8
+    for r in report["results"]:
+        assert r["n_generated"] == r["n_scenarios"]
+        assert r["peak_memory"] > 0
+        assert set(r["phases"]) == {"values", "ufuns", "reserved", "other"}
+        assert sum(r["phases"].values()) <= r["seconds"] + 1e-6
+
+
+def test_bench_generators_skips_beyond_budget():
+    report = bench_generators(
+        ["zerosum"], n_outcomes=(10, 20, 30), n_scenarios=(1,), time_budget=0.0
+    )
+    assert [r.get("skipped", False) for r in report["results"]] == [
+        False,
+        True,
+        True,
+    ]
@@ -0,0 +1,72 @@
+import os
+
+from anl.anl2024.cache import ScenarioCache
+from anl.anl2024.runner import pie_scenarios
+
+
+def _counting(counter):
+    def generator(n_scenarios, n_outcomes, **kwargs):
+        counter.append(1)
+        return pie_scenarios(n_scenarios, n_outcomes, **kwargs)
+
+    return generator
+
+
+def test_cache_hits_only_for_identical_settings(tmp_path):
+    cache = ScenarioCache(tmp_path)
+    calls = []
+    generator = _counting(calls)
+    first = cache.generate(generator, 2, 20, seed=1)
+    second = cache.generate(generator, 2, 20, seed=1, njobs=2)
+    assert len(calls) == 1
+    assert [s.outcome_space.name for s in first] == [
+        s.outcome_space.name for s in second
+    ]
+    outcomes = list(first[0].outcome_space.enumerate())
+    assert [first[0].ufuns[0](_) for _ in outcomes] == [
+        second[0].ufuns[0](_) for _ in outcomes
+    ]
+    cache.generate(generator, 2, 20, seed=2)
+    cache.generate(generator, 2, 21, seed=1)
+    cache.generate(generator, 2, 20, seed=1, monotonic=True)
+    assert len(calls) == 4
+    cache.generate(generator, 2, 20)
+    cache.generate(generator, 2, 20)
+    assert len(calls) == 6
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ScenarioCache(tmp_path, max_size=0)
+    keys = []
+    for i in range(3):
+        key = ScenarioCache.key("pie", 1, 10, i)
+        cache.put(key, pie_scenarios(1, 10, seed=i))
+        os.utime(cache._file(key), (i, i))
+        keys.append(key)
+    assert cache.get(keys[0]) is not None
+    size = cache.size()
+    removed = cache.evict(size - 1)
+    assert removed == [keys[1]]
+    assert keys[0] in cache and keys[2] in cache and keys[1] not in cache
+
+
+def test_streamed_scenarios_are_written_as_they_are_consumed(tmp_path):
+    cache = ScenarioCache(tmp_path)
+    calls = []
+    generator = _counting(calls)
+    streamed = cache.generate(generator, 3, 20, seed=1, lazy=True)
+    first = next(streamed)
+    assert cache.size() == 0 and len(list(tmp_path.glob("*.tmp"))) == 1
+    rest = list(streamed)
+    assert not list(tmp_path.glob("*.tmp"))
+    cached = cache.generate(generator, 3, 20, seed=1, lazy=True)
+    assert len(calls) == 1
+    assert [s.outcome_space.name for s in cached] == [
+        s.outcome_space.name for s in [first] + rest
+    ]
+    # stopping early stores nothing
+    partial = cache.generate(generator, 3, 20, seed=2, lazy=True)
+    next(partial)
+    partial.close()
+    assert not list(tmp_path.glob("*.tmp"))
+    assert ScenarioCache.key(generator, 3, 20, 2) not in cache
@@ -0,0 +1,137 @@
+import math
+import threading
+import time
+
+import pytest
+
+from anl.anl2024.distributed import (
+    AUTHKEY_ENV,
+    DEFAULT_PORT,
+    DistributedExecutor,
+    parse_address,
+    run_worker,
+)
+from anl.anl2024.negotiators import Boulware, Conceder
+from anl.anl2024.runner import pie_scenarios
+from anl.anl2024.tournament import streaming_tournament
+
+AUTHKEY = "test"
+
+CALLS = []
+
+
+def slow(seconds: float) -> float:
+    CALLS.append(seconds)
+    time.sleep(seconds)
+    return seconds
+
+
+def start_worker(executor, **kwargs) -> threading.Thread:
+    thread = threading.Thread(
+        target=run_worker,
+        args=(executor.address, AUTHKEY),
+        kwargs=dict(poll=0.1) | kwargs,
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def test_parse_address():
+    assert parse_address("example.com:1234") == ("example.com", 1234)
+    assert parse_address(":1234") == ("127.0.0.1", 1234)
+    assert parse_address("example.com") == ("example.com", DEFAULT_PORT)
+    assert parse_address(("", 5)) == ("127.0.0.1", 5)
+
+
+def test_workers_run_tasks_and_report_exceptions():
+    with DistributedExecutor(("127.0.0.1", 0), authkey=AUTHKEY) as executor:
+        workers = [start_worker(executor) for _ in range(2)]
+        futures = [executor.submit(pow, i, 2) for i in range(20)]
+        assert [_.result(timeout=30) for _ in futures] == [i**2 for i in range(20)]
+        with pytest.raises(ValueError):
+            executor.submit(math.sqrt, -1).result(timeout=30)
+    # shutting down the coordinator stops all workers
+    for worker in workers:
+        worker.join(timeout=10)
+        assert not worker.is_alive()
+    with pytest.raises(RuntimeError):
+        executor.submit(pow, 2, 2)
+
+
+def test_cancelled_tasks_are_dropped():
+    with DistributedExecutor(("127.0.0.1", 0), authkey=AUTHKEY) as executor:
+        cancelled, future = executor.submit(pow, 3, 2), executor.submit(pow, 4, 2)
+        assert cancelled.cancel()
+        # the only task this worker runs is the one still pending
+        start_worker(executor, max_tasks=1)
+        assert future.result(timeout=30) == 16
+        assert executor.max_workers == 1
+
+
+def test_tasks_of_dead_workers_are_queued_again():
+    with DistributedExecutor(
+        ("127.0.0.1", 0), authkey=AUTHKEY, worker_timeout=0.5
+    ) as executor:
+        future = executor.submit(pow, 3, 2)
+        # a worker claims the task and dies (no more heartbeats)
+        executor._tasks.claim("dead", timeout=5)
+        start_worker(executor, heartbeat=0.1)
+        assert future.result(timeout=30) == 9
+
+
+def test_tasks_of_slow_workers_are_not_queued_again():
+    with DistributedExecutor(
+        ("127.0.0.1", 0), authkey=AUTHKEY, worker_timeout=0.5
+    ) as executor:
+        future = executor.submit(slow, 1.5)
+        start_worker(executor, heartbeat=0.1)
+        assert future.result(timeout=30) == 1.5
+        time.sleep(0.5)
+        assert CALLS == [1.5]
+        # workers are counted as they connect
+        start_worker(executor, heartbeat=0.1)
+        deadline = time.monotonic() + 30
+        while executor.max_workers < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert executor.max_workers == 2
+
+
+def test_workers_need_a_key(monkeypatch):
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    with pytest.raises(ValueError):
+        run_worker(("127.0.0.1", DEFAULT_PORT))
+    with DistributedExecutor(("127.0.0.1", 0)) as executor:
+        assert len(executor.authkey) >= 32
+        thread = threading.Thread(
+            target=run_worker,
+            args=(executor.address, executor.authkey),
+            kwargs=dict(poll=0.1),
+            daemon=True,
+        )
+        thread.start()
+        assert executor.submit(pow, 2, 3).result(timeout=30) == 8
+    with DistributedExecutor(("127.0.0.1", 0)) as other:
+        assert other.authkey != executor.authkey
+
+
+def test_streaming_tournament_on_workers_matches_local_run():
+    params = dict(n_repetitions=2, n_steps=10, verbosity=0, save_stats=False)
+    local = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(2, 20, seed=3), njobs=-1, **params
+    )
+    with DistributedExecutor(("127.0.0.1", 0), authkey=AUTHKEY) as executor:
+        for _ in range(2):
+            start_worker(executor)
+        distributed = streaming_tournament(
+            (Boulware, Conceder),
+            pie_scenarios(2, 20, seed=3),
+            executor=executor,
+            **params,
+        )
+    assert len(distributed.details) == len(local.details)
+    assert dict(
+        zip(distributed.final_scores["strategy"], distributed.final_scores["score"])
+    ) == pytest.approx(
+        dict(zip(local.final_scores["strategy"], local.final_scores["score"]))
+    )
@@ -0,0 +1,109 @@
+import pytest
+from negmas.inout import Scenario
+from negmas.outcomes import make_issue, make_os
+from negmas.preferences import LinearAdditiveUtilityFunction as U
+from negmas.preferences.value_fun import AffineFun, TableFun
+
+from anl.anl2024.formats import (
+    has_binary_scenario,
+    is_scenario,
+    load_scenario,
+    save_binary_scenario,
+    save_scenario,
+)
+from anl.anl2024.runner import mixed_scenarios, monotonic_pies_scenarios
+
+
+def assert_same(a: Scenario, b: Scenario):
+    outcomes = list(a.outcome_space.enumerate_or_sample())
+    assert list(b.outcome_space.enumerate_or_sample()) == outcomes
+    assert b.outcome_space.name == a.outcome_space.name
+    for u, v in zip(a.ufuns, b.ufuns, strict=True):
+        assert v.name == u.name
+        assert v.reserved_value == u.reserved_value
+        assert [v(_) for _ in outcomes] == pytest.approx([u(_) for _ in outcomes])
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_binary_scenarios_round_trip(tmp_path, compress):
+    scenarios = mixed_scenarios(5, 100, seed=1) + monotonic_pies_scenarios(
+        2, 200, seed=1
+    )
+    for s in scenarios:
+        path = tmp_path / s.outcome_space.name
+        assert save_binary_scenario(s, path, compress=compress)
+        assert is_scenario(path)
+        assert_same(s, load_scenario(path))
+
+
+def test_binary_scenarios_support_contiguous_issues_weights_and_bias(tmp_path):
+    issues = (make_issue(10, "price"), make_issue(["a", "b", "c"], "color"))
+    os = make_os(issues, name="mixed_issues")
+    ufuns = tuple(
+        U(
+            values=(AffineFun(0.1 * (k + 1), 0.2), TableFun(dict(a=0.0, b=0.5, c=1.0))),
+            weights=(0.3, 0.7),
+            bias=0.1,
+            reserved_value=0.25,
+            name=f"u{k}",
+            outcome_space=os,
+        )
+        for k in range(2)
+    )
+    s = Scenario(outcome_space=os, ufuns=ufuns)  # type: ignore
+    assert save_binary_scenario(s, tmp_path)
+    assert_same(s, load_scenario(tmp_path))
+
+
+def test_save_scenario_formats(tmp_path):
+    s = mixed_scenarios(1, 50, seed=2, pies_fraction=0)[0]
+    save_scenario(s, tmp_path / "both")
+    save_scenario(s, tmp_path / "binary", text=False)
+    save_scenario(s, tmp_path / "text", binary=False)
+    assert has_binary_scenario(tmp_path / "both")
+    assert Scenario.is_loadable(tmp_path / "both")
+    assert has_binary_scenario(tmp_path / "binary")
+    assert not Scenario.is_loadable(tmp_path / "binary")
+    assert not has_binary_scenario(tmp_path / "text")
+    for name in ("both", "binary", "text"):
+        assert_same(s, load_scenario(tmp_path / name))  # type: ignore
+
+
+def test_corrupted_binary_scenarios_fall_back_to_text(tmp_path):
+    s = mixed_scenarios(1, 50, seed=2, pies_fraction=0)[0]
+    save_scenario(s, tmp_path)
+    (tmp_path / "scenario.npz").write_bytes(b"garbage")
+    with pytest.warns(UserWarning):
+        loaded = load_scenario(tmp_path)
+    assert_same(s, loaded)  # type: ignore
+
+
+def test_mixed_type_issues_are_saved_as_text(tmp_path):
+    issues = (make_issue([1, "a", 2.5], "mixed"),)
+    os = make_os(issues, name="Mixed")
+    ufun = U(
+        values=(TableFun({1: 0.0, "a": 0.5, 2.5: 1.0}),),
+        outcome_space=os,
+        name="u",
+    )
+    s = Scenario(outcome_space=os, ufuns=(ufun,))
+    assert not save_binary_scenario(s, tmp_path / "binary")
+    save_scenario(s, tmp_path / "text", text=False)
+    assert not has_binary_scenario(tmp_path / "text")
+    assert list(load_scenario(tmp_path / "text").outcome_space.enumerate()) == [  # type: ignore
+        (1,),
+        ("a",),
+        (2.5,),
+    ]
+
+
+def test_saving_one_format_removes_the_other(tmp_path):
+    old, new = mixed_scenarios(2, 50, seed=2, pies_fraction=0)
+    save_scenario(old, tmp_path)
+    save_scenario(new, tmp_path, binary=False)
+    assert not has_binary_scenario(tmp_path)
+    assert_same(new, load_scenario(tmp_path))  # type: ignore
+    save_scenario(old, tmp_path)
+    save_scenario(new, tmp_path, text=False)
+    assert not Scenario.is_loadable(tmp_path)
+    assert_same(new, load_scenario(tmp_path))  # type: ignore
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from negmas.preferences.ops import kalai_points, nash_points, pareto_frontier_active
+
+from anl.anl2024.frontier import (
+    chunked_pareto_frontier_2d,
+    kalai_point_2d,
+    nash_point_2d,
+    outcome_at,
+    outcome_utilities,
+    pareto_frontier_2d,
+    streaming_pareto_frontier_2d,
+)
+from anl.anl2024.runner import (
+    mixed_scenarios,
+    monotonic_pie_scenarios,
+    zerosum_pie_scenarios,
+)
+
+
+@pytest.mark.parametrize("discrete", [False, True])
+@pytest.mark.parametrize("n", [1, 2, 10, 500])
+def test_pareto_frontier_2d_matches_negmas(n, discrete):
+    rng = np.random.default_rng(n)
+    utils = rng.integers(0, 10, size=(n, 2)) / 9 if discrete else rng.random((n, 2))
+    frontier = pareto_frontier_2d(utils)
+    expected = utils[pareto_frontier_active(utils)]
+    assert set(map(tuple, utils[frontier])) == set(map(tuple, expected))
+    assert np.all(np.diff(utils[frontier, 0]) <= 0)
+    nash = nash_points(None, [tuple(_) for _ in expected], ranges=[(0, 1), (0, 1)])
+    indx = nash_point_2d(utils[frontier])
+    assert indx is not None
+    assert np.prod(utils[frontier][indx]) == pytest.approx(np.prod(nash[0][0]))
+
+
+def test_nash_point_2d_respects_reserved_values():
+    frontier = np.asarray([[1.0, 0.0], [0.8, 0.5], [0.5, 0.8], [0.0, 1.0]])
+    assert nash_point_2d(frontier, (0.0, 0.0)) in (1, 2)
+    assert nash_point_2d(frontier, (0.6, 0.0)) == 1
+    assert nash_point_2d(frontier, (0.0, 0.6)) == 2
+    assert nash_point_2d(frontier[:0]) is None
+
+
+class _Reserved:
+    def __init__(self, reserved_value):
+        self.reserved_value = reserved_value
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_kalai_point_2d_matches_negmas(seed):
+    rng = np.random.default_rng(seed)
+    utils = rng.random((50, 2))
+    frontier = utils[pareto_frontier_2d(utils)]
+    reserved = tuple(rng.random(2) * 0.6) if seed % 2 else (0.0, 0.0)
+    expected = kalai_points(
+        [_Reserved(_) for _ in reserved],
+        [tuple(_) for _ in frontier],
+        ranges=[(0, 1), (0, 1)],
+    )
+    indx = kalai_point_2d(frontier, reserved)
+    assert indx == (expected[0][1] if expected else None)
+
+
+@pytest.mark.parametrize("generator", [monotonic_pie_scenarios, zerosum_pie_scenarios])
+def test_reserved_values_allow_rational_outcomes(generator):
+    for s in generator(5, 64, seed=1):
+        outcomes = list(s.outcome_space.enumerate_or_sample())
+        assert any(all(u(_) > u.reserved_value for u in s.ufuns) for _ in outcomes)
+
+
+def _chunks(utils, size):
+    return [utils[i : i + size] for i in range(0, len(utils), size)]
+
+
+@pytest.mark.parametrize("discrete", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 5000])
+def test_streaming_pareto_frontier_2d_is_exact(chunk_size, discrete):
+    rng = np.random.default_rng(chunk_size)
+    utils = (
+        rng.integers(0, 10, size=(2000, 2)) / 9 if discrete else rng.random((2000, 2))
+    )
+    indices, frontier = streaming_pareto_frontier_2d(_chunks(utils, chunk_size))
+    assert np.array_equal(indices, pareto_frontier_2d(utils))
+    assert np.array_equal(frontier, utils[indices])
+
+
+@pytest.mark.parametrize("eps", [0.01, 0.1])
+def test_streaming_pareto_frontier_2d_approximation(eps):
+    rng = np.random.default_rng(0)
+    utils = rng.random((20_000, 2)) ** 0.1
+    exact = utils[pareto_frontier_2d(utils)]
+    indices, frontier = streaming_pareto_frontier_2d(_chunks(utils, 1000), eps)
+    assert np.array_equal(frontier, utils[indices])
+    assert len(frontier) <= 1 + 1 / eps + 1
+    for u in exact:
+        covering = (frontier[:, 0] >= u[0]) & (frontier[:, 1] > u[1] - eps)
+        assert np.any(covering)
+
+
+def test_chunked_pareto_frontier_2d_on_ufuns():
+    s = mixed_scenarios(1, 500, pies_fraction=0, seed=3)[0]
+    utils = outcome_utilities(s.ufuns, s.outcome_space.enumerate())
+    indices, frontier = chunked_pareto_frontier_2d(s.ufuns, chunk_size=64)
+    assert np.array_equal(indices, pareto_frontier_2d(utils))
+    assert np.array_equal(frontier, utils[indices])
+
+
+def test_outcome_at_matches_enumeration():
+    s = mixed_scenarios(1, 100, pies_fraction=1, seed=3)[0]
+    outcomes = list(s.outcome_space.enumerate())
+    assert len(s.outcome_space.issues) > 1
+    assert [outcome_at(s.outcome_space, _) for _ in range(len(outcomes))] == outcomes
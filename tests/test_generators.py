@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+from negmas.inout import Scenario
+
+import anl.anl2024.runner as runner
+from anl.anl2024.formats import load_binary_scenario, save_binary_scenario
+from anl.anl2024.frontier import pareto_frontier_2d
+from anl.anl2024.runner import (
+    GENMAP,
+    _constructive_values,
+    mixed_scenarios,
+    monotonic_pies_scenarios,
+    pie_label,
+    pie_scenarios,
+    plan_issue_sizes,
+    record_generation_stats,
+    zerosum_pie_scenarios,
+)
+from anl.anl2024.ufuns import ArrayFun
+
+
+@pytest.mark.parametrize("monotonic", [False, True])
+def test_pie_scenarios_use_array_values(monotonic):
+    scenarios = pie_scenarios(3, 50, monotonic=monotonic)
+    assert len(scenarios) == 3
+    for s in scenarios:
+        outcomes = list(s.outcome_space.enumerate_or_sample())
+        for u in s.ufuns:
+            assert isinstance(u.values[0], ArrayFun)  # type: ignore
+            vals = np.asarray([u(_) for _ in outcomes])
+            assert vals.min() == pytest.approx(0.0)
+            assert vals.max() == pytest.approx(1.0)
+            assert u.reserved_value < vals.max()
+        if monotonic:
+            first = [s.ufuns[0](_) for _ in outcomes]
+            assert all(a <= b for a, b in zip(first[:-1], first[1:]))
+
+
+def test_array_fun_round_trips_as_table(tmp_path):
+    s = pie_scenarios(1, 20)[0]
+    s.dumpas(tmp_path)
+    loaded = Scenario.load(tmp_path)
+    assert loaded is not None
+    for u, v in zip(s.ufuns, loaded.ufuns):
+        assert all(
+            u(_) == pytest.approx(v(_)) for _ in s.outcome_space.enumerate_or_sample()
+        )
+
+
+def _signature(scenarios):
+    return [
+        (
+            s.outcome_space.name,
+            tuple(u.reserved_value for u in s.ufuns),
+            tuple(float(u(_)) for u in s.ufuns for _ in s.outcome_space.enumerate()),
+        )
+        for s in scenarios
+    ]
+
+
+@pytest.mark.parametrize("generator", sorted(GENMAP.keys()))
+def test_seeded_generation_does_not_depend_on_njobs(generator):
+    n_outcomes = 27 if generator == "pies" else (20, 60)
+    serial = GENMAP[generator](4, n_outcomes, seed=42, njobs=-1)
+    parallel = GENMAP[generator](4, n_outcomes, seed=42, njobs=2)
+    assert len(serial) == 4
+    assert _signature(serial) == _signature(parallel)
+
+
+@pytest.mark.parametrize("n_issues", [1, 2, 3, 4])
+@pytest.mark.parametrize("n", [50, 97, 1000, 7919, 999983, 10**6])
+def test_plan_issue_sizes_is_balanced_and_close(n, n_issues):
+    sizes = plan_issue_sizes(n, n_issues)
+    assert len(sizes) == n_issues
+    assert abs(np.prod(sizes) - n) <= 0.1 * n
+    assert max(sizes) - min(sizes) <= max(2, 0.2 * min(sizes))
+
+
+def test_monotonic_pies_accept_outcome_ranges():
+    for s in monotonic_pies_scenarios(3, (100, 200), seed=3):
+        n = s.outcome_space.cardinality
+        assert 90 <= n <= 220
+        assert len(s.outcome_space.issues) == 3
+
+
+@pytest.mark.parametrize("n", [3, 10, 11, 1000])
+def test_zerosum_pies_are_linear_and_rational(n):
+    s = zerosum_pie_scenarios(1, n, seed=n)[0]
+    outcomes = list(s.outcome_space.enumerate())
+    first, second = s.ufuns
+    for o in outcomes:
+        a, b = (int(_) for _ in o[0].split("_"))
+        assert first(o) == pytest.approx(a / (n - 1))
+        assert second(o) == pytest.approx(b / (n - 1))
+    assert any(
+        first(o) > first.reserved_value and second(o) > second.reserved_value
+        for o in outcomes
+    )
+
+
+@pytest.mark.parametrize("generator", ["zero_sum", "piecewise_linear", "curve"])
+@pytest.mark.parametrize(
+    "n_pareto,n", [(0, 10), (1, 1), (2, 2), (2, 100), (7, 50), (50, 50), (20, 10)]
+)
+def test_constructive_values_have_exact_frontier(generator, n_pareto, n):
+    for seed in range(10):
+        np.random.seed(seed)
+        vals = _constructive_values(n_pareto, n, generator, pareto_first=False)
+        assert vals.shape == (n, 2)
+        assert vals.min() >= 0 and vals.max() <= 1
+        assert len(pareto_frontier_2d(vals)) == min(max(1, n_pareto), n)
+
+
+def test_mixed_scenarios_record_attempts_per_type():
+    with record_generation_stats() as stats:
+        scenarios = mixed_scenarios(20, (10, 100), n_pareto=(1, 2), seed=0)
+    assert len(scenarios) == 20
+    assert sum(_["attempts"] for _ in stats.values()) == 20
+    assert all(_["failures"] == 0 for _ in stats.values())
+
+
+def test_mixed_scenarios_warn_about_skipped_scenarios(monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("failed")
+
+    monkeypatch.setattr(runner, "generate_multi_issue_ufuns", fail)
+    with record_generation_stats() as stats, pytest.warns(
+        UserWarning, match="Skipping"
+    ):
+        scenarios = mixed_scenarios(
+            2, 10, zerosum_fraction=0, pies_fraction=1, n_trials=3, seed=0
+        )
+    assert len(scenarios) == 0
+    assert stats["pies"]["attempts"] == 6
+    assert stats["pies"]["failures"] == 6
+    assert stats["pies"]["skipped"] == 2
+
+
+def test_mixed_scenarios_fall_back_to_constructive_values(monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("failed")
+
+    monkeypatch.setattr(runner, "generate_utility_values", fail)
+    with record_generation_stats() as stats:
+        scenarios = mixed_scenarios(
+            4, 20, zerosum_fraction=0.5, pies_fraction=0, n_pareto=3, seed=0
+        )
+    assert len(scenarios) == 4
+    assert sum(_["failures"] for _ in stats.values()) == 4
+    assert sum(_["attempts"] for _ in stats.values()) == 8
+    assert sum(_["skipped"] for _ in stats.values()) == 0
+
+
+@pytest.mark.parametrize(
+    "generator", [mixed_scenarios, pie_scenarios, zerosum_pie_scenarios]
+)
+def test_integer_outcomes_give_the_same_scenarios(generator, tmp_path):
+    labelled = generator(4, 40, seed=11)
+    encoded = generator(4, 40, seed=11, integer_outcomes=True)
+    for k, (x, y) in enumerate(zip(labelled, encoded)):
+        outcomes = list(x.outcome_space.enumerate())
+        integers = list(y.outcome_space.enumerate())
+        if len(y.outcome_space.issues) == 1:
+            assert all(isinstance(_[0], int) for _ in integers)
+            n = len(integers)
+            assert [(pie_label(_[0], n),) for _ in integers] == outcomes
+        save_binary_scenario(y, tmp_path / str(k))
+        loaded = load_binary_scenario(tmp_path / str(k))
+        for u, v, w in zip(x.ufuns, y.ufuns, loaded.ufuns):
+            assert u.reserved_value == v.reserved_value == w.reserved_value
+            assert [u(_) for _ in outcomes] == [v(_) for _ in integers]
+            assert [w(_) for _ in integers] == [v(_) for _ in integers]
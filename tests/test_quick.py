@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from anl.anl2024.analytics import profile_scenarios
+from anl.anl2024.negotiators import Boulware, Conceder, Linear
+from anl.anl2024.quick import (
+    quick_eval_report,
+    ranking_distance,
+    representative_scenarios,
+    weighted_ranking,
+)
+from anl.anl2024.runner import anl2024_tournament, mixed_scenarios
+
+
+@pytest.mark.parametrize("n", [1, 3, 8])
+def test_representative_scenarios_cover_all_candidates(n):
+    profiles = profile_scenarios(mixed_scenarios(20, (20, 200), seed=1))
+    selected, weights = representative_scenarios(profiles, n, seed=0)
+    assert 1 <= len(selected) <= n
+    assert sorted(selected) == selected and len(set(selected)) == len(selected)
+    assert sum(weights) == len(profiles)
+    assert representative_scenarios(profiles, n, seed=0) == (selected, weights)
+
+
+def test_representative_scenarios_keep_everything_if_possible():
+    profiles = profile_scenarios(mixed_scenarios(3, 20, seed=1))
+    assert representative_scenarios(profiles, 5) == ([0, 1, 2], [1, 1, 1])
+
+
+def test_ranking_distance():
+    a = pd.DataFrame(dict(strategy=["x", "y", "z"], score=[3, 2, 1]))
+    b = pd.DataFrame(dict(strategy=["y", "x", "z"], score=[3, 2, 1]))
+    assert ranking_distance(a, a) == dict(
+        kendall_tau=1.0, max_rank_change=0, same_winner=True
+    )
+    distance = ranking_distance(a, b)
+    assert distance["kendall_tau"] == pytest.approx(1 / 3)
+    assert distance["max_rank_change"] == 1
+    assert not distance["same_winner"]
+
+
+def test_weighted_ranking_uses_weights_of_rotated_scenarios():
+    scores = pd.DataFrame(
+        dict(
+            strategy=["x", "y", "x", "y"],
+            scenario=["A", "A", "B-1", "B-1"],
+            advantage=[1.0, 0.0, 0.0, 0.5],
+        )
+    )
+    ranking = weighted_ranking(scores, dict(A=1, B=3))
+    assert ranking["strategy"].tolist() == ["y", "x"]
+    assert ranking["score"].tolist() == pytest.approx([0.375, 0.25])
+
+
+def test_quick_eval_runs_a_subset_and_reports(tmp_path):
+    results = anl2024_tournament(
+        n_scenarios=6,
+        n_outcomes=20,
+        competitors=(Boulware, Conceder, Linear),
+        n_repetitions=1,
+        n_steps=10,
+        njobs=-1,
+        verbosity=0,
+        plot_fraction=0,
+        nologs=True,
+        seed=2,
+        quick_eval=2,
+    )
+    assert 1 <= results.scores["scenario"].nunique() <= 2
+    weights = {_: 3 for _ in results.scores["scenario"].unique()}
+    report = quick_eval_report(results.scores, weights, 6, seed=0)
+    assert {_["strategy"] for _ in report["ranking"]} == {
+        "Boulware",
+        "Conceder",
+        "Linear",
+    }
+    assert -1 <= report["reweighted_kendall_tau"] <= 1
+    assert 0 <= report["reweighted_winner_stability"] <= 1
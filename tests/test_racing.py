@@ -0,0 +1,86 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from anl.anl2024.negotiators import Boulware, Conceder, Linear
+from anl.anl2024.racing import RepetitionRace, settled_competitors
+from anl.anl2024.runner import anl2024_tournament, pie_scenarios
+
+
+def test_settled_competitors_do_not_overlap_with_others():
+    intervals = dict(
+        A=(0.9, 0.8, 1.0),
+        B=(0.5, 0.4, 0.6),
+        C=(0.45, 0.3, 0.55),
+        D=(0.1, -math.inf, math.inf),
+    )
+    assert settled_competitors(intervals) == set()
+    del intervals["D"]
+    assert settled_competitors(intervals) == {"A"}
+
+
+def test_race_skips_settled_and_constant_negotiations():
+    s = pie_scenarios(1, 20, seed=1)[0]
+    racer = RepetitionRace(min_repetitions=2)
+    racer.settled = {"A", "B"}
+    racer._constant = {(str(s.outcome_space.name), ("C", "A"))}
+    racer.round = 2
+
+    def run(names, rep=2):
+        return racer(dict(s=s, partner_names=list(names), rep=rep))
+
+    assert not run(("A", "B"))
+    assert not run(("C", "A"))
+    assert run(("A", "C"))
+    assert not run(("A", "C"), rep=1)
+    racer.round = 1
+    assert run(("A", "B"), rep=1)
+
+
+def test_racing_stops_repeating_deterministic_negotiations():
+    params = dict(
+        competitors=(Boulware, Conceder, Linear),
+        n_scenarios=2,
+        n_outcomes=20,
+        n_steps=20,
+        nologs=True,
+        njobs=-1,
+        seed=1,
+        verbosity=0,
+        n_repetitions=4,
+    )
+    full = anl2024_tournament(**params)
+    raced = anl2024_tournament(racing=0.05, **params)
+    assert len(raced.details) == len(full.details) // 2
+    assert list(raced.final_scores["strategy"]) == list(full.final_scores["strategy"])
+    assert list(raced.final_scores["score"]) == pytest.approx(
+        list(full.final_scores["score"])
+    )
+
+
+def test_racing_reuses_the_executor_and_limits_of_every_round():
+    with ThreadPoolExecutor(2) as executor:
+        raced = anl2024_tournament(
+            competitors=(Boulware, Conceder, Linear),
+            n_scenarios=2,
+            n_outcomes=20,
+            n_steps=(10, 1000),
+            nologs=True,
+            verbosity=0,
+            n_repetitions=3,
+            racing=0.05,
+            executor=executor,
+        )
+    assert set(raced.details["rep"]) == {0, 1}
+    assert (raced.details.groupby("scenario")["n_steps"].nunique() == 1).all()
+
+
+def test_racing_needs_a_valid_error_level():
+    with pytest.raises(ValueError):
+        anl2024_tournament(n_scenarios=1, nologs=True, racing=1.5)
+
+
+def test_racing_cannot_be_combined_with_quick_evaluation():
+    with pytest.raises(ValueError, match="quick"):
+        anl2024_tournament(n_scenarios=1, nologs=True, racing=0.05, quick_eval=1)
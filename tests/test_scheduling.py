@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from anl.anl2024.distributed import DistributedExecutor, run_worker
+from anl.anl2024.negotiators import Boulware, Conceder
+from anl.anl2024.runner import pie_scenarios
+from anl.anl2024.scheduling import CostModel, RunQueue
+from anl.anl2024.tournament import streaming_tournament
+
+
+def make_info(s, names=("A", "B"), n_steps=100, time_limit=None):
+    return dict(
+        s=s,
+        partner_names=list(names),
+        mechanism_params=dict(n_steps=n_steps, time_limit=time_limit),
+    )
+
+
+def test_queue_pops_longest_expected_first():
+    s = pie_scenarios(1, 20, seed=1)[0]
+    queue = RunQueue()
+    for n_steps in (10, 1000, 100):
+        queue.add(make_info(s, n_steps=n_steps))
+    queue.add(make_info(s, ("A", "C"), n_steps=500))
+    assert len(queue) == 4
+    steps = [queue.pop()["mechanism_params"]["n_steps"] for _ in range(4)]
+    assert steps == [1000, 500, 100, 10]
+    assert not queue
+
+
+def test_time_limits_bound_estimates():
+    s = pie_scenarios(1, 20, seed=1)[0]
+    model = CostModel(step_time=1.0)
+    assert model.estimate(make_info(s, n_steps=100)) == pytest.approx(200.0)
+    assert model.estimate(make_info(s, n_steps=100, time_limit=5)) == 5
+    assert model.estimate(make_info(s, n_steps=None)) == float("inf")
+
+
+def test_estimates_are_refined_by_results():
+    s = pie_scenarios(1, 20, seed=1)[0]
+    model = CostModel()
+    queue = RunQueue(model)
+    queue.add(make_info(s, ("Fast", "Fast"), n_steps=1000))
+    queue.add(make_info(s, ("Slow", "Fast"), n_steps=100))
+    # slow takes nine tenths of the time of its negotiations which end early between fast ones
+    model.update(
+        make_info(s, ("Slow", "Fast"), n_steps=10),
+        dict(last_step=10, execution_time=1.0, negotiator_times=[0.9, 0.1]),
+    )
+    model.update(
+        make_info(s, ("Fast", "Fast"), n_steps=1000),
+        dict(last_step=50, execution_time=0.05, negotiator_times=[0.01, 0.01]),
+    )
+    assert model.competitor_step_time("Slow", model.size_bucket(make_info(s))) > 10 * (
+        model.competitor_step_time("Fast", model.size_bucket(make_info(s)))
+    )
+    assert queue.pop()["partner_names"] == ["Slow", "Fast"]
+
+
+def test_scheduled_tournament_matches_unscheduled_run():
+    params = dict(n_repetitions=2, n_steps=(10, 100), verbosity=0, save_stats=False)
+    local = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(3, 20, seed=3), njobs=-1, **params
+    )
+    with DistributedExecutor(("127.0.0.1", 0), authkey="test") as executor:
+        for _ in range(2):
+            threading.Thread(
+                target=run_worker,
+                args=(executor.address, "test"),
+                kwargs=dict(poll=0.1),
+                daemon=True,
+            ).start()
+        scheduled = streaming_tournament(
+            (Boulware, Conceder),
+            pie_scenarios(3, 20, seed=3),
+            executor=executor,
+            scheduler=CostModel(),
+            **params,
+        )
+    assert len(scheduled.details) == len(local.details)
+    assert set(scheduled.final_scores["strategy"]) == set(
+        local.final_scores["strategy"]
+    )
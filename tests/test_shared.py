@@ -0,0 +1,137 @@
+import errno
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import anl.anl2024.shared as shared_module
+from anl.anl2024.negotiators import Boulware, Conceder
+from anl.anl2024.runner import _opponent_private_infos, pie_scenarios
+from anl.anl2024.scheduling import CostModel
+from anl.anl2024.shared import SharedScenarios, load_shared, write_shared
+from anl.anl2024.tournament import streaming_tournament
+
+
+def test_shared_arrays_are_mapped_without_copying(tmp_path):
+    values = np.arange(1000, dtype=float)
+    ref = write_shared(dict(name="x", values=values), tmp_path / "x.pkl")
+    loaded = load_shared(ref)
+    assert loaded["name"] == "x"
+    assert np.array_equal(loaded["values"], values)
+    assert not loaded["values"].flags.owndata
+    # loaded once per process
+    assert load_shared(ref) is loaded
+
+
+def test_scenarios_are_written_once_and_deleted_when_released(tmp_path):
+    s = pie_scenarios(1, 1000, seed=1)[0]
+    pinfo = _opponent_private_infos(s)
+    with SharedScenarios(tmp_path) as shared:
+        ref = shared.acquire(s, pinfo)
+        assert shared.acquire(s, pinfo) == ref
+        assert len(shared) == 1
+        assert len(pickle.dumps(ref)) < len(pickle.dumps((s, pinfo))) / 100
+        loaded, _, stats = load_shared(ref)
+        outcomes = list(s.outcome_space.enumerate_or_sample())
+        assert [loaded.ufuns[0](_) for _ in outcomes] == [
+            s.ufuns[0](_) for _ in outcomes
+        ]
+        assert stats is None
+        shared.release(s)
+        assert len(shared) == 1
+        shared.release(s)
+        assert len(shared) == 0
+        assert not list(shared.folder.iterdir())
+    assert not shared.folder.exists()
+
+
+def test_reserved_scenarios_are_kept_until_the_last_negotiation(tmp_path):
+    s = pie_scenarios(1, 100, seed=1)[0]
+    with SharedScenarios(tmp_path) as shared:
+        with pytest.raises(ValueError):
+            shared.ref(s)
+        shared.reserve(s, 3)
+        ref = shared.ref(s)
+        for _ in range(2):
+            shared.release(s)
+            assert shared.ref(s) == ref
+            assert Path(ref[0]).exists()
+        shared.release(s)
+        assert not Path(ref[0]).exists()
+
+
+def test_scenarios_fall_back_when_shared_memory_is_full(tmp_path, monkeypatch):
+    s = pie_scenarios(1, 100, seed=1)[0]
+    write = shared_module.write_shared
+    full = [tmp_path]
+
+    def write_if_space(obj, path):
+        if any(Path(path).is_relative_to(_) for _ in full):
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return write(obj, path)
+
+    monkeypatch.setattr(shared_module, "write_shared", write_if_space)
+    with SharedScenarios(tmp_path) as shared:
+        ref = shared.acquire(s)
+        assert ref is not None
+        assert Path(ref[0]).is_relative_to(tempfile.gettempdir())
+        assert load_shared(ref)[0].outcome_space.name == s.outcome_space.name
+        full.append(Path(tempfile.gettempdir()))
+        assert shared.acquire(pie_scenarios(1, 100, seed=2)[0]) is None
+    assert not Path(ref[0]).exists()
+
+
+def test_scenarios_are_written_once_whatever_the_order_of_negotiations(
+    monkeypatch,
+):
+    written = []
+    write = shared_module.write_shared
+
+    def counted(obj, path):
+        written.append(path)
+        return write(obj, path)
+
+    monkeypatch.setattr(shared_module, "write_shared", counted)
+    results = streaming_tournament(
+        (Boulware, Conceder),
+        pie_scenarios(2, 50, seed=3),
+        n_repetitions=2,
+        n_steps=20,
+        verbosity=0,
+        save_stats=False,
+        private_infos=_opponent_private_infos,
+        njobs=2,
+        share_scenarios=True,
+        scheduler=CostModel(),
+    )
+    assert len(results.details) == 32
+    # two rotations of each scenario
+    assert len(written) == 4
+
+
+def test_tournament_on_shared_scenarios_matches_serial_run():
+    params = dict(
+        n_repetitions=2,
+        n_steps=20,
+        verbosity=0,
+        save_stats=False,
+        private_infos=_opponent_private_infos,
+    )
+    serial = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(2, 50, seed=3), njobs=-1, **params
+    )
+    shared = streaming_tournament(
+        (Boulware, Conceder),
+        pie_scenarios(2, 50, seed=3),
+        njobs=2,
+        share_scenarios=True,
+        **params,
+    )
+    assert len(shared.details) == len(serial.details)
+    assert dict(
+        zip(shared.final_scores["strategy"], shared.final_scores["score"])
+    ) == pytest.approx(
+        dict(zip(serial.final_scores["strategy"], serial.final_scores["score"]))
+    )
@@ -0,0 +1,412 @@
+import random
+import time
+
+import negmas.tournaments.neg.simple.cartesian as cartesian
+import pandas as pd
+import pytest
+from negmas.helpers.inout import load
+from negmas.inout import Scenario
+from negmas.tournaments.neg.simple import cartesian_tournament
+
+import anl.anl2024.tournament as tournament
+
+from anl.anl2024.analytics import SCENARIO_PROFILES_FILE_NAME
+from anl.anl2024.formats import has_binary_scenario
+from anl.anl2024.negotiators import Boulware, Conceder, Linear, NaiveTitForTat
+from anl.anl2024.runner import (
+    _opponent_private_infos,
+    anl2024_tournament,
+    extend_tournament,
+    pie_scenarios,
+)
+from anl.anl2024.tournament import (
+    combine_shards,
+    load_completed_runs,
+    prefetch,
+    resume_scenarios,
+    saved_scenarios,
+    streaming_tournament,
+)
+
+
+def test_prefetch_keeps_order_and_is_bounded():
+    produced = []
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    consumed = []
+    for x in prefetch(items(), lambda x: x * 2, size=2):
+        time.sleep(0.01)
+        consumed.append(x)
+        # one item may be in the hands of the producer beyond the queue
+        assert len(produced) <= len(consumed) + 3
+    assert consumed == [2 * _ for _ in range(10)]
+
+
+def test_prefetch_propagates_exceptions():
+    def fail(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    with pytest.raises(ValueError, match="bad item"):
+        list(prefetch(range(5), fail, size=2))
+
+
+@pytest.mark.parametrize("rotate_ufuns", [False, True])
+def test_streaming_tournament_runs_all_negotiations(rotate_ufuns):
+    params = dict(
+        n_repetitions=2,
+        rotate_ufuns=rotate_ufuns,
+        njobs=-1,
+        n_steps=10,
+        verbosity=0,
+        save_stats=False,
+    )
+    streamed = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(3, 20, seed=7, lazy=True), **params
+    )
+    expected = cartesian_tournament(
+        (Boulware, Conceder), pie_scenarios(3, 20, seed=7), **params
+    )
+    assert len(streamed.details) == len(expected.details)
+    assert set(streamed.final_scores["strategy"]) == {"Boulware", "Conceder"}
+
+
+def test_streaming_tournament_does_not_modify_scenarios():
+    scenarios = pie_scenarios(2, 20, seed=7)
+    names = [[u.name for u in s.ufuns] for s in scenarios]
+    streaming_tournament(
+        (Boulware, Conceder), scenarios, njobs=-1, n_steps=10, verbosity=0
+    )
+    assert [[u.name for u in s.ufuns] for s in scenarios] == names
+
+
+def test_lazy_generation_matches_eager():
+    eager = pie_scenarios(5, 20, seed=11, njobs=2)
+    lazy = pie_scenarios(5, 20, seed=11, njobs=2, lazy=True)
+    assert not isinstance(lazy, list)
+    assert [s.ufuns[0].reserved_value for s in eager] == [
+        s.ufuns[0].reserved_value for s in lazy
+    ]
+
+
+@pytest.mark.parametrize("rotate_ufuns", [False, True])
+def test_streaming_tournament_saves_scenario_profiles(tmp_path, rotate_ufuns):
+    streaming_tournament(
+        (Boulware, Conceder),
+        pie_scenarios(2, 20, seed=3, lazy=True),
+        path=tmp_path,
+        rotate_ufuns=rotate_ufuns,
+        njobs=-1,
+        n_steps=10,
+        verbosity=0,
+        save_scenario_figs=False,
+    )
+    profiles = pd.read_csv(tmp_path / SCENARIO_PROFILES_FILE_NAME)
+    saved = {_.name for _ in (tmp_path / "scenarios").glob("*") if _.is_dir()}
+    assert len(profiles) == len(saved) == (4 if rotate_ufuns else 2)
+    assert set(profiles["scenario"]) == saved
+    assert profiles["difficulty"].between(0, 1).all()
+
+
+def test_resumed_tournament_matches_uninterrupted(tmp_path):
+    params = dict(
+        n_repetitions=2, njobs=-1, n_steps=10, verbosity=0, save_scenario_figs=False
+    )
+    full = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(2, 20, seed=5), path=tmp_path, **params
+    )
+    files = sorted((tmp_path / "results").glob("*.json"))
+    assert len(files) == len(full.details) == 32
+    # simulate an interruption: some negotiations did not finish and one was being saved
+    for f in files[::3]:
+        f.unlink()
+    files[1].write_text("{")
+    completed = load_completed_runs(tmp_path)
+    assert len(completed) == len(files) - len(files[::3]) - 1
+    # reserved values of regenerated scenarios differ without a seed but saved ones are used
+    scenarios = pie_scenarios(2, 20)
+    resumed = streaming_tournament(
+        (Boulware, Conceder),
+        resume_scenarios(scenarios, tmp_path),
+        path=tmp_path,
+        completed=completed,
+        **params,
+    )
+    assert len(resumed.details) == len(full.details)
+    pd.testing.assert_frame_equal(
+        resumed.final_scores.reset_index(drop=True),
+        full.final_scores.reset_index(drop=True),
+    )
+    assert len(load_completed_runs(tmp_path)) == len(full.details)
+
+
+def test_resumed_anl2024_tournament_keeps_limits_of_scenarios(tmp_path, monkeypatch):
+    # figures are irrelevant here
+    monkeypatch.setattr(tournament, "plot_offline_run", lambda *args, **kwargs: None)
+    params = dict(
+        competitors=(Boulware, Conceder),
+        n_scenarios=3,
+        n_outcomes=20,
+        n_steps=(10, 1000),
+        n_repetitions=2,
+        njobs=-1,
+        seed=7,
+        verbosity=0,
+        base_path=tmp_path,
+        name="t",
+        stream=True,
+        plot_fraction=0,
+    )
+    path = tmp_path / "t"
+    full = anl2024_tournament(**params)
+    limits = {
+        _.name: load(_ / "mechanism.json") for _ in (path / "scenarios").iterdir()
+    }
+    assert len({_["n_steps"] for _ in limits.values()}) > 1
+    files = sorted((path / "results").glob("*.json"))
+    for f in files[::2]:
+        f.unlink()
+    random.seed(1234)
+    resumed = anl2024_tournament(resume=True, **params)
+    assert len(resumed.details) == len(full.details)
+    assert {
+        _.name: load(_ / "mechanism.json") for _ in (path / "scenarios").iterdir()
+    } == limits
+    with pytest.raises(ValueError, match="seed"):
+        anl2024_tournament(resume=True, **(params | dict(seed=None)))
+
+
+def test_extended_tournament_matches_a_full_run(tmp_path):
+    params = dict(
+        n_repetitions=2,
+        njobs=-1,
+        n_steps=10,
+        verbosity=0,
+        save_scenario_figs=False,
+        private_infos=_opponent_private_infos,
+    )
+    streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(2, 20, seed=5), path=tmp_path, **params
+    )
+    extended = extend_tournament(tmp_path, [Linear], njobs=-1, verbosity=0)
+    full = streaming_tournament(
+        (Boulware, Conceder, Linear), pie_scenarios(2, 20, seed=5), **params
+    )
+    # the 4 existing pairings are reused and the 5 with the new competitor are added
+    assert len(load_completed_runs(tmp_path)) == len(extended.details) == 72
+    pd.testing.assert_frame_equal(
+        extended.final_scores.reset_index(drop=True),
+        full.final_scores.reset_index(drop=True),
+    )
+    with pytest.raises(ValueError):
+        extend_tournament(tmp_path, [Linear], njobs=-1, verbosity=0)
+
+
+def test_extended_tournament_keeps_settings_of_existing_competitors(tmp_path):
+    params = dict(
+        n_repetitions=1,
+        njobs=-1,
+        n_steps=10,
+        verbosity=0,
+        save_scenario_figs=False,
+        private_infos=_opponent_private_infos,
+        self_play=False,
+    )
+    competitor_params = [dict(accepting_curve="conceder"), dict()]
+    streaming_tournament(
+        (Boulware, Conceder),
+        pie_scenarios(2, 20, seed=5),
+        competitor_params=competitor_params,
+        path=tmp_path,
+        **params,
+    )
+    with pytest.raises(ValueError, match="self_play"):
+        extend_tournament(tmp_path, [Linear], njobs=-1, verbosity=0, self_play=True)
+    extended = extend_tournament(tmp_path, [Linear], njobs=-1, verbosity=0)
+    full = streaming_tournament(
+        (Boulware, Conceder, Linear),
+        pie_scenarios(2, 20, seed=5),
+        competitor_params=competitor_params + [dict()],
+        **params,
+    )
+    pd.testing.assert_frame_equal(
+        extended.final_scores.reset_index(drop=True),
+        full.final_scores.reset_index(drop=True),
+    )
+    (tmp_path / tournament.COMPETITORS_FILE_NAME).unlink()
+    with pytest.raises(ValueError, match="parameters"):
+        extend_tournament(tmp_path, [NaiveTitForTat], njobs=-1, verbosity=0)
+
+
+def test_combined_shards_match_a_single_run(tmp_path):
+    params = dict(
+        n_repetitions=2, njobs=-1, n_steps=10, verbosity=0, save_scenario_figs=False
+    )
+    single = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(3, 20, seed=5), **params
+    )
+    shards = []
+    for i in range(3):
+        shards.append(
+            streaming_tournament(
+                (Boulware, Conceder),
+                pie_scenarios(3, 20, seed=5),
+                path=tmp_path / f"shard{i}",
+                shard=(i, 3),
+                **params,
+            )
+        )
+    assert [len(_.details) for _ in shards] == [16, 16, 16]
+    keys = [set(load_completed_runs(tmp_path / f"shard{i}")) for i in range(3)]
+    assert not (keys[0] & keys[1]) and not (keys[1] & keys[2])
+    combined = combine_shards(
+        [tmp_path / f"shard{i}" for i in range(3)], tmp_path / "all", verbosity=0
+    )
+    assert len(combined.details) == len(single.details)
+    assert (tmp_path / "all" / "scores.csv").exists()
+    pd.testing.assert_frame_equal(
+        combined.final_scores.reset_index(drop=True),
+        single.final_scores.reset_index(drop=True),
+    )
+
+
+def test_shards_draw_the_same_limits_for_every_scenario(tmp_path):
+    params = dict(
+        n_repetitions=1,
+        njobs=-1,
+        n_steps=(10, 1000),
+        time_limit=(60.0, 120.0),
+        verbosity=0,
+        save_scenario_figs=False,
+        seed=11,
+    )
+    single = streaming_tournament(
+        (Boulware, Conceder), pie_scenarios(3, 20, seed=5), path=tmp_path, **params
+    )
+    limits = {
+        _.name: load(_ / "mechanism.json") for _ in (tmp_path / "scenarios").iterdir()
+    }
+    assert len({_["n_steps"] for _ in limits.values()}) > 1
+    for i in range(3):
+        shard_path = tmp_path / f"shard{i}"
+        random.seed(i)
+        streaming_tournament(
+            (Boulware, Conceder),
+            pie_scenarios(3, 20, seed=5),
+            path=shard_path,
+            shard=(i, 3),
+            **params,
+        )
+        assert {
+            _.name: load(_ / "mechanism.json")
+            for _ in (shard_path / "scenarios").iterdir()
+        } == limits
+    combined = combine_shards(
+        [tmp_path / f"shard{i}" for i in range(3)], tmp_path / "all", verbosity=0
+    )
+    pd.testing.assert_frame_equal(
+        combined.final_scores.reset_index(drop=True),
+        single.final_scores.reset_index(drop=True),
+    )
+
+
+def test_combined_shards_match_a_single_seeded_tournament(tmp_path, monkeypatch):
+    # figures are irrelevant here
+    monkeypatch.setattr(tournament, "plot_offline_run", lambda *args, **kwargs: None)
+    params = dict(
+        competitors=(Boulware, Conceder),
+        n_scenarios=2,
+        n_outcomes=20,
+        n_steps=(10, 1000),
+        n_repetitions=1,
+        njobs=-1,
+        seed=3,
+        verbosity=0,
+        base_path=tmp_path,
+        plot_fraction=0,
+    )
+    # a single shard runs all negotiations drawing limits the way every shard does
+    single = anl2024_tournament(name="single", shard=(0, 1), **params)
+    for i in range(2):
+        anl2024_tournament(name=f"shard{i}", shard=(i, 2), **params)
+    for i in range(2):
+        for folder in (tmp_path / f"shard{i}" / "scenarios").iterdir():
+            assert load(folder / "mechanism.json") == load(
+                tmp_path / "single" / "scenarios" / folder.name / "mechanism.json"
+            )
+    combined = combine_shards(
+        [tmp_path / f"shard{i}" for i in range(2)], tmp_path / "all", verbosity=0
+    )
+    assert len(combined.details) == len(single.details)
+    pd.testing.assert_frame_equal(
+        combined.final_scores.reset_index(drop=True),
+        single.final_scores.reset_index(drop=True),
+    )
+
+
+def test_seeded_tournaments_draw_the_same_limits(tmp_path, monkeypatch):
+    # figures are irrelevant here
+    monkeypatch.setattr(cartesian, "plot_offline_run", lambda *args, **kwargs: None)
+    params = dict(
+        competitors=(Boulware, Conceder),
+        n_scenarios=2,
+        n_outcomes=20,
+        n_steps=(10, 1000),
+        n_repetitions=1,
+        njobs=-1,
+        seed=3,
+        verbosity=0,
+        base_path=tmp_path,
+        plot_fraction=0,
+    )
+    limits = []
+    for i in range(2):
+        random.seed(i)
+        anl2024_tournament(name=f"run{i}", **params)
+        limits.append(
+            {
+                _.name: load(_ / "mechanism.json")
+                for _ in (tmp_path / f"run{i}" / "scenarios").iterdir()
+            }
+        )
+    assert limits[0] == limits[1]
+
+
+def test_shards_need_seeded_scenarios():
+    with pytest.raises(ValueError, match="seed"):
+        anl2024_tournament(n_scenarios=2, shard=(0, 2), nologs=True, verbosity=0)
+    with pytest.raises(ValueError, match="shard"):
+        anl2024_tournament(n_scenarios=2, shard=(2, 2), seed=1, nologs=True)
+
+
+@pytest.mark.parametrize("shard", [None, (0, 1)])
+@pytest.mark.parametrize("binary", [False, True])
+def test_scenarios_are_saved_in_one_format(tmp_path, monkeypatch, binary, shard):
+    # figures are irrelevant here
+    monkeypatch.setattr(cartesian, "plot_offline_run", lambda *args, **kwargs: None)
+    monkeypatch.setattr(tournament, "plot_offline_run", lambda *args, **kwargs: None)
+    anl2024_tournament(
+        competitors=(Boulware, Conceder),
+        n_scenarios=2,
+        n_outcomes=20,
+        n_repetitions=1,
+        njobs=-1,
+        seed=3,
+        verbosity=0,
+        base_path=tmp_path,
+        name="t",
+        plot_fraction=0,
+        shard=shard,
+        binary_scenarios=binary,
+    )
+    folders = list((tmp_path / "t" / "scenarios").iterdir())
+    assert len(folders) == 2
+    for folder in folders:
+        assert has_binary_scenario(folder) == binary
+        assert Scenario.is_loadable(folder) != binary
+    assert len(saved_scenarios(tmp_path / "t")) == 2
@@ -0,0 +1,120 @@
+import copy
+import pickle
+from functools import partial
+
+import numpy as np
+import pytest
+
+from negmas.outcomes import make_issue, make_os
+from negmas.preferences import MappingUtilityFunction
+
+from anl.anl2024.runner import (
+    _opponent_private_infos,
+    mixed_scenarios,
+    monotonic_pies_scenarios,
+    pie_scenarios,
+)
+from anl.anl2024.tournament import _rotations
+from anl.anl2024.ufuns import (
+    ArrayFun,
+    MappedArrayFun,
+    OpponentUfun,
+    array_fun,
+    utility_grid,
+)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_mapped_array_fun_matches_in_memory(tmp_path, dtype):
+    values = np.random.random(100)
+    mapped = array_fun(values, storage=tmp_path, dtype=dtype)
+    assert isinstance(mapped, MappedArrayFun)
+    assert mapped.values.dtype == np.dtype(dtype)
+    assert mapped == ArrayFun(values.astype(dtype))
+    copied = pickle.loads(pickle.dumps(mapped))
+    assert copied.path == mapped.path
+    assert [copied(_) for _ in range(100)] == pytest.approx(values.tolist(), abs=1e-6)
+
+
+def test_mapped_array_fun_pickles_only_the_path(tmp_path):
+    values = np.random.random(100_000)
+    mapped = array_fun(values, storage=tmp_path)
+    assert len(pickle.dumps(mapped)) < 1_000
+    assert len(pickle.dumps(ArrayFun(values))) > 100_000 * 8
+
+
+@pytest.mark.parametrize(
+    "generator", [pie_scenarios, partial(mixed_scenarios, pies_fraction=0)]
+)
+def test_generators_can_store_values_on_disk(tmp_path, generator):
+    in_memory = generator(2, 200, seed=7)
+    on_disk = generator(2, 200, seed=7, storage=tmp_path, storage_dtype="float32")
+    assert len(list(tmp_path.glob("*.npy"))) == 4
+    # generating the same scenarios again reuses their files
+    generator(2, 200, seed=7, storage=tmp_path, storage_dtype="float32")
+    assert len(list(tmp_path.glob("*.npy"))) == 4
+    for a, b in zip(in_memory, on_disk):
+        outcomes = list(a.outcome_space.enumerate_or_sample())
+        for u, v in zip(a.ufuns, b.ufuns):
+            assert isinstance(v.values[0], MappedArrayFun)  # type: ignore
+            assert [v(_) for _ in outcomes] == pytest.approx(
+                [u(_) for _ in outcomes], abs=1e-6
+            )
+            assert v.reserved_value == pytest.approx(u.reserved_value)
+
+
+def test_opponent_ufun_views_share_tables_and_overlay_reserved_values():
+    s = pie_scenarios(1, 1000, seed=3)[0]
+    first, second = _opponent_private_infos(s)
+    view = first["opponent_ufun"]
+    assert isinstance(view, OpponentUfun)
+    assert view.reserved_value == 0
+    copied = copy.deepcopy(first)["opponent_ufun"]
+    assert copied is not view
+    assert copied.values[0] is view.values[0] is s.ufuns[1].values[0]  # type: ignore
+    copied.reserved_value = 0.5
+    assert view.reserved_value == 0
+    assert s.ufuns[1].reserved_value != 0.5
+    outcomes = list(s.outcome_space.enumerate())
+    assert [copied(_) for _ in outcomes] == [s.ufuns[1](_) for _ in outcomes]
+    # pickling with the scenario adds (almost) nothing as tables are shared
+    views = (first["opponent_ufun"], second["opponent_ufun"])
+    assert len(pickle.dumps((s, views))) < len(pickle.dumps(s)) + 2_000
+
+
+@pytest.mark.parametrize(
+    "generator", [pie_scenarios, partial(mixed_scenarios, pies_fraction=1.0)]
+)
+def test_negotiations_pickle_opponent_tables_once(generator):
+    s = generator(1, 1000, seed=3)[0]
+    pinfo = _opponent_private_infos(s)
+    for scenario, private_infos, _ in _rotations(s, pinfo, True, True, False):
+        views = tuple(_["opponent_ufun"] for _ in private_infos)
+        assert (
+            len(pickle.dumps((scenario, views))) < len(pickle.dumps(scenario)) + 1_000
+        )
+
+
+@pytest.mark.parametrize(
+    "generator",
+    [
+        mixed_scenarios,
+        partial(mixed_scenarios, pies_fraction=1.0),
+        monotonic_pies_scenarios,
+    ],
+)
+def test_utility_grid_matches_calling_the_ufun(generator):
+    for s in generator(3, 300, seed=5):
+        outcomes = list(s.outcome_space.enumerate())
+        for u in s.ufuns:
+            expected = np.asarray([float(u(_)) for _ in outcomes])
+            assert np.array_equal(utility_grid(u), expected)
+            assert np.array_equal(utility_grid(u, 17, 123), expected[17:123])
+            assert np.array_equal(utility_grid(u, 250), expected[250:])
+            assert np.array_equal(utility_grid(OpponentUfun(u)), expected)
+
+
+def test_utility_grid_needs_linear_additive_ufuns():
+    os = make_os([make_issue(3), make_issue(["a", "b"])])
+    u = MappingUtilityFunction(lambda x: x[0], outcome_space=os)
+    assert utility_grid(u) is None